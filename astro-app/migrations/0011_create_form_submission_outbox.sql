@@ -0,0 +1,17 @@
+-- Form submission outbox (platform-api services/submission_outbox.py)
+-- POST /api/v1/forms/submit stores the Sanity document here and answers at once;
+-- a flusher (request background task + cron) writes pending rows to Sanity in
+-- batched createIfNotExists transactions and deletes them once Sanity has them.
+-- Rows whose flush failed wait until next_attempt_at (exponential backoff).
+
+CREATE TABLE IF NOT EXISTS form_submission_outbox (
+  id TEXT PRIMARY KEY,                 -- Sanity document _id ("submission.<uuid>")
+  dataset TEXT NOT NULL,
+  document TEXT NOT NULL,              -- JSON of the Sanity document
+  created_at INTEGER NOT NULL DEFAULT (unixepoch() * 1000),
+  attempts INTEGER NOT NULL DEFAULT 0,
+  next_attempt_at INTEGER NOT NULL DEFAULT 0,
+  last_error TEXT
+);
+
+CREATE INDEX idx_form_outbox_due ON form_submission_outbox(next_attempt_at, created_at);
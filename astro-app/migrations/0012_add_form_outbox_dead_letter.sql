@@ -0,0 +1,11 @@
+-- Dead-lettering for the form submission outbox (platform-api services/submission_outbox.py)
+-- A row Sanity rejects outright (4xx) or that exhausts its retries is kept, with
+-- dead_lettered_at set, instead of being retried forever; the flusher skips it.
+-- Inspect with: SELECT id, attempts, last_error FROM form_submission_outbox
+--               WHERE dead_lettered_at IS NOT NULL;
+
+ALTER TABLE form_submission_outbox ADD COLUMN dead_lettered_at INTEGER;
+
+DROP INDEX IF EXISTS idx_form_outbox_due;
+CREATE INDEX idx_form_outbox_due ON form_submission_outbox(next_attempt_at, created_at)
+  WHERE dead_lettered_at IS NULL;
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""Report per-module import cost of the Worker's cold-start path.
+
+Runs ``python -X importtime`` in a fresh interpreter with ``src/`` on the
+path and prints the most expensive modules (cumulative microseconds, i.e.
+including everything they import).
+
+Usage:
+    python scripts/profile_imports.py                    # import app (cold start)
+    python scripts/profile_imports.py routers.content    # plus one router
+    python scripts/profile_imports.py --all --top 40     # app + every router
+
+Numbers come from CPython, not Pyodide — use them to compare modules and
+spot regressions, not as absolute Workers cold-start times.
+"""
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+ROUTERS = ["routers.health", "routers.content", "routers.forms",
+           "routers.platform", "routers.discord", "routers.auth"]
+
+
+def profile(modules: list[str]) -> list[tuple[int, int, str]]:
+    """Return ``(self_us, cumulative_us, module)`` for every import."""
+    code = "; ".join(f"import {m}" for m in modules)
+    try:
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            cwd=SRC, capture_output=True, text=True, check=True,
+        )
+    except subprocess.CalledProcessError as exc:
+        sys.exit(exc.stderr.strip().splitlines()[-1])
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(self_us), int(cumulative_us), name.rstrip()))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("modules", nargs="*", help="extra modules to import after app")
+    parser.add_argument("--all", action="store_true", help="also import every router")
+    parser.add_argument("--top", type=int, default=25, help="rows to print (default 25)")
+    args = parser.parse_args()
+
+    modules = ["app", *(ROUTERS if args.all else []), *args.modules]
+    rows = profile(modules)
+    total = sum(self_us for self_us, _, _ in rows)
+
+    print(f"Imported: {', '.join(modules)}")
+    print(f"{len(rows)} modules, {total / 1000:.1f} ms total\n")
+    print(f"{'cumulative ms':>13}  {'self ms':>8}  module")
+    for self_us, cumulative_us, name in sorted(rows, key=lambda r: r[1], reverse=True)[:args.top]:
+        print(f"{cumulative_us / 1000:>13.1f}  {self_us / 1000:>8.1f}  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -18,7 +18,9 @@ Why two files (main.py vs app.py)?
 Adding a new router:
     1. Create a file in ``routers/`` (e.g., ``routers/content.py``).
     2. Define an ``APIRouter`` in that file.
-    3. Import and register it here with ``app.include_router(your_router)``.
+    3. Register it here with ``lazy_routers.add(...)`` — the module is
+       imported on the first request under its path (``lazy_routers.py``),
+       keeping it off the cold-start path.
     4. Reload the dev server — your new routes appear at ``/docs``.
 """
 
@@ -26,12 +28,10 @@ from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
-from routers.health import router as health_router
-from routers.content import router as content_router
-from routers.forms import router as form_router
-from routers.platform import router as platform_router
-from routers.discord import router as discord_router
-from routers.auth import router as auth_router
+from lazy_routers import LazyRouterMiddleware, LazyRouters
+from services.metrics import MetricsMiddleware
+from services.request_kv import RequestKVMiddleware
+from services.timing import ServerTimingMiddleware
 
 app = FastAPI(
     title="Platform API",
@@ -64,13 +64,28 @@ app.add_middleware(
 # CONVENIENT GLOBAL VARIABLES
 API_V1 = "/api/v1"
 
-# Register routers
-app.include_router(health_router, prefix=f"{API_V1}/platform")
-app.include_router(content_router, prefix=API_V1)
-app.include_router(form_router, prefix=API_V1)
-app.include_router(platform_router, prefix=API_V1)
-app.include_router(discord_router, prefix=API_V1)
-app.include_router(auth_router, prefix=API_V1)
+# Register routers — each module is imported on the first request to its mount path
+lazy_routers = LazyRouters(app)
+lazy_routers.add("routers.health", prefix=f"{API_V1}/platform", mount=f"{API_V1}/platform/health")
+lazy_routers.add("routers.content", prefix=API_V1, mount=f"{API_V1}/content")
+lazy_routers.add("routers.forms", prefix=API_V1, mount=f"{API_V1}/forms")
+lazy_routers.add("routers.platform", prefix=API_V1, mount=f"{API_V1}/platform")
+lazy_routers.add("routers.discord", prefix=API_V1, mount=f"{API_V1}/discord")
+lazy_routers.add("routers.auth", prefix=API_V1, mount=f"{API_V1}/auth")
+app.add_middleware(LazyRouterMiddleware, routers=lazy_routers)
+
+# Per-request KV read memo; deferred KV writes run after the response
+# (services/request_kv.py).
+app.add_middleware(RequestKVMiddleware)
+
+# Per-request counters and latency histograms for Analytics Engine, written
+# after the response (services/metrics.py). Inside ServerTimingMiddleware so
+# it can read the request's upstream spans.
+app.add_middleware(MetricsMiddleware)
+
+# Server-Timing header on every response — added last so it wraps everything
+# above, including lazy router imports (services/timing.py).
+app.add_middleware(ServerTimingMiddleware)
 
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
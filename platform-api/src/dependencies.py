@@ -40,10 +40,13 @@ Usage in route handlers::
 
 import hmac
 
-from fastapi import Request, HTTPException, Depends
+from fastapi import Request, HTTPException, Depends, BackgroundTasks
 
 from models.settings import WorkerSettings
+from services import request_kv, session_cache
+from services.content_cache import ContentCache
 from services.sanity_client import SanityClient
+from services.timing import span
 from fastapi.security import OAuth2PasswordBearer
 
 async def get_env(request: Request):
@@ -75,9 +78,9 @@ async def get_settings(request: Request) -> WorkerSettings:
     env var, secret, and binding from the Cloudflare ``env`` proxy and
     packages them into a ``WorkerSettings`` instance with proper types.
 
-    The result is cached on ``request.state`` so that if multiple
-    dependencies in the same request call ``Depends(get_settings)``, the
-    env proxy is only read once.
+    The env proxy is read once per isolate (``WorkerSettings.for_env``),
+    not once per request — the same instance is shared by every request
+    and must be treated as read-only.
 
     Args:
         request: The incoming FastAPI request. Must have
@@ -95,10 +98,8 @@ async def get_settings(request: Request) -> WorkerSettings:
             env_name = settings.environment  # str
             kv_val = await settings.kv.get("my-key")  # KV read
     """
-    if not hasattr(request.state, "worker_settings"):
-        env = request.scope["env"]
-        request.state.worker_settings = WorkerSettings.from_worker_env(env)
-    return request.state.worker_settings
+    with span("settings"):
+        return WorkerSettings.for_env(request.scope["env"])
 
 
 async def verify_api_key(
@@ -189,10 +190,22 @@ async def get_db(settings: WorkerSettings = Depends(get_settings)):
         raise HTTPException(status_code=503, detail="D1 database not configured")
     return settings.db
 
-async def get_sanity(settings: WorkerSettings = Depends(get_settings)) -> SanityClient:
+async def use_sanity_cdn(request: Request):
+    """Route/router dependency: send this route's Sanity reads to the API CDN.
+
+    Attach it to public, read-only routes (``APIRouter(dependencies=[...])``)
+    so ``get_sanity`` hands out a client in ``"cdn"`` read mode — anonymous,
+    cached reads of published documents. Routes without it stay in
+    ``"auto"`` mode (live API whenever a read token is configured).
+    """
+    request.state.sanity_read_mode = "cdn"
+
+
+async def get_sanity(request: Request, settings: WorkerSettings = Depends(get_settings)) -> SanityClient:
     """Inject a configured SanityClient into route handlers.
 
-    Uses the Cloudflare environment variables parsed by WorkerSettings.
+    Uses the Cloudflare environment variables parsed by WorkerSettings. The
+    read mode comes from ``use_sanity_cdn`` when the route opted in.
 
     Raises:
         HTTPException(503): If ``SANITY_PROJECT_ID`` is not configured.
@@ -205,7 +218,20 @@ async def get_sanity(settings: WorkerSettings = Depends(get_settings)) -> Sanity
 
     token = settings.optional_secrets.get("sanity_api_read_token", "")
 
-    return SanityClient(project_id=project_id, token=token)
+    read_mode = getattr(request.state, "sanity_read_mode", "auto")
+    return SanityClient(project_id=project_id, token=token, read_mode=read_mode)
+
+async def get_content_cache(
+    background_tasks: BackgroundTasks,
+    settings: WorkerSettings = Depends(get_settings),
+) -> ContentCache:
+    """Inject the read-through content cache (in-isolate LRU + KV).
+
+    Stale-while-revalidate refreshes are scheduled on the request's
+    ``BackgroundTasks`` so they run after the response is sent. A missing
+    KV binding degrades to the in-isolate tier only.
+    """
+    return ContentCache(kv=settings.kv, background_tasks=background_tasks)
 
 # User/Sponsor authentication
 
@@ -247,15 +273,26 @@ async def _resolve_session_email(
         ('student', 'sponsor'). Phase 1 of the bridge gates on 'sponsor';
         Story 12.9 will introduce 'admin' as a separate role.
 
+        Lookups go memory (``services/session_cache.py``) → KV → D1; the
+        in-isolate tier also remembers rejected tokens for a short while.
+        The KV fill after a D1 hit is written after the response.
+
         Returns None on miss/expiry/role-mismatch (caller decides on 401).
         """
         if not settings.kv or not db:
             raise HTTPException(500, "D1 or KV not configured")
 
+        found, email = session_cache.lookup(token, require_role)
+        if found:
+            return email
+
+        kv = request_kv.wrap(settings.kv)
         cache_key = f"session_token:{token}"
-        cached = await settings.kv.get(cache_key)
+        with span("kv"):
+            cached = await kv.get(cache_key)
         if cached:
             # Cached entries are role-validated at write time; trust them.
+            session_cache.store(token, cached, require_role)
             return cached
 
         role_clause = (
@@ -272,12 +309,15 @@ async def _resolve_session_email(
         binds = [token, require_role] if require_role else [token]
 
         try:
-            result = await db.prepare(query).bind(*binds).first()
-            if not result:
-                return None
+            with span("d1"):
+                result = await db.prepare(query).bind(*binds).first()
         except:
             raise HTTPException(500, "Database query failure")
+        if not result:
+            session_cache.store(token, None, require_role)
+            return None
 
         email = result.email
-        await settings.kv.put(cache_key, email, expirationTtl=300)
+        await kv.put_later(cache_key, email, expirationTtl=300)
+        session_cache.store(token, email, require_role)
         return email
\ No newline at end of file
@@ -0,0 +1,99 @@
+"""Import router modules on the first request to their prefix.
+
+Importing every router at startup pulls in httpx, email-validator and all
+the request/response models before the first request can be served, which
+is paid on every Python Worker cold start. ``LazyRouters`` records where
+each router mounts and ``LazyRouterMiddleware`` imports it the first time
+a request path falls under that prefix — an isolate that only serves
+``/content`` never loads the forms or Discord code.
+
+``/docs``, ``/redoc`` and ``/openapi.json`` load everything, since the
+schema has to describe every route.
+
+Usage (see ``app.py``)::
+
+    lazy_routers = LazyRouters(app)
+    lazy_routers.add("routers.content", prefix="/api/v1", mount="/api/v1/content")
+    app.add_middleware(LazyRouterMiddleware, routers=lazy_routers)
+"""
+
+import importlib
+from dataclasses import dataclass
+
+from fastapi import FastAPI
+
+from services.timing import span
+
+# Paths that describe the whole API and therefore need every router.
+SCHEMA_PATHS = ("/docs", "/redoc", "/openapi.json")
+
+
+@dataclass
+class _PendingRouter:
+    module: str
+    prefix: str
+    mount: str
+    attr: str = "router"
+
+
+def _under(path: str, mount: str) -> bool:
+    return path == mount or path.startswith(mount.rstrip("/") + "/")
+
+
+class LazyRouters:
+    """Routers registered with ``app`` but not imported yet."""
+
+    def __init__(self, app: FastAPI):
+        self.app = app
+        self._pending: list[_PendingRouter] = []
+
+    def add(self, module: str, prefix: str, mount: str, attr: str = "router"):
+        """Register ``module.attr`` for ``app.include_router(..., prefix=prefix)``.
+
+        Args:
+            module: Dotted module path, e.g. ``"routers.content"``.
+            prefix: Passed to ``include_router``.
+            mount: Full path prefix whose first request imports the module
+                (``prefix`` plus the router's own prefix).
+        """
+        self._pending.append(_PendingRouter(module, prefix, mount, attr))
+
+    @property
+    def pending(self) -> list[str]:
+        return [p.module for p in self._pending]
+
+    def load_for(self, path: str) -> int:
+        """Import every pending router that ``path`` needs. Returns how many."""
+        if path in SCHEMA_PATHS:
+            return self.load_all()
+        due = [p for p in self._pending if _under(path, p.mount)]
+        for pending in due:
+            self._include(pending)
+        return len(due)
+
+    def load_all(self) -> int:
+        due = list(self._pending)
+        for pending in due:
+            self._include(pending)
+        return len(due)
+
+    def _include(self, pending: _PendingRouter):
+        router = getattr(importlib.import_module(pending.module), pending.attr)
+        self.app.include_router(router, prefix=pending.prefix)
+        self._pending.remove(pending)
+        # The cached OpenAPI schema predates the new routes.
+        self.app.openapi_schema = None
+
+
+class LazyRouterMiddleware:
+    """ASGI middleware that mounts routers before routing sees the request."""
+
+    def __init__(self, app, routers: LazyRouters):
+        self.app = app
+        self.routers = routers
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] in ("http", "websocket") and self.routers.pending:
+            with span("import"):
+                self.routers.load_for(scope["path"])
+        await self.app(scope, receive, send)
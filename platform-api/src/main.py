@@ -29,7 +29,8 @@ Architecture (cron flow)::
 Key constraints of the Workers runtime:
     - 128 MB memory limit — paginate large datasets, never load everything.
     - ~1 second cold start — first request after idle spins up the isolate.
-    - No persistent connections — create a new ``httpx.AsyncClient`` per request.
+    - Connections only persist within an isolate — lease HTTP clients via
+      ``get_client(origin=...)`` (``services/http_client.py``).
     - Global mutable state leaks across requests (isolates are reused).
 
 Note:
@@ -42,6 +43,17 @@ from workers import WorkerEntrypoint
 import asgi
 
 from app import app
+from services import metrics  # already loaded by app.py (MetricsMiddleware)
+
+# Everything else (settings, the Sanity client and httpx, the views, the
+# queue consumer, the outbox) is imported inside the handler that uses it,
+# so a cold start that serves HTTP only pays for app.py and its routers.
+
+# Rebuilds materialized views (services/sponsor_stats.py, services/search_index.py).
+REFRESH_CRON = "*/30 * * * *"
+
+# Retries form submissions still in the D1 outbox (services/submission_outbox.py).
+OUTBOX_CRON = "*/5 * * * *"
 
 
 class Default(WorkerEntrypoint):
@@ -53,6 +65,7 @@ class Default(WorkerEntrypoint):
 
     - ``fetch()`` — called for every HTTP request (GET, POST, etc.).
     - ``scheduled()`` — called by cron triggers (time-based schedules).
+    - ``queue()`` — called with batches from the queues this Worker consumes.
 
     The class name ``Default`` is a convention from the Cloudflare Python
     Workers SDK (as of Aug 2025). The ``main`` field in ``wrangler.jsonc``
@@ -60,6 +73,8 @@ class Default(WorkerEntrypoint):
     automatically.
 
     Attributes:
+        ctx: The execution context. ``ctx.waitUntil(coroutine)`` keeps the
+            isolate alive for work that finishes after the response.
         env: A JavaScript proxy object provided by the Workers runtime.
             Contains all **bindings** (KV, D1, AI) and **secrets/env vars**
             configured in ``wrangler.jsonc`` and ``wrangler secret put``.
@@ -86,7 +101,13 @@ class Default(WorkerEntrypoint):
         Returns:
             A Workers ``Response`` object sent back to the client.
         """
-        return await asgi.fetch(app, request, self.env)
+        # Request metrics are flushed through ctx.waitUntil so writing them
+        # never delays the response (services/metrics.py).
+        token = metrics.bind_wait_until(self.ctx.waitUntil)
+        try:
+            return await asgi.fetch(app, request, self.env)
+        finally:
+            metrics.unbind_wait_until(token)
 
     async def scheduled(self, controller, env, ctx):
         """Handle cron trigger events (scheduled tasks).
@@ -123,16 +144,65 @@ class Default(WorkerEntrypoint):
         """
         cron = controller.cron
         # Route to the right handler based on cron pattern.
-        # Uncomment and customize for your worker:
-        # if cron == "*/5 * * * *":
-        #     ctx.waitUntil(self._five_minute_check())
+        if cron == REFRESH_CRON:
+            ctx.waitUntil(self._refresh_views(env))
+        elif cron == OUTBOX_CRON:
+            ctx.waitUntil(self._flush_outbox(env))
         # elif cron == "0 14 * * 1":
         #     ctx.waitUntil(self._weekly_digest())
         print(f"Cron trigger fired: {cron}")
 
-    # async def _five_minute_check(self):
-    #     """Example: periodic health check or data sync."""
-    #     pass
+    async def queue(self, batch, env, ctx):
+        """Deliver a batch of queued Discord notifications.
+
+        Cloudflare calls this for the ``discord-notifications`` queue
+        (``queues.consumers`` in ``wrangler.jsonc``). Each message is acked
+        or retried individually (``services/discord_queue.py``).
+
+        Args:
+            batch: A ``MessageBatch`` — ``.queue`` is the queue name,
+                ``.messages`` the messages (``.body``, ``.attempts``,
+                ``.ack()``, ``.retry()``).
+        """
+        from models.settings import WorkerSettings
+        from services import discord_queue
+
+        settings = WorkerSettings.for_env(env)
+        await discord_queue.consume(batch, settings.kv)
+
+    async def _refresh_views(self, env):
+        """Rebuild sponsor project counts and search indexes for every site."""
+        from models.settings import WorkerSettings
+        from services import search_index, sponsor_stats
+        from services.sanity_client import SanityClient
+
+        settings = WorkerSettings.for_env(env)
+        sanity = SanityClient(
+            project_id=settings.env_vars.get("sanity_project_id"),
+            token=settings.optional_secrets.get("sanity_api_read_token", ""),
+            read_mode="live",
+        )
+        views = await sponsor_stats.refresh_all(settings.kv, sanity)
+        await search_index.rebuild_all(settings.kv, sanity)
+        print(f"Sponsor stats and search indexes refreshed for {views} site views")
+
+    async def _flush_outbox(self, env):
+        """Send form submissions waiting in the D1 outbox to Sanity."""
+        from models.settings import WorkerSettings
+        from services import submission_outbox
+        from services.sanity_client import SanityClient
+
+        settings = WorkerSettings.for_env(env)
+        write_token = settings.optional_secrets.get("sanity_api_write_token")
+        if settings.db is None or not write_token:
+            return
+        sanity = SanityClient(
+            project_id=settings.env_vars.get("sanity_project_id"),
+            token=settings.optional_secrets.get("sanity_api_read_token", ""),
+            read_mode="live",
+        )
+        delivered = await submission_outbox.flush(settings.db, sanity, write_token)
+        print(f"Outbox flushed {delivered} form submission(s)")
 
     # async def _weekly_digest(self):
     #     """Example: weekly summary email or Discord message."""
@@ -132,7 +132,9 @@ class PaginatedResponse(BaseModel, Generic[T]):
 
     Cloudflare Workers have a **128 MB memory limit**, so you should never
     load an entire dataset into memory. Use this model to return results
-    in pages with ``offset`` and ``limit`` parameters.
+    in pages, either with ``offset`` and ``limit`` parameters or — for
+    large or growing collections — with a keyset cursor
+    (``utils/pagination.py``), whose per-page cost does not grow with depth.
 
     Type parameter ``T`` is the type of items in the list. FastAPI uses
     this for automatic OpenAPI schema generation.
@@ -140,8 +142,10 @@ class PaginatedResponse(BaseModel, Generic[T]):
     Attributes:
         items: The current page of results.
         total: Total number of items across all pages (for UI pagination).
-        offset: Number of items skipped (0-based).
+            ``None`` when the endpoint only counts on request.
+        offset: Number of items skipped (0-based); ``None`` for cursor paging.
         limit: Maximum items per page.
+        next_cursor: Opaque token for the next page; ``None`` on the last page.
 
     Example::
 
@@ -155,9 +159,10 @@ class PaginatedResponse(BaseModel, Generic[T]):
     """
 
     items: list[T]
-    total: int
-    offset: int
+    total: int | None = None
+    offset: int | None = None
     limit: int
+    next_cursor: str | None = None
 
     model_config = ConfigDict(
         json_schema_extra={
@@ -167,6 +172,7 @@ class PaginatedResponse(BaseModel, Generic[T]):
                     "total": 42,
                     "offset": 0,
                     "limit": 20,
+                    "next_cursor": None,
                 }
             ]
         }
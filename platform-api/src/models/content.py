@@ -1,9 +1,9 @@
 # src/models/content.py
 from __future__ import annotations
 
-from typing import Annotated, Union
+from typing import Annotated, Any, Literal, Union
 
-from pydantic import BaseModel, Field, ConfigDict, Discriminator, Tag
+from pydantic import BaseModel, Field, ConfigDict, Discriminator, Tag, field_validator
 
 
 class SanityBaseModel(BaseModel):
@@ -123,6 +123,80 @@ class SearchRequest(BaseModel):
     types: list[str] = Field(default=["event", "sponsor", "project"])
 
 
+# --- Batch content requests ---
+
+BatchResource = Literal["pages", "events", "sponsors", "projects"]
+
+
+class BatchSubRequest(BaseModel):
+    """One named list in a batch; filters mirror the matching GET endpoint."""
+    name: str = Field(
+        pattern=r"^[A-Za-z][A-Za-z0-9_]{0,31}$",
+        description="Key for this result in the response object",
+    )
+    resource: BatchResource
+    upcoming: bool = Field(default=True, description="events: only future events")
+    limit: int = Field(default=10, ge=1, le=100, description="events: max events to return")
+    tier: str | None = Field(default=None, description="sponsors: filter by tier")
+    featured: bool | None = Field(default=None, description="sponsors: filter by featured status")
+    sponsor: str | None = Field(default=None, description="projects: filter by sponsor slug")
+
+
+class BatchRequest(BaseModel):
+    model_config = ConfigDict(
+        json_schema_extra={
+            "examples": [{
+                "site": "capstone",
+                "requests": [
+                    {"name": "events", "resource": "events", "limit": 5},
+                    {"name": "sponsors", "resource": "sponsors", "featured": True},
+                    {"name": "projects", "resource": "projects"},
+                ]
+            }]
+        }
+    )
+    site: str = "capstone"
+    requests: list[BatchSubRequest] = Field(min_length=1, max_length=10)
+
+    @field_validator("requests")
+    @classmethod
+    def _unique_names(cls, requests: list[BatchSubRequest]) -> list[BatchSubRequest]:
+        names = [r.name for r in requests]
+        if len(names) != len(set(names)):
+            raise ValueError("sub-request names must be unique")
+        return requests
+
+
+BatchResponse = dict[str, list[dict[str, Any]]]
+"""Maps each sub-request name to its list, shaped like the GET endpoint's items."""
+
+
+# --- Sanity webhook ---
+
+class SanityWebhookEvent(SanityBaseModel):
+    """Body of a Sanity document-change webhook.
+
+    Configure the webhook projection as
+    ``{_id, _type, site, title, name, description,
+    "operation": delta::operation(), "dataset": sanity::dataset()}``.
+    """
+    model_config = ConfigDict(populate_by_name=True, extra="ignore")
+
+    id: str = Field(alias="_id")
+    type: str = Field(alias="_type")
+    site: str | None = None
+    dataset: str | None = Field(default=None, description="Falls back to the sanity-dataset header")
+    operation: Literal["create", "update", "delete"] | None = None
+    title: str | None = None
+    name: str | None = None
+    description: str | None = None
+
+
+class WebhookResult(BaseModel):
+    invalidated: int = Field(description="Cache entries removed")
+    tags: list[str] = Field(description="Invalidation tags derived from the document")
+
+
 # --- Typed Sanity mutation models ---
 
 class CreateMutation(BaseModel):
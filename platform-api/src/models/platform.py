@@ -14,6 +14,20 @@ class DeployStatus(BaseModel):
     environment: Literal["production", "preview"] = Field(default="production", examples=["production"])
 
 
+class DeployStatusError(BaseModel):
+    site: str = Field(examples=["rwc-us"])
+    status_code: int = Field(examples=[502])
+    detail: str = Field(examples=["Cloudflare API error 503: upstream unavailable"])
+
+
+class DeployStatusAll(BaseModel):
+    sites: list[DeployStatus] = Field(description="Sites whose status was resolved.")
+    errors: list[DeployStatusError] = Field(
+        default_factory=list,
+        description="Sites whose status could not be resolved, with the reason.",
+    )
+
+
 class RebuildResponse(BaseModel):
     site: str = Field(examples=["capstone"])
     triggered: bool = Field(examples=[True])
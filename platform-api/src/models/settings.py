@@ -33,8 +33,9 @@ Adding a new env var or secret:
     5. That's it — the health endpoint auto-discovers it.
 """
 
-from typing import Any
-from pydantic import BaseModel, ConfigDict
+from types import MappingProxyType
+from typing import Any, Callable, Mapping
+from pydantic import BaseModel, ConfigDict, PrivateAttr
 
 
 class WorkerSettings(BaseModel):
@@ -80,6 +81,7 @@ class WorkerSettings(BaseModel):
     admin_api_key: str | None = None
     sanity_api_read_token: str | None = None
     sanity_api_write_token: str | None = None
+    sanity_webhook_secret: str | None = None
     discord_bot_token: str | None = None
     discord_app_id: str | None = None
     discord_public_key: str | None = None
@@ -94,9 +96,28 @@ class WorkerSettings(BaseModel):
     kv: Any = None      # KV namespace — key-value store (< 25 MiB per value)
     db: Any = None      # D1 database — serverless SQLite at the edge
     ai: Any = None      # Workers AI — run ML models on Cloudflare GPUs
+    rate_limiter: Any = None  # Durable Object namespace — SlidingWindowRateLimiter
+    analytics: Any = None  # Analytics Engine dataset — request timings (services/timing.py)
+    discord_queue: Any = None  # Queue producer — Discord deliveries (services/discord_queue.py)
+
+    # Frozen ``required_secrets`` / ``optional_secrets`` / ``env_vars`` /
+    # ``bindings`` views, built on first access and dropped if a field is
+    # reassigned (only tests do that).
+    _views: dict[str, Mapping[str, Any]] = PrivateAttr(default_factory=dict)
+
+    def __setattr__(self, name: str, value: Any):
+        super().__setattr__(name, value)
+        if name in type(self).model_fields:
+            self._views.clear()
+
+    def _view(self, name: str, build: Callable[[], dict]) -> Mapping[str, Any]:
+        view = self._views.get(name)
+        if view is None:
+            view = self._views[name] = MappingProxyType(build())
+        return view
 
     @property
-    def required_secrets(self) -> dict[str, str | None]:
+    def required_secrets(self) -> Mapping[str, str | None]:
         """Secrets that MUST be set for the Worker to function.
 
         The health check uses this to determine ``"degraded"`` status when
@@ -104,15 +125,15 @@ class WorkerSettings(BaseModel):
         depends on (e.g., API authentication keys).
 
         Returns:
-            A dict mapping secret names to their current values (or None).
+            A read-only mapping of secret names to their values (or None).
         """
-        return {
+        return self._view("required_secrets", lambda: {
             "api_key": self.api_key,
             "admin_api_key": self.admin_api_key,
-        }
+        })
 
     @property
-    def optional_secrets(self) -> dict[str, str | None]:
+    def optional_secrets(self) -> Mapping[str, str | None]:
         """Secrets needed only by specific features.
 
         The health check reports how many of these are configured but does
@@ -120,11 +141,12 @@ class WorkerSettings(BaseModel):
         Each fork of this template will use a different subset.
 
         Returns:
-            A dict mapping secret names to their current values (or None).
+            A read-only mapping of secret names to their values (or None).
         """
-        return {
+        return self._view("optional_secrets", lambda: {
             "sanity_api_read_token": self.sanity_api_read_token,
             "sanity_api_write_token": self.sanity_api_write_token,
+            "sanity_webhook_secret": self.sanity_webhook_secret,
             "discord_bot_token": self.discord_bot_token,
             "discord_app_id": self.discord_app_id,
             "discord_public_key": self.discord_public_key,
@@ -134,40 +156,57 @@ class WorkerSettings(BaseModel):
             "cf_deploy_hook_capstone": self.cf_deploy_hook_capstone,
             "cf_deploy_hook_rwc_us": self.cf_deploy_hook_rwc_us,
             "cf_deploy_hook_rwc_intl": self.cf_deploy_hook_rwc_intl,
-        }
+        })
 
     @property
-    def env_vars(self) -> dict[str, str]:
+    def env_vars(self) -> Mapping[str, str]:
         """Non-sensitive environment variables (safe to log).
 
         These come from the ``vars`` section of ``wrangler.jsonc`` and are
         visible in the Cloudflare dashboard.
 
         Returns:
-            A dict mapping var names to their current values.
+            A read-only mapping of var names to their values.
         """
-        return {
+        return self._view("env_vars", lambda: {
             "environment": self.environment,
             "sanity_project_id": self.sanity_project_id,
             "sanity_dataset_capstone": self.sanity_dataset_capstone,
             "sanity_dataset_rwc": self.sanity_dataset_rwc
-        }
+        })
 
     @property
-    def bindings(self) -> dict[str, Any]:
-        """Cloudflare service bindings (KV, D1, AI).
+    def bindings(self) -> Mapping[str, Any]:
+        """Cloudflare service bindings (KV, D1, AI, rate limiter DO).
 
         Each binding is a JavaScript proxy object or None if not configured
         in ``wrangler.jsonc``.
 
         Returns:
-            A dict mapping binding names to their proxy objects (or None).
+            A read-only mapping of binding names to proxy objects (or None).
         """
-        return {
+        return self._view("bindings", lambda: {
             "kv": self.kv,
             "db": self.db,
             "ai": self.ai,
-        }
+            "rate_limiter": self.rate_limiter,
+            "analytics": self.analytics,
+            "discord_queue": self.discord_queue,
+        })
+
+    @classmethod
+    def for_env(cls, env) -> "WorkerSettings":
+        """Settings for ``env``, built once per isolate.
+
+        The env proxy is the same object for every request an isolate
+        serves, so ``from_worker_env`` (a JS-proxy read per field plus
+        validation) only runs again if a different env shows up.
+        """
+        global _cached_settings
+        identity = _env_identity(env)
+        if _cached_settings is None or _cached_settings[0] != identity:
+            _cached_settings = (identity, env, cls.from_worker_env(env))
+        return _cached_settings[2]
 
     @classmethod
     def from_worker_env(cls, env) -> "WorkerSettings":
@@ -236,6 +275,7 @@ class WorkerSettings(BaseModel):
             admin_api_key=_get("ADMIN_API_KEY"),
             sanity_api_read_token=_get("SANITY_API_READ_TOKEN"),
             sanity_api_write_token=_get("SANITY_API_WRITE_TOKEN"),
+            sanity_webhook_secret=_get("SANITY_WEBHOOK_SECRET"),
             discord_bot_token=_get("DISCORD_BOT_TOKEN"),
             discord_app_id=_get("DISCORD_APP_ID"),
             discord_public_key=_get("DISCORD_PUBLIC_KEY"),
@@ -249,4 +289,29 @@ class WorkerSettings(BaseModel):
             kv=_get_binding("API_KV"),
             db=_get_binding("DB"),
             ai=_get_binding("AI"),
+            rate_limiter=_get_binding("RATE_LIMITER"),
+            analytics=_get_binding("ANALYTICS"),
+            discord_queue=_get_binding("DISCORD_QUEUE"),
         )
+
+
+# (env identity, env, settings) for the env this isolate last served.
+# The env is held so its identity cannot be reused by another object.
+_cached_settings: tuple[int, Any, WorkerSettings] | None = None
+
+
+def _env_identity(env) -> int:
+    """Identity of the underlying env object.
+
+    Pyodide may wrap the same JS object in a fresh ``JsProxy``; its
+    ``js_id`` names the JS object itself. Plain Python objects use ``id``.
+    """
+    if getattr(type(env), "js_id", None) is not None:
+        return env.js_id
+    return id(env)
+
+
+def reset_settings_cache():
+    """Forget the memoized settings (tests)."""
+    global _cached_settings
+    _cached_settings = None
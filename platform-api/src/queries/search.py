@@ -6,4 +6,15 @@ SEARCH_QUERY = """
 ] | score([title, name] match $searchTerm) | order(_score desc)[0...10]{
   _id, _type, title, name, _score
 }
-"""
\ No newline at end of file
+"""
+
+# Documents fed into the local search index (services/search_index.py).
+SEARCH_INDEX_DOCS = """
+*[
+  _type in $types
+  && !(_id in path("drafts.**"))
+  && (!defined($site) || site == $site)
+]{
+  _id, _type, title, name, description
+}
+"""
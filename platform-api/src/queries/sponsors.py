@@ -7,7 +7,15 @@ GET_SPONSORS = """
   _id, 
   name, 
   tier, 
-  website, 
-  "projectCount": count(*[_type == "project" && references(^._id) && (!defined($site) || site == $site)])
+  website
 }
+"""
+
+# One linear pass over projects; counts per sponsor are tallied in Python
+# (services/sponsor_stats.py) instead of a correlated subquery per sponsor.
+GET_SPONSOR_PROJECT_REFS = """
+*[_type == "project"
+  && defined(sponsor)
+  && (!defined($site) || site == $site)
+]{_id, "sponsor": sponsor._ref}
 """
\ No newline at end of file
@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, Form
+from fastapi import APIRouter, Depends, HTTPException, Form, Response
 from models.settings import WorkerSettings
-from dependencies import get_settings, get_db
+from dependencies import get_settings, get_db, oauth2_scheme
+from services import session_cache
+from services.timing import TimedRoute
 
-router = APIRouter(prefix = "/auth", tags=["Authentication"])
+router = APIRouter(prefix = "/auth", tags=["Authentication"], route_class=TimedRoute)
 
 CACHE_EXPIRY_SECONDS = 5 * 60 # 5 minute expiry time
 
@@ -41,4 +43,21 @@ async def authenticate_for_access_token(
         
     await settings.kv.put(f"session:{password}", result.email, expirationTtl=CACHE_EXPIRY_SECONDS)
 
-    return {"access_token": password, "token_type": "bearer"} # swagger schema requirement
\ No newline at end of file
+    return {"access_token": password, "token_type": "bearer"} # swagger schema requirement
+
+
+@router.post("/revoke", status_code=204, tags=["Authentication"])
+async def revoke_session_token(
+    token: str = Depends(oauth2_scheme),
+    settings: WorkerSettings = Depends(get_settings),
+):
+    """Drop every cached lookup of the caller's session token (call on sign-out).
+
+    Clears this isolate's memory entry and the KV entries at once; other
+    isolates stop trusting the token within ``session_cache.SESSION_TTL``.
+    """
+    session_cache.revoke(token)
+    if settings.kv:
+        await settings.kv.delete(f"session_token:{token}")
+        await settings.kv.delete(f"session:{token}")
+    return Response(status_code=204)
@@ -1,25 +1,47 @@
 # src/routers/content.py
-from fastapi import APIRouter, Depends, Query, Response, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, Query, Request, Response, HTTPException
+from pydantic import TypeAdapter, ValidationError
 
-from dependencies import get_sanity, get_settings, require_authenticated_user
+from dependencies import (
+    get_sanity, get_settings, get_content_cache, require_authenticated_user, use_sanity_cdn
+)
 from models.settings import WorkerSettings
+from services.content_cache import ContentCache, combined_ttl, content_tags
 from services.sanity_client import SanityClient
+from services.sanity_webhook import verify_signature, affected_tags, affected_views
+from services import metrics, search_index, sponsor_stats
+from services.timing import TimedRoute
 from utils.dataset import resolve_dataset
 from models.content import (
     PageResponse, EventResponse, SponsorResponse, ProjectResponse,
-    SearchResult, SearchRequest, MutationRequest
+    SearchResult, SearchRequest, MutationRequest,
+    BatchRequest, BatchSubRequest, BatchResponse,
+    SanityWebhookEvent, WebhookResult
 )
 from queries.sponsors import GET_SPONSORS
 from queries.events import GET_EVENTS
 from queries.pages import GET_PAGES
 from queries.projects import GET_PROJECTS
 from queries.search import SEARCH_QUERY
+from utils.groq import combine_queries
+
+# Public content reads go to Sanity's API CDN; mutations always hit the live API.
+router = APIRouter(
+    prefix="/content",
+    tags=["Content"],
+    dependencies=[Depends(use_sanity_cdn)],
+    route_class=TimedRoute,
+)
 
-router = APIRouter(prefix="/content", tags=["Content"])
+def set_cache_header(response: Response, cache_status: str | None = None):
+    """AC9: Set Cache-Control header for GET endpoints.
 
-def set_cache_header(response: Response):
-    """AC9: Set Cache-Control header for GET endpoints."""
+    ``cache_status`` (HIT / STALE / MISS from ``ContentCache``) is surfaced
+    as ``X-Cache`` so edge and client logs show which tier answered.
+    """
     response.headers["Cache-Control"] = "public, max-age=60"
+    if cache_status:
+        response.headers["X-Cache"] = cache_status
 
 
 def _build_params(**kwargs) -> dict:
@@ -31,11 +53,15 @@ def _build_params(**kwargs) -> dict:
 async def get_pages(
     response: Response,
     site: str = Query("capstone", description="Target site/workspace"),
-    sanity: SanityClient = Depends(get_sanity)
+    sanity: SanityClient = Depends(get_sanity),
+    cache: ContentCache = Depends(get_content_cache),
 ):
     dataset, site_filter = resolve_dataset(site)
-    result = await sanity.query(GET_PAGES, dataset, _build_params(site=site_filter))
-    set_cache_header(response)
+    result, cache_status = await cache.query(
+        "pages", sanity, GET_PAGES, dataset, _build_params(site=site_filter),
+        tags=content_tags(dataset, site_filter, ["pages"]),
+    )
+    set_cache_header(response, cache_status)
     return result
 
 @router.get("/events", response_model=list[EventResponse])
@@ -44,14 +70,18 @@ async def get_events(
     site: str = Query("capstone", description="Target site/workspace"),
     upcoming: bool = Query(True, description="Only show future events"),
     limit: int = Query(10, ge=1, le=100, description="Max events to return"),
-    sanity: SanityClient = Depends(get_sanity)
+    sanity: SanityClient = Depends(get_sanity),
+    cache: ContentCache = Depends(get_content_cache),
 ):
     dataset, site_filter = resolve_dataset(site)
     params = _build_params(site=site_filter)
     params["upcoming"] = upcoming
     params["limit"] = limit
-    result = await sanity.query(GET_EVENTS, dataset, params)
-    set_cache_header(response)
+    result, cache_status = await cache.query(
+        "events", sanity, GET_EVENTS, dataset, params,
+        tags=content_tags(dataset, site_filter, ["events"]),
+    )
+    set_cache_header(response, cache_status)
     return result
 
 @router.get("/sponsors", response_model=list[SponsorResponse])
@@ -60,38 +90,130 @@ async def get_sponsors(
     site: str = Query("capstone", description="Target site/workspace"),
     tier: str | None = Query(None, description="Filter by tier (e.g. platinum, gold)"),
     featured: bool | None = Query(None, description="Filter by featured status"),
-    sanity: SanityClient = Depends(get_sanity)
+    sanity: SanityClient = Depends(get_sanity),
+    cache: ContentCache = Depends(get_content_cache),
+    settings: WorkerSettings = Depends(get_settings),
 ):
     dataset, site_filter = resolve_dataset(site)
-    result = await sanity.query(
-        GET_SPONSORS, dataset,
-        _build_params(site=site_filter, tier=tier, featured=featured)
+    result, cache_status = await cache.query(
+        "sponsors", sanity, GET_SPONSORS, dataset,
+        _build_params(site=site_filter, tier=tier, featured=featured),
+        tags=content_tags(dataset, site_filter, ["sponsors"]),
     )
-    set_cache_header(response)
-    return result
+    counts = await sponsor_stats.get_project_counts(settings.kv, sanity, dataset, site_filter)
+    set_cache_header(response, cache_status)
+    return sponsor_stats.with_project_counts(result or [], counts)
 
 @router.get("/projects", response_model=list[ProjectResponse])
 async def get_projects(
     response: Response,
     site: str = Query("capstone", description="Target site/workspace"),
     sponsor: str | None = Query(None, description="Filter by sponsor slug"),
-    sanity: SanityClient = Depends(get_sanity)
+    sanity: SanityClient = Depends(get_sanity),
+    cache: ContentCache = Depends(get_content_cache),
 ):
     dataset, site_filter = resolve_dataset(site)
-    result = await sanity.query(
-        GET_PROJECTS, dataset,
-        _build_params(site=site_filter, sponsor=sponsor)
+    result, cache_status = await cache.query(
+        "projects", sanity, GET_PROJECTS, dataset,
+        _build_params(site=site_filter, sponsor=sponsor),
+        tags=content_tags(dataset, site_filter, ["projects"]),
     )
-    set_cache_header(response)
+    set_cache_header(response, cache_status)
+    return result
+
+# resource -> (GROQ, response item model) for /batch sub-requests
+_BATCH_RESOURCES = {
+    "pages": (GET_PAGES, PageResponse),
+    "events": (GET_EVENTS, EventResponse),
+    "sponsors": (GET_SPONSORS, SponsorResponse),
+    "projects": (GET_PROJECTS, ProjectResponse),
+}
+
+
+def _batch_params(sub: BatchSubRequest, site_filter: str | None) -> dict:
+    """Same params the matching GET endpoint would send to Sanity."""
+    if sub.resource == "events":
+        return {"site": site_filter, "upcoming": sub.upcoming, "limit": sub.limit}
+    if sub.resource == "sponsors":
+        return _build_params(site=site_filter, tier=sub.tier, featured=sub.featured)
+    if sub.resource == "projects":
+        return _build_params(site=site_filter, sponsor=sub.sponsor)
+    return _build_params(site=site_filter)
+
+
+@router.post("/batch", response_model=BatchResponse)
+async def get_batch(
+    request: BatchRequest,
+    response: Response,
+    sanity: SanityClient = Depends(get_sanity),
+    cache: ContentCache = Depends(get_content_cache),
+    settings: WorkerSettings = Depends(get_settings),
+):
+    """Resolve several content lists in one Sanity round trip.
+
+    The sub-requests are compiled into a single GROQ object projection
+    (``{"events": *[...], "sponsors": *[...]}``) and every part is validated
+    against the response model of its GET endpoint.
+    """
+    dataset, site_filter = resolve_dataset(request.site)
+    groq, params = combine_queries({
+        sub.name: (_BATCH_RESOURCES[sub.resource][0], _batch_params(sub, site_filter))
+        for sub in request.requests
+    })
+    resources = [sub.resource for sub in request.requests]
+    raw, cache_status = await cache.query(
+        "batch", sanity, groq, dataset, params,
+        ttl=combined_ttl(resources),
+        tags=content_tags(dataset, site_filter, resources),
+    )
+    response.headers["X-Cache"] = cache_status
+
+    counts = None
+    if "sponsors" in resources:
+        counts = await sponsor_stats.get_project_counts(settings.kv, sanity, dataset, site_filter)
+
+    result = {}
+    for sub in request.requests:
+        model = _BATCH_RESOURCES[sub.resource][1]
+        part = (raw or {}).get(sub.name) or []
+        if sub.resource == "sponsors":
+            part = sponsor_stats.with_project_counts(part, counts)
+        items = TypeAdapter(list[model]).validate_python(part)
+        result[sub.name] = [item.model_dump(by_alias=True) for item in items]
     return result
 
 @router.post("/search", response_model=list[SearchResult])
 async def search_content(
     request: SearchRequest,
-    sanity: SanityClient = Depends(get_sanity)
+    response: Response,
+    background_tasks: BackgroundTasks,
+    sanity: SanityClient = Depends(get_sanity),
+    settings: WorkerSettings = Depends(get_settings),
 ):
+    """Search events, sponsors and projects by title, name and description.
+
+    Answered from the local inverted index (``services/search_index.py``).
+    Until a site has an index, the request falls back to a GROQ ``match``
+    query and an index build is scheduled after the response. Requests for
+    a type the index does not hold (``INDEXED_TYPES``) always use the GROQ
+    query (``X-Cache: BYPASS``).
+    """
     dataset, site_filter = resolve_dataset(request.site)
 
+    if set(request.types) <= set(search_index.INDEXED_TYPES):
+        index = await search_index.load(settings.kv, dataset, site_filter)
+        if index is not None:
+            response.headers["X-Cache"] = "HIT"
+            metrics.increment(metrics.SEARCH_INDEX, dimension="HIT")
+            return index.search(request.query, request.types)
+
+        background_tasks.add_task(search_index.build_missing, settings.kv, sanity, dataset, site_filter)
+        status = "MISS"
+    else:
+        status = "BYPASS"
+    response.headers["X-Cache"] = status
+    metrics.increment(metrics.SEARCH_INDEX, dimension=status)
+
     search_term = f"{request.query}*"
     params = _build_params(site=site_filter)
     params["searchTerm"] = search_term
@@ -123,3 +245,58 @@ async def proxy_mutations(
     # Convert typed mutation models back to dicts for the Sanity API
     raw_mutations = [m.model_dump(exclude_none=True) for m in request.mutations]
     return await sanity.mutate(raw_mutations, request.dataset, write_token)
+
+@router.post("/webhook", response_model=WebhookResult)
+async def sanity_webhook(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    settings: WorkerSettings = Depends(get_settings),
+    sanity: SanityClient = Depends(get_sanity),
+    cache: ContentCache = Depends(get_content_cache),
+):
+    """Invalidate cached content affected by a Sanity document change.
+
+    Called by a Sanity GROQ-powered webhook on create/update/delete. The
+    ``sanity-webhook-signature`` header is verified against
+    ``SANITY_WEBHOOK_SECRET`` before anything is touched. After the
+    response is sent, project changes rebuild the sponsor project counts
+    and searchable documents are updated in the search index.
+    """
+    secret = settings.optional_secrets.get("sanity_webhook_secret")
+    if not secret:
+        raise HTTPException(status_code=503, detail="Webhook secret not configured")
+
+    body = await request.body()
+    if not verify_signature(body, request.headers.get("sanity-webhook-signature"), secret):
+        raise HTTPException(status_code=401, detail="Invalid webhook signature")
+
+    try:
+        event = SanityWebhookEvent.model_validate_json(body)
+    except ValidationError:
+        raise HTTPException(status_code=400, detail="Malformed webhook payload")
+
+    dataset = event.dataset or request.headers.get("sanity-dataset")
+    if not dataset:
+        raise HTTPException(status_code=400, detail="Webhook payload has no dataset")
+    metrics.increment(metrics.WEBHOOK_EVENTS, dimension=event.type)
+
+    tags = affected_tags(dataset, event.type, event.site)
+    invalidated = await cache.invalidate(tags)
+    views = affected_views(dataset, event.site)
+    # The API CDN can still hold the pre-publish document; re-read live.
+    live = sanity.with_read_mode("live")
+    if event.type == "project":
+        for view_dataset, site_filter in views:
+            background_tasks.add_task(
+                sponsor_stats.refresh_project_counts,
+                settings.kv, live, view_dataset, site_filter,
+            )
+    if event.type in search_index.INDEXED_TYPES:
+        doc = event.model_dump(by_alias=True, include={"id", "type", "title", "name", "description"})
+        for view_dataset, site_filter in views:
+            background_tasks.add_task(
+                search_index.apply_change,
+                settings.kv, view_dataset, site_filter, doc,
+                deleted=event.operation == "delete",
+            )
+    return WebhookResult(invalidated=invalidated, tags=tags)
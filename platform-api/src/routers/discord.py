@@ -7,21 +7,20 @@ import time
 from models.settings import WorkerSettings
 from models.discord import DiscordNotification, NotificationResult, COLOR_PRESETS
 from dependencies import get_settings
+from services import discord_queue
 from services.discord_client import post_webhook
+from services.rate_limiter import RateLimit, get_rate_limiter
+from services.runtime_config import discord_webhook, get_runtime_config
+from services.timing import TimedRoute
 
-router = APIRouter(prefix="/discord", tags=["Discord"])
+router = APIRouter(prefix="/discord", tags=["Discord"], route_class=TimedRoute)
 
 # --- Helpers ---
 
-async def is_channel_rate_limited(channel: str, kv) -> bool:
-    key = f"rate:discord:{channel}"
-    count = int(await kv.get(key) or "0")
-    return count >= 30
-
-async def increment_channel_rate(channel: str, kv):
-    key = f"rate:discord:{channel}"
-    count = int(await kv.get(key) or "0")
-    await kv.put(key, str(count + 1), expirationTtl=60)
+async def is_channel_rate_limited(channel: str, limiter, limit: RateLimit) -> bool:
+    """Record one notification for ``channel``; True if it exceeds ``limit``."""
+    decision = await limiter.hit(channel, limit)
+    return not decision.allowed
 
 
 # --- Endpoints ---
@@ -35,15 +34,26 @@ async def send_notification(
     if not settings.kv:
         raise HTTPException(500, "KV namespace not configured")
 
-    # 1. Get webhook URL from KV
-    webhook_url = await settings.kv.get(f"discord-webhook:{body.channel}")
+    # 1. Get webhook URL from the runtime config bundle
+    webhook_url = await discord_webhook(settings.kv, body.channel)
     if not webhook_url:
         raise HTTPException(400, f"Unknown channel: {body.channel}")
 
-    # 2. Rate limit (Max 30 per minute per channel) - check and increment atomically before sending
-    if await is_channel_rate_limited(body.channel, settings.kv):
-        raise HTTPException(429, "Rate limit: max 30 notifications per minute per channel")
-    await increment_channel_rate(body.channel, settings.kv)
+    return await deliver_notification(body, webhook_url, settings, background_tasks)
+
+
+async def deliver_notification(
+    body: DiscordNotification,
+    webhook_url: str,
+    settings: WorkerSettings,
+    background_tasks: BackgroundTasks,
+):
+    """Rate limit, build and send ``body`` to an already resolved webhook."""
+    # 2. Rate limit (30 per minute per channel unless the config bundle says otherwise) -
+    # one atomic check-and-record before sending
+    limit = (await get_runtime_config(settings.kv)).channel_limit(body.channel)
+    if await is_channel_rate_limited(body.channel, get_rate_limiter(settings), limit):
+        raise HTTPException(429, f"Rate limit: max {limit.max_requests} notifications per minute per channel")
 
     # 3. Build Embed
     embed = {
@@ -57,15 +67,28 @@ async def send_notification(
 
     # 4. Send (Sync or Async)
     if body.async_mode:
-        # Fire-and-forget: Return 202 immediately, send in background
-        background_tasks.add_task(post_webhook, webhook_url, embed)
-        result = NotificationResult(channel=body.channel, sent=True, message="Queued")
-        return JSONResponse(
-            status_code=202,
-            content=result.model_dump()
-        )
+        # Fire-and-forget: Return 202 immediately, delivered by the queue consumer
+        await discord_queue.enqueue(settings, webhook_url, embed, background_tasks, deliver=post_webhook)
+        return _queued(body.channel, "Queued")
 
     # Synchronous send
-    await post_webhook(webhook_url, embed)
+    try:
+        await post_webhook(webhook_url, embed)
+    except HTTPException as exc:
+        if exc.status_code != 503:
+            raise
+        _, retry_after = discord_queue.classify_failure(exc)
+        # Discord is rate limiting this webhook — hand it to the queue
+        # instead of failing the caller.
+        await discord_queue.enqueue(
+            settings, webhook_url, embed, background_tasks,
+            deliver=post_webhook, delay_seconds=discord_queue.backoff_seconds(1, retry_after),
+        )
+        return _queued(body.channel, "Queued for retry")
+
+    return NotificationResult(channel=body.channel, sent=True)
+
 
-    return NotificationResult(channel=body.channel, sent=True)
\ No newline at end of file
+def _queued(channel: str, message: str) -> JSONResponse:
+    result = NotificationResult(channel=channel, sent=True, message=message)
+    return JSONResponse(status_code=202, content=result.model_dump())
\ No newline at end of file
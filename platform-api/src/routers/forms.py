@@ -1,18 +1,23 @@
 from fastapi import HTTPException, Depends, Request, APIRouter, Query, BackgroundTasks
 from models.forms import SubmissionResponse, FormSubmission, SubmissionListItem
+from models.common import PaginatedResponse
 from models.settings import WorkerSettings
 from models.discord import DiscordNotification, EmbedField
-from routers.discord import send_notification
+from routers.discord import deliver_notification
 from services.sanity_client import SanityClient
+from services import metrics, submission_outbox
+from services.rate_limiter import FORMS_LIMIT, get_rate_limiter
+from services.runtime_config import discord_webhook
+from services.timing import TimedRoute
 from services.turnstile import verify_turnstile
 from dependencies import get_settings, get_sanity, require_authenticated_user
-from datetime import datetime, timezone
 from utils.dataset import resolve_dataset
-import logging, uuid, asyncio, httpx
+from utils.pagination import encode_cursor, decode_cursor
+import logging, asyncio, httpx
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/forms", tags=["forms"])
+router = APIRouter(prefix="/forms", tags=["forms"], route_class=TimedRoute)
 
 @router.post("/submit", response_model=SubmissionResponse)
 async def submit_form(request: Request, body: FormSubmission, background_tasks: BackgroundTasks, settings: WorkerSettings = Depends(get_settings), sanity = Depends(get_sanity)):
@@ -20,64 +25,91 @@ async def submit_form(request: Request, body: FormSubmission, background_tasks:
     if not client_ip:
         raise HTTPException(400, "Missing CF-Connecting-IP header")
 
-    # Rate limit - use composite key to mitigate distributed abuse
+    # Rate limit (composite key to mitigate distributed abuse) and Turnstile
+    # are independent upstream checks — run them concurrently
     rate_limit_key = f"{client_ip}:{body.email}:{body.site}"
+    limited, human = await asyncio.gather(
+        is_rate_limited(rate_limit_key, get_rate_limiter(settings)),
+        verify_turnstile(body.turnstile_token, client_ip, settings.optional_secrets.get("turnstile_secret_key")),
+    )
 
-    if await is_rate_limited(rate_limit_key, settings.kv):
+    if limited:
         raise HTTPException(429, "Rate limit exceeded — max 5 submissions per hour")
-    await increment_rate_limit(rate_limit_key, settings.kv)
-
-    # Turnstile
-    if not await verify_turnstile(body.turnstile_token, client_ip, settings.optional_secrets.get("turnstile_secret_key")):
+    if not human:
         raise HTTPException(400, "Turnstile verification failed")
 
-    # Create Sanity submission document
-    doc_id = await create_submission(body, settings, sanity)
+    # Persist the Sanity submission document (D1 outbox, flushed after the response)
+    doc_id = await create_submission(body, settings, sanity, background_tasks)
+    metrics.increment(metrics.FORM_SUBMISSIONS, dimension=body.site)
 
     # Discord notification
     await notify_discord(body, settings, background_tasks)
 
     return SubmissionResponse(id=doc_id)
 
-@router.get("/submissions", response_model=list[SubmissionListItem])
+@router.get("/submissions", response_model=PaginatedResponse[SubmissionListItem])
 async def list_submissions(
     site: str = Query("capstone", description="Target site/workspace"),
     limit: int = Query(20, ge=1, le=100, description="Max records to return"),
-    offset: int = Query(0, ge=0, description="Number of records to skip for pagination"),
+    cursor: str | None = Query(None, description="next_cursor from the previous page"),
+    include_total: bool = Query(False, description="Also count all matching submissions"),
     sanity: SanityClient = Depends(get_sanity),
     _admin = Depends(require_authenticated_user)  # Protect route
 ):
-    """Admin-only endpoint to list recent submissions."""
+    """Admin-only endpoint to list recent submissions, newest first.
+
+    Pages are keyed on ``(submittedAt, _id)``: each page filters past the
+    previous page's last row instead of skipping an offset, so every page
+    costs the same however deep it is. Legacy rows without ``submittedAt``
+    are keyed (and listed) by ``_createdAt`` instead.
+    """
     dataset, site_filter = resolve_dataset(site)
 
-    # GROQ query to fetch submissions with pagination using parameters
     site_predicate = "&& site == $site" if site_filter else ""
-    end_index = offset + limit
-    query = f"""
-    *[_type == 'submission' {site_predicate}] | order(submittedAt desc)[$offset...$end] {{
-        _id, name, email, organization, submittedAt, status, formType, site
-    }}
-    """
-    params = {"offset": offset, "end": end_index}
+    cursor_predicate = ""
+    # One extra row tells us whether another page exists.
+    params = {"fetch": limit + 1}
     if site_filter:
         params["site"] = site_filter
+    if cursor:
+        params["cursorAt"], params["cursorId"] = decode_cursor(cursor, 2)
+        cursor_predicate = (
+            "&& (coalesce(submittedAt, _createdAt) < $cursorAt"
+            " || (coalesce(submittedAt, _createdAt) == $cursorAt && _id < $cursorId))"
+        )
 
-    return await sanity.query(query, dataset, params)
-
-async def is_rate_limited(ip: str, kv) -> bool:
-    key = f"rate:forms:{ip}"
-    count = int(await kv.get(key) or "0")
-    return count >= 5
+    page_query = f"""*[_type == 'submission' {site_predicate} {cursor_predicate}]
+        | order(coalesce(submittedAt, _createdAt) desc, _id desc)[0...$fetch] {{
+        _id, name, email, organization, "submittedAt": coalesce(submittedAt, _createdAt),
+        status, formType, site
+    }}"""
+    if include_total:
+        # Counted in the same round trip, only when asked for.
+        query = f"""{{
+        "items": {page_query},
+        "total": count(*[_type == 'submission' {site_predicate}])
+    }}"""
+        result = await sanity.query(query, dataset, params) or {}
+        rows, total = result.get("items") or [], result.get("total")
+    else:
+        rows, total = await sanity.query(page_query, dataset, params) or [], None
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["submittedAt"], rows[-1]["_id"])
+
+    return PaginatedResponse[SubmissionListItem](
+        items=rows, total=total, limit=limit, next_cursor=next_cursor
+    )
 
-async def increment_rate_limit(ip: str, kv):
-    key = f"rate:forms:{ip}"
-    count = int(await kv.get(key) or "0")
-    await kv.put(key, str(count + 1), expirationTtl=3600)
+async def is_rate_limited(key: str, limiter) -> bool:
+    """Record one submission for ``key``; True if it exceeds ``FORMS_LIMIT``."""
+    decision = await limiter.hit(key, FORMS_LIMIT)
+    return not decision.allowed
 
 async def notify_discord(body: FormSubmission, settings: WorkerSettings, background_tasks: BackgroundTasks):
-    # Look up webhook URL from KV using a configurable key per site
-    webhook_key = "discord-webhook:form-submissions"
-    webhook_url = await settings.kv.get(webhook_key) if settings.kv else None
+    webhook_url = await discord_webhook(settings.kv, "form-submissions")
     if not webhook_url:
         return
     
@@ -96,7 +128,7 @@ async def notify_discord(body: FormSubmission, settings: WorkerSettings, backgro
     )
 
     try:
-        await send_notification(embed, background_tasks, settings)
+        await deliver_notification(embed, webhook_url, settings, background_tasks)
     except (httpx.HTTPError, asyncio.TimeoutError):
         # Log the exception with context, but don't break submission flow
         logger.exception(
@@ -104,29 +136,29 @@ async def notify_discord(body: FormSubmission, settings: WorkerSettings, backgro
         )
         raise
 
-async def create_submission(body: FormSubmission, settings: WorkerSettings, sanity: SanityClient) -> str:
-    """Creates a new submission document in Sanity."""
+async def create_submission(
+    body: FormSubmission,
+    settings: WorkerSettings,
+    sanity: SanityClient,
+    background_tasks: BackgroundTasks,
+) -> str:
+    """Stores a new submission document for Sanity.
+
+    With D1 bound, the document goes to the outbox and is flushed to Sanity
+    after the response (``services/submission_outbox.py``); without it, it
+    is created in Sanity directly.
+    """
     write_token = settings.optional_secrets.get("sanity_api_write_token")
     if not write_token:
         raise HTTPException(status_code=500, detail="Missing sanity_api_write_token")
 
-    doc_id = f"submission.{uuid.uuid4()}"
-    doc = {
-        "_id": doc_id,
-        "_type": "submission",
-        "name": body.name,
-        "email": body.email,
-        "organization": body.organization,
-        "message": body.message,
-        "submittedAt": datetime.now(timezone.utc).isoformat(),
-        "status": "submitted",
-        "formType": body.form_type,
-        "site": body.site
-    }
-
+    doc = submission_outbox.new_document(body)
     dataset, _ = resolve_dataset(body.site)
 
-    # Submissions are global, default to production dataset
-    await sanity.mutate([{"create": doc}], dataset=dataset, write_token=write_token)
-    
-    return doc_id
\ No newline at end of file
+    if settings.db is None:
+        await sanity.mutate([{"create": doc}], dataset=dataset, write_token=write_token)
+        return doc["_id"]
+
+    await submission_outbox.enqueue(settings.db, dataset, doc)
+    background_tasks.add_task(submission_outbox.flush, settings.db, sanity, write_token)
+    return doc["_id"]
\ No newline at end of file
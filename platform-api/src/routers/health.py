@@ -40,10 +40,11 @@ from fastapi import APIRouter, Depends
 from dependencies import get_settings
 from models.common import HealthResponse, ServiceCheck
 from models.settings import WorkerSettings
-from urllib.parse import urlparse
-from services.discord_client import ALLOWED_WEBHOOK_HOSTS
+from services.discord_client import validate_webhook_url
+from services.runtime_config import REQUIRED_WEBHOOKS, discord_webhook, get_runtime_config
+from services.timing import TimedRoute
 
-router = APIRouter(tags=["health"])
+router = APIRouter(tags=["health"], route_class=TimedRoute)
 
 
 # ---------------------------------------------------------------------------
@@ -227,40 +228,35 @@ def _check_optional_secrets(settings: WorkerSettings) -> ServiceCheck:
     )
 
 async def _check_discord_webhooks(settings: WorkerSettings) -> ServiceCheck:
-    configured_webhooks = [False, False, False, False]
+    """Verify that every required Discord webhook is configured and valid.
 
-    async def check_webhook(webhook_role: str):
-        try:
-            webhook = await settings.kv.get(f"discord-webhook:{webhook_role}")
+    With a published config bundle (``services.runtime_config``) the
+    webhooks were validated when the isolate loaded it, so this costs no
+    KV reads. Without one, the legacy per-channel keys are read
+    concurrently and validated here.
 
+    Args:
+        settings: The validated Worker configuration.
+
+    Returns:
+        A ``ServiceCheck`` with ``"ok"`` if all required webhooks are set,
+        or ``"degraded"`` if any is missing or invalid.
+    """
+    config = await get_runtime_config(settings.kv)
+
+    async def check_webhook(channel: str) -> bool:
+        try:
+            webhook = await discord_webhook(settings.kv, channel)
             if not webhook:
-                raise ValueError(f"{webhook_role} discord webhook not configured")
-            webhook = webhook.strip('"')
-            
-
-            parsed = urlparse(webhook)
-            if not parsed.hostname or parsed.hostname not in ALLOWED_WEBHOOK_HOSTS:
-                raise ValueError("invalid_webhook")
-            if parsed.scheme != "https":
-                raise ValueError("invalid_webhook")
-            if not parsed.path.startswith("/api/webhooks/"):
-                raise ValueError("invalid_webhook")
-        except:
+                return False
+            if config.version is None:
+                validate_webhook_url(webhook)
+        except Exception:
             return False
         return True
-    
-    hook_checks = {
-        "announcements": True,
-        "events": True,
-        "bot-audit": True,
-        "form-submissions": True
-    }
-
-    for hook_role in hook_checks:
-        result = await check_webhook(hook_role)
-        hook_checks[hook_role] = result
-
-    all_ok = False not in hook_checks.values()
+
+    results = await asyncio.gather(*(check_webhook(channel) for channel in REQUIRED_WEBHOOKS))
+    all_ok = all(results)
 
     return ServiceCheck(
         status="ok" if all_ok else "degraded",
@@ -1,14 +1,19 @@
 # src/routers/platform.py
 import asyncio
+import logging
 from typing import Literal
 from fastapi import APIRouter, Depends, HTTPException, Query
-from models.platform import DeployStatus, RebuildResponse, AnalyticsResponse
+from models.platform import DeployStatus, DeployStatusAll, DeployStatusError, RebuildResponse, AnalyticsResponse
 from models.settings import WorkerSettings
 from dependencies import get_settings, require_authenticated_user
-from services.cf_client import get_deploy_status, get_cf_analytics
+from services.cf_client import get_deploy_status, get_deploy_statuses, get_cf_analytics
 from services.http_client import get_client
+from services.runtime_config import get_runtime_config
+from services.timing import TimedRoute
 
-router = APIRouter(prefix="/platform", tags=["Platform"])
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/platform", tags=["Platform"], route_class=TimedRoute)
 
 @router.get("/deploy-status", response_model=DeployStatus)
 async def deploy_status(
@@ -16,6 +21,30 @@ async def deploy_status(
     settings: WorkerSettings = Depends(get_settings)
 ):
     data = await get_deploy_status(site, settings)
+    return to_deploy_status(site, data)
+
+@router.get("/deploy-status/all", response_model=DeployStatusAll)
+async def deploy_status_all(settings: WorkerSettings = Depends(get_settings)):
+    """Deploy status of every site in one call.
+
+    Sites are resolved concurrently; a site that fails is listed under
+    ``errors`` while the others are still returned.
+    """
+    sites = list((await get_runtime_config(settings.kv)).projects())
+    results = await get_deploy_statuses(sites, settings)
+    statuses, errors = [], []
+    for site, data in results.items():
+        if isinstance(data, HTTPException):
+            errors.append(DeployStatusError(site=site, status_code=data.status_code, detail=data.detail))
+        elif isinstance(data, Exception):
+            logger.error("Deploy status lookup failed for %s", site, exc_info=data)
+            errors.append(DeployStatusError(site=site, status_code=502, detail="Cloudflare API request failed"))
+        else:
+            statuses.append(to_deploy_status(site, data))
+    return DeployStatusAll(sites=statuses, errors=errors)
+
+def to_deploy_status(site: str, data: dict | None) -> DeployStatus:
+    """Map a Cloudflare Pages deployment (or cache sentinel) to ``DeployStatus``."""
     if not data:
         return DeployStatus(site=site, status="unknown")
     # Explicitly map "no_deployments" sentinel to "unknown" status before the cf_status mapping below
@@ -48,11 +77,8 @@ async def rebuild(
     settings: WorkerSettings = Depends(get_settings),
     _admin = Depends(require_authenticated_user)
 ):
-    # Import SITE_TO_CF_PROJECT for validation
-    from services.cf_client import SITE_TO_CF_PROJECT
-
     # Validate the incoming site against known sites
-    if site not in SITE_TO_CF_PROJECT:
+    if site not in (await get_runtime_config(settings.kv)).projects():
         raise HTTPException(400, f"Unknown site: {site}")
 
     # Normalize site name (replace hyphens with underscores for secret lookup)
@@ -67,7 +93,7 @@ async def rebuild(
     if "{hook_id}" in hook_url or not hook_url.startswith("https://"):
         raise HTTPException(500, f"Invalid deploy hook URL for site: {site}")
 
-    async with get_client() as client:
+    async with get_client(origin=hook_url) as client:
         resp = await client.post(hook_url)
         success = 200 <= resp.status_code < 300
         return RebuildResponse(
@@ -0,0 +1,130 @@
+"""Hourly Analytics Engine series, stored once and refreshed by delta.
+
+``GET /platform/analytics`` used to send a GraphQL query to Cloudflare on
+every dashboard refresh, re-reading up to 30 days of hourly buckets each
+time. Instead, each metric's hourly buckets for the last ``RETENTION`` are
+kept in KV under ``analytics-rollup:<metric>`` (and in isolate memory), and
+the ``24h``/``7d``/``30d`` periods are slices of that one series.
+
+A stored series younger than ``REFRESH_SECONDS`` is served as-is, so a
+dashboard polling every few seconds costs at most one GraphQL call per
+metric per minute across all isolates. An older one is topped up with only
+the hours since it was last fetched — re-reading the hour that was still
+in progress then — and concurrent refreshes in one isolate share a single
+upstream call.
+"""
+
+import json
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable
+
+from services import request_kv
+from services.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "analytics-rollup:"
+
+# Longest period the endpoint serves (``30d``).
+RETENTION = timedelta(days=30)
+
+# Stored series younger than this are served without asking Cloudflare.
+REFRESH_SECONDS = 60
+
+# The KV copy outlives the retention window so idle metrics resume by delta.
+KV_TTL_SECONDS = 31 * 24 * 60 * 60
+
+HOUR_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+# ``fetch(since)`` returns ``[{"datetime": <hour>, "value": <sum>}, ...]``
+# for every hour bucket at or after ``since``.
+FetchHours = Callable[[datetime], Awaitable[list[dict]]]
+
+_memory: dict[str, dict] = {}
+_inflight = SingleFlight()
+
+
+def reset():
+    """Forget the in-isolate copies (tests)."""
+    _memory.clear()
+
+
+def rollup_key(metric: str) -> str:
+    return f"{KEY_PREFIX}{metric}"
+
+
+def floor_hour(moment: datetime) -> datetime:
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def _hour_key(value: str | datetime) -> str:
+    """Normalize a bucket timestamp to ``HOUR_FORMAT`` (UTC) so keys sort."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return floor_hour(value.astimezone(timezone.utc)).strftime(HOUR_FORMAT)
+
+
+async def hourly_series(kv, metric: str, since: datetime, fetch: FetchHours) -> list[dict]:
+    """Hourly ``{"datetime", "value"}`` buckets of ``metric`` from ``since`` on.
+
+    ``since`` may be at most ``RETENTION`` ago. Only calls ``fetch`` when
+    the stored series is older than ``REFRESH_SECONDS``.
+    """
+    rollup = await _load(kv, metric)
+    if rollup is None or time.time() - rollup["fetched_at"] >= REFRESH_SECONDS:
+        rollup = await _inflight.do(metric, lambda: _refresh(kv, metric, rollup, fetch))
+
+    start = _hour_key(since)
+    return [
+        {"datetime": hour, "value": value}
+        for hour, value in sorted(rollup["buckets"].items())
+        if hour >= start
+    ]
+
+
+async def _load(kv, metric: str) -> dict | None:
+    rollup = _memory.get(metric)
+    if rollup is not None and time.time() - rollup["fetched_at"] < REFRESH_SECONDS:
+        return rollup
+    if kv is not None:
+        try:
+            raw = await kv.get(rollup_key(metric))
+        except Exception:
+            logger.warning("Analytics rollup KV read failed for %s", metric, exc_info=True)
+            raw = None
+        if raw:
+            stored = json.loads(raw)
+            if rollup is None or stored["fetched_at"] > rollup["fetched_at"]:
+                rollup = stored
+                _memory[metric] = rollup
+    return rollup
+
+
+async def _refresh(kv, metric: str, rollup: dict | None, fetch: FetchHours) -> dict:
+    """Fetch the hours missing from ``rollup`` and store the merged series."""
+    now = datetime.now(timezone.utc)
+    oldest = floor_hour(now - RETENTION)
+    if rollup is None:
+        since, buckets = oldest, {}
+    else:
+        last_fetch = datetime.fromtimestamp(rollup["fetched_at"], timezone.utc)
+        # The hour in progress at the last fetch was incomplete; read it again.
+        since, buckets = max(oldest, floor_hour(last_fetch)), dict(rollup["buckets"])
+
+    for bucket in await fetch(since):
+        buckets[_hour_key(bucket["datetime"])] = bucket["value"]
+
+    cutoff = oldest.strftime(HOUR_FORMAT)
+    rollup = {
+        "fetched_at": now.timestamp(),
+        "buckets": {hour: value for hour, value in buckets.items() if hour >= cutoff},
+    }
+    _memory[metric] = rollup
+    if kv is not None:
+        try:
+            await request_kv.wrap(kv).put_later(rollup_key(metric), json.dumps(rollup), expirationTtl=KV_TTL_SECONDS)
+        except Exception:
+            logger.warning("Analytics rollup KV write failed for %s", metric, exc_info=True)
+    return rollup
@@ -1,27 +1,39 @@
+import asyncio
 import json
 import logging
 from fastapi import HTTPException
+from services import analytics_rollup, request_kv
+from services.runtime_config import get_runtime_config
 from services.http_client import get_client
 
 from datetime import datetime, timedelta, timezone
 
 logger = logging.getLogger(__name__)
 
+CF_API_ORIGIN = "https://api.cloudflare.com"
+
 SITE_TO_CF_PROJECT = {
     "capstone": "ywcc-capstone",
     "rwc-us": "rwc-us",
     "rwc-intl": "rwc-intl"
 }
 
-async def get_deploy_status(site: str, settings) -> dict:
-    project_name = SITE_TO_CF_PROJECT.get(site)
+async def get_deploy_status(site: str, settings, client=None) -> dict:
+    """Latest Pages deployment of ``site`` (KV-cached for 60s).
+
+    Args:
+        client: An open client for ``CF_API_ORIGIN`` to reuse (see
+            ``get_deploy_statuses``); one is leased when omitted.
+    """
+    project_name = (await get_runtime_config(settings.kv)).projects().get(site)
     if not project_name:
         raise HTTPException(400, f"Unknown site: {site}")
 
     # Check KV cache first (60s TTL)
+    kv = request_kv.wrap(settings.kv)
     cache_key = f"deploy-status:{site}"
-    if settings.kv:
-        cached = await settings.kv.get(cache_key)
+    if kv:
+        cached = await kv.get(cache_key)
         if cached:
             return json.loads(cached)
 
@@ -31,40 +43,59 @@ async def get_deploy_status(site: str, settings) -> dict:
     if not account_id or not cf_api_token:
         raise HTTPException(500, "Cloudflare credentials not configured")
 
-    async with get_client() as client:
-        url = f"https://api.cloudflare.com/client/v4/accounts/{account_id}/pages/projects/{project_name}/deployments"
-        resp = await client.get(
-            url,
-            headers={"Authorization": f"Bearer {cf_api_token}"},
-            params={"per_page": 1},
-        )
-        if resp.status_code != 200:
-            error_snippet = resp.text[:512]
-            logger.error("Cloudflare API error %s: %s", resp.status_code, error_snippet)
-            raise HTTPException(502, f"Cloudflare API error {resp.status_code}: {error_snippet}")
-
-        response_json = resp.json()
-        if "result" not in response_json:
-            raise HTTPException(502, "Malformed response from Cloudflare: missing 'result' key")
-
-        deployments = response_json["result"]
-        if not deployments:
-            sentinel = {"status": "no_deployments"}
-            # Cache the sentinel to avoid repeated upstream calls
-            if settings.kv:
-                await settings.kv.put(cache_key, json.dumps(sentinel), {"expirationTtl": 60})
-            return sentinel
-
-        result = deployments[0]
-
-    # Cache the result in KV
-    if settings.kv and result:
-        await settings.kv.put(cache_key, json.dumps(result), {"expirationTtl": 60})
-        
+    if client is None:
+        async with get_client(origin=CF_API_ORIGIN) as client:
+            result = await _latest_deployment(client, account_id, cf_api_token, project_name)
+    else:
+        result = await _latest_deployment(client, account_id, cf_api_token, project_name)
+
+    if not result:
+        result = {"status": "no_deployments"}
+    # Cache the result (or the sentinel, to avoid repeated upstream calls) in KV
+    if kv:
+        await kv.put_later(cache_key, json.dumps(result), {"expirationTtl": 60})
+
     return result
 
+async def get_deploy_statuses(sites, settings) -> dict[str, dict | Exception]:
+    """``get_deploy_status`` for several sites at once.
+
+    Sites are resolved concurrently over one shared client, so the total
+    latency is that of the slowest site. A failing site does not fail the
+    others: its entry is the exception it raised.
+    """
+    async with get_client(origin=CF_API_ORIGIN) as client:
+        results = await asyncio.gather(
+            *(get_deploy_status(site, settings, client=client) for site in sites),
+            return_exceptions=True,
+        )
+    return dict(zip(sites, results))
+
+async def _latest_deployment(client, account_id: str, cf_api_token: str, project_name: str) -> dict | None:
+    url = f"https://api.cloudflare.com/client/v4/accounts/{account_id}/pages/projects/{project_name}/deployments"
+    resp = await client.get(
+        url,
+        headers={"Authorization": f"Bearer {cf_api_token}"},
+        params={"per_page": 1},
+    )
+    if resp.status_code != 200:
+        error_snippet = resp.text[:512]
+        logger.error("Cloudflare API error %s: %s", resp.status_code, error_snippet)
+        raise HTTPException(502, f"Cloudflare API error {resp.status_code}: {error_snippet}")
+
+    response_json = resp.json()
+    if "result" not in response_json:
+        raise HTTPException(502, "Malformed response from Cloudflare: missing 'result' key")
+
+    deployments = response_json["result"]
+    return deployments[0] if deployments else None
+
 async def get_cf_analytics(metric: str, period: str, settings) -> list:
-    """Queries Cloudflare's GraphQL Analytics API for custom Analytics Engine metrics."""
+    """Hourly buckets of a custom Analytics Engine metric for ``period``.
+
+    Served from the KV rollup (``services/analytics_rollup.py``), which asks
+    Cloudflare's GraphQL Analytics API only for hours it has not stored yet.
+    """
 
     account_id = settings.optional_secrets.get("cf_account_id")
     cf_api_token = settings.optional_secrets.get("cf_api_token")
@@ -88,7 +119,15 @@ async def get_cf_analytics(metric: str, period: str, settings) -> list:
     else:
         raise HTTPException(400, "Invalid period. Allowed: 24h, 7d, 30d")
 
-    datetime_geq = start_dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+    async def fetch(since: datetime) -> list:
+        return await _query_hourly(metric, since, account_id, cf_api_token)
+
+    return await analytics_rollup.hourly_series(settings.kv, metric, start_dt, fetch)
+
+
+async def _query_hourly(metric: str, since: datetime, account_id: str, cf_api_token: str) -> list:
+    """Queries Cloudflare's GraphQL Analytics API for hourly sums since ``since``."""
+    datetime_geq = since.strftime("%Y-%m-%dT%H:%M:%SZ")
 
     # GraphQL query for Analytics Engine (Groups by Hour) - using variables for safety
     query = """
@@ -118,7 +157,7 @@ async def get_cf_analytics(metric: str, period: str, settings) -> list:
         "metric": metric
     }
 
-    async with get_client() as client:
+    async with get_client(origin=CF_API_ORIGIN) as client:
         resp = await client.post(
             "https://api.cloudflare.com/client/v4/graphql",
             headers={"Authorization": f"Bearer {cf_api_token}"},
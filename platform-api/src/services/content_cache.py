@@ -0,0 +1,377 @@
+"""Read-through cache for Sanity content queries.
+
+``/api/v1/content/*`` responses are public and change only when an editor
+publishes, yet every edge cache miss used to fan out to Sanity. This module
+puts two cache tiers in front of ``SanityClient.query``:
+
+1. **In-isolate LRU** — a bounded ``OrderedDict`` in module state. Workers
+   isolates are reused across requests, so hot queries are answered without
+   any I/O at all.
+2. **KV** — shared by every isolate in every data center (eventually
+   consistent, ~60 s propagation). Survives isolate recycling.
+
+Entries are keyed on a hash of the dataset, GROQ string and normalized
+params (``utils.groq.query_fingerprint``) and carry two lifetimes from the
+route's ``CacheTTL``:
+
+- ``fresh`` — served as-is (``X-Cache: HIT``).
+- ``stale`` — served immediately while a background task re-queries Sanity
+  and refills both tiers (``X-Cache: STALE``, stale-while-revalidate).
+
+Anything older is a miss (``X-Cache: MISS``) and is fetched synchronously.
+Hit/miss counters live in ``stats``.
+
+Invalidation:
+    Every entry is tagged with the ``(dataset, site, _type)`` combinations
+    it depends on (``content_tags``). A tag index maps each tag to its cache
+    keys, so the Sanity webhook (``POST /content/webhook``) deletes exactly
+    the affected entries instead of flushing everything. In KV the index is
+    one record per tag and key (``content-tag:<tag>:<key>``, found with a
+    prefix ``list``), so isolates filling entries concurrently never
+    overwrite each other's index writes. Other isolates re-check their
+    in-memory copies against KV at least every ``L1_RECHECK_SECONDS``, which
+    bounds how long they can serve an invalidated entry.
+
+    Sanity's API CDN can keep answering with the pre-publish document for
+    a short while after the webhook fires, and a refill from it would cache
+    that stale copy again. ``invalidate`` therefore records when each tag
+    was invalidated (in memory and in KV under ``content-invalidated:<tag>``),
+    and fills for a tag invalidated within ``CDN_CATCHUP_SECONDS`` read the
+    live API, published perspective, instead of the CDN.
+"""
+
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, asdict, fields
+
+from fastapi import BackgroundTasks
+
+from services import metrics, request_kv
+from services.sanity_client import SanityClient
+from services.timing import span
+from utils.groq import query_fingerprint
+from utils.js import from_js
+
+logger = logging.getLogger(__name__)
+
+# Maximum entries kept in the in-isolate tier (Workers have 128 MB total).
+L1_MAX_ENTRIES = 256
+
+# KV rejects expirationTtl values below 60 seconds.
+KV_MIN_TTL = 60
+
+# In-memory entries older than this are re-validated against KV, so an
+# invalidation in one isolate reaches the others within this window.
+L1_RECHECK_SECONDS = 30
+
+KEY_PREFIX = "content-cache:"
+TAG_PREFIX = "content-tag:"
+INVALIDATED_PREFIX = "content-invalidated:"
+
+# After an invalidation, fills for its tags bypass the API CDN this long.
+CDN_CATCHUP_SECONDS = 120
+
+
+@dataclass(frozen=True)
+class CacheTTL:
+    """Per-route cache lifetimes in seconds."""
+
+    fresh: int
+    stale: int
+
+
+ROUTE_TTLS: dict[str, CacheTTL] = {
+    "pages": CacheTTL(fresh=300, stale=3600),
+    "events": CacheTTL(fresh=60, stale=600),
+    "sponsors": CacheTTL(fresh=300, stale=3600),
+    "projects": CacheTTL(fresh=300, stale=3600),
+}
+DEFAULT_TTL = CacheTTL(fresh=60, stale=300)
+
+# Document types each route's query reads (sponsors count projects, and
+# projects resolve their sponsor's name).
+ROUTE_TYPES: dict[str, tuple[str, ...]] = {
+    "pages": ("page",),
+    "events": ("event",),
+    # projectCount is joined from services/sponsor_stats.py, not the query.
+    "sponsors": ("sponsor",),
+    "projects": ("project", "sponsor"),
+}
+
+
+def combined_ttl(routes: list[str]) -> CacheTTL:
+    """The most conservative lifetimes across several routes (for batches)."""
+    ttls = [ROUTE_TTLS.get(route, DEFAULT_TTL) for route in routes]
+    return CacheTTL(fresh=min(t.fresh for t in ttls), stale=min(t.stale for t in ttls))
+
+
+@dataclass
+class CacheStats:
+    """Isolate-lifetime counters for the content cache."""
+
+    hits: int = 0
+    stale_hits: int = 0
+    misses: int = 0
+    kv_hits: int = 0
+    kv_errors: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        served = self.hits + self.stale_hits + self.misses
+        return (self.hits + self.stale_hits) / served if served else 0.0
+
+    def as_dict(self) -> dict:
+        return {**asdict(self), "hit_ratio": round(self.hit_ratio, 4)}
+
+    def clear(self):
+        """Zero every counter in place, so imported references stay live."""
+        for counter in fields(self):
+            setattr(self, counter.name, counter.default)
+
+
+stats = CacheStats()
+# key -> (monotonic time the entry was loaded into memory, entry)
+_memory: "OrderedDict[str, tuple[float, dict]]" = OrderedDict()
+_tag_index: dict[str, set[str]] = {}
+_revalidating: set[str] = set()
+_invalidated: dict[str, float] = {}  # tag -> wall time of its last invalidation
+
+
+def reset():
+    """Drop every in-isolate entry and zero the counters (tests, deploys)."""
+    _memory.clear()
+    _tag_index.clear()
+    _revalidating.clear()
+    _invalidated.clear()
+    stats.clear()
+
+
+def cache_key(dataset: str, groq: str, params: dict | None) -> str:
+    return KEY_PREFIX + query_fingerprint(dataset, groq, params)
+
+
+def tag_record(tag: str, key: str) -> str:
+    """KV key of the index record saying ``key`` carries ``tag``."""
+    return f"{TAG_PREFIX}{tag}:{key}"
+
+
+def content_tag(dataset: str, site: str | None, doc_type: str) -> str:
+    """Tag for entries built from ``doc_type`` documents of one dataset/site.
+
+    ``site`` is the GROQ site filter (``None`` for single-site datasets).
+    """
+    return f"{dataset}:{site or '*'}:{doc_type}"
+
+
+def content_tags(dataset: str, site: str | None, routes: list[str] | tuple[str, ...]) -> list[str]:
+    """Tags for a query that serves ``routes`` (see ``ROUTE_TYPES``)."""
+    types = sorted({t for route in routes for t in ROUTE_TYPES.get(route, ())})
+    return [content_tag(dataset, site, t) for t in types]
+
+
+def _remember(key: str, entry: dict):
+    _memory[key] = (time.monotonic(), entry)
+    _memory.move_to_end(key)
+    for tag in entry.get("tags", ()):
+        _tag_index.setdefault(tag, set()).add(key)
+    while len(_memory) > L1_MAX_ENTRIES:
+        _memory.popitem(last=False)
+
+
+def _age(entry: dict) -> float:
+    return time.time() - entry["stored_at"]
+
+
+class ContentCache:
+    """Request-scoped handle on the shared content cache.
+
+    Args:
+        kv: The KV namespace binding, or None to run on the in-isolate tier
+            only.
+        background_tasks: Where stale-while-revalidate refreshes are
+            scheduled. Without it, stale entries are refreshed inline.
+    """
+
+    def __init__(self, kv=None, background_tasks: BackgroundTasks | None = None):
+        self.kv = request_kv.wrap(kv)
+        self.background_tasks = background_tasks
+
+    async def query(
+        self,
+        route: str,
+        sanity: SanityClient,
+        groq: str,
+        dataset: str,
+        params: dict | None = None,
+        ttl: CacheTTL | None = None,
+        tags: list[str] | None = None,
+    ) -> tuple[list | dict, str]:
+        """Run ``groq`` through the cache.
+
+        Args:
+            route: Name used to look up the lifetimes in ``ROUTE_TTLS``.
+            ttl: Explicit lifetimes, overriding ``route``'s.
+            tags: Invalidation tags (``content_tags``) for the entry.
+
+        Returns:
+            ``(result, status)`` where ``status`` is ``"HIT"``, ``"STALE"``
+            or ``"MISS"`` — suitable for an ``X-Cache`` response header.
+        """
+        ttl = ttl or ROUTE_TTLS.get(route, DEFAULT_TTL)
+        key = cache_key(dataset, groq, params)
+        refill = (ttl, tags or [], sanity, groq, dataset, params)
+
+        entry = None
+        if key in _memory:
+            loaded_at, entry = _memory[key]
+            _memory.move_to_end(key)
+            if self.kv is not None and time.monotonic() - loaded_at > L1_RECHECK_SECONDS:
+                entry = None  # may have been invalidated elsewhere — ask KV
+        if entry is None:
+            _memory.pop(key, None)
+            entry = await self._kv_get(key)
+            if entry is not None:
+                stats.kv_hits += 1
+                _remember(key, entry)
+
+        if entry is not None:
+            age = _age(entry)
+            if age < entry["fresh"]:
+                stats.hits += 1
+                metrics.increment(metrics.CONTENT_CACHE, dimension="HIT")
+                return entry["result"], "HIT"
+            if age < entry["fresh"] + entry["stale"]:
+                stats.stale_hits += 1
+                metrics.increment(metrics.CONTENT_CACHE, dimension="STALE")
+                await self._revalidate(key, *refill)
+                return entry["result"], "STALE"
+
+        stats.misses += 1
+        metrics.increment(metrics.CONTENT_CACHE, dimension="MISS")
+        result = await self._refresh(key, *refill)
+        return result, "MISS"
+
+    async def _refresh(self, key, ttl: CacheTTL, tags, sanity, groq, dataset, params):
+        if await self._recently_invalidated(tags):
+            result = await sanity.query(groq, dataset, params, read_mode="live", perspective="published")
+        else:
+            result = await sanity.query(groq, dataset, params)
+        entry = {
+            "result": result,
+            "stored_at": time.time(),
+            "fresh": ttl.fresh,
+            "stale": ttl.stale,
+            "tags": tags,
+        }
+        _remember(key, entry)
+        await self._kv_put(key, entry, ttl)
+        return result
+
+    async def _revalidate(self, key, *refill):
+        if key in _revalidating:
+            return
+
+        async def revalidate():
+            try:
+                await self._refresh(key, *refill)
+            except Exception:
+                logger.exception("Content cache revalidation failed for %s", key)
+            finally:
+                _revalidating.discard(key)
+
+        _revalidating.add(key)
+        if self.background_tasks is not None:
+            self.background_tasks.add_task(revalidate)
+        else:
+            # No response lifecycle to hang the refresh off — do it now.
+            await revalidate()
+
+    async def _recently_invalidated(self, tags) -> bool:
+        """Whether any of ``tags`` was invalidated within ``CDN_CATCHUP_SECONDS``."""
+        now = time.time()
+        for tag in tags:
+            at = _invalidated.get(tag, 0.0)
+            if self.kv is not None:
+                try:
+                    with span("kv"):
+                        raw = await self.kv.get(INVALIDATED_PREFIX + tag)
+                    at = max(at, float(raw)) if raw else at
+                except Exception:
+                    stats.kv_errors += 1
+                    logger.warning("Content cache KV read failed for %s", tag, exc_info=True)
+            if now - at < CDN_CATCHUP_SECONDS:
+                return True
+        return False
+
+    async def _kv_get(self, key: str) -> dict | None:
+        if self.kv is None:
+            return None
+        try:
+            with span("kv"):
+                raw = await self.kv.get(key)
+            return json.loads(raw) if raw else None
+        except Exception:
+            stats.kv_errors += 1
+            logger.warning("Content cache KV read failed for %s", key, exc_info=True)
+            return None
+
+    async def _kv_put(self, key: str, entry: dict, ttl: CacheTTL):
+        """Store ``entry`` and index its tags — after the response, when serving one."""
+        if self.kv is None:
+            return
+        expiration = max(KV_MIN_TTL, ttl.fresh + ttl.stale)
+
+        async def write():
+            try:
+                await self.kv.put(key, json.dumps(entry), expirationTtl=expiration)
+                for tag in entry.get("tags", ()):
+                    await self.kv.put(tag_record(tag, key), "1", expirationTtl=expiration)
+            except Exception:
+                stats.kv_errors += 1
+                logger.warning("Content cache KV write failed for %s", key, exc_info=True)
+
+        await self.kv.defer(write)
+
+    async def _tagged_keys(self, tag: str) -> set[str]:
+        """Cache keys indexed under ``tag`` in KV."""
+        prefix = tag_record(tag, "")
+        keys, cursor = set(), None
+        while True:
+            options = {"prefix": prefix, **({"cursor": cursor} if cursor else {})}
+            page = from_js(await self.kv.list(**options))
+            keys |= {item["name"][len(prefix):] for item in page["keys"]}
+            cursor = page.get("cursor")
+            if page.get("list_complete", True) or not cursor:
+                return keys
+
+    async def invalidate(self, tags: list[str]) -> int:
+        """Delete every entry carrying any of ``tags`` from both tiers.
+
+        Cost is proportional to the number of affected keys, not to the
+        size of the cache.
+
+        Returns:
+            The number of distinct cache keys removed.
+        """
+        removed: set[str] = set()
+        now = time.time()
+        for tag in tags:
+            _invalidated[tag] = now
+            keys = _tag_index.pop(tag, set())
+            if self.kv is not None:
+                await self.kv.put(
+                    INVALIDATED_PREFIX + tag, str(now),
+                    expirationTtl=max(KV_MIN_TTL, CDN_CATCHUP_SECONDS),
+                )
+                indexed = await self._tagged_keys(tag)
+                for key in indexed:
+                    await self.kv.delete(tag_record(tag, key))
+                keys |= indexed
+            for key in keys - removed:
+                _memory.pop(key, None)
+                if self.kv is not None:
+                    await self.kv.delete(key)
+            removed |= keys
+        return len(removed)
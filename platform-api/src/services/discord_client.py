@@ -5,12 +5,8 @@ from services.http_client import get_client
 # Allowlist of Discord webhook hosts
 ALLOWED_WEBHOOK_HOSTS = {"discord.com", "discordapp.com"}
 
-async def post_webhook(webhook_url: str, embed: dict):
-    """Sends a formatted embed to a Discord webhook URL.
-
-    Validates the webhook destination and handles upstream errors properly.
-    """
-    # Parse and validate webhook host
+def validate_webhook_url(webhook_url: str) -> str:
+    """Returns the cleaned webhook URL, or raises if it isn't a Discord webhook."""
     webhook_url = webhook_url.strip('"') # cleans up the webhook in case of extra quotations from setting them in the environment
 
     parsed = urlparse(webhook_url)
@@ -20,12 +16,20 @@ async def post_webhook(webhook_url: str, embed: dict):
         raise HTTPException(500, f"Invalid webhook scheme: {parsed.scheme}")
     if not parsed.path.startswith("/api/webhooks/"):
         raise HTTPException(500, f"Invalid webhook path: {parsed.path}")
+    return webhook_url
+
+async def post_webhook(webhook_url: str, *embeds: dict):
+    """Sends one or more formatted embeds to a Discord webhook URL as one message.
+
+    Validates the webhook destination and handles upstream errors properly.
+    """
+    webhook_url = validate_webhook_url(webhook_url)
 
-    async with get_client() as client:
+    async with get_client(origin=webhook_url) as client:
         resp = await client.post(
             webhook_url,
             params = {"wait": "true"},
-            json={"embeds": [embed]}
+            json={"embeds": list(embeds)}
         )
 
         # Handle upstream errors
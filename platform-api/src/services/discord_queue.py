@@ -0,0 +1,361 @@
+"""Queued Discord webhook delivery with retries and dead-lettering.
+
+``post_webhook`` turns a Discord 429 into a 503 for the caller. Sending
+from the request (or a ``BackgroundTasks`` task) therefore drops
+notifications whenever an announcement burst hits Discord's rate limit.
+Notifications are enqueued instead and delivered by a consumer that:
+
+- keeps **per-webhook order** — a batch is split by webhook URL, each
+  webhook's messages are sent one after another, different webhooks in
+  parallel, and a failed message holds back the ones queued behind it;
+- **coalesces** — consecutive notifications for one webhook go out as a
+  single multi-embed message (``MAX_EMBEDS_PER_MESSAGE`` embeds and
+  ``MAX_EMBED_CHARS_PER_MESSAGE`` characters, Discord's limits), so a
+  burst of N notifications costs about N/10 webhook calls;
+- **retries with exponential backoff**, never sooner than Discord's
+  ``Retry-After``;
+- **dead-letters** messages that fail permanently or exhaust
+  ``MAX_ATTEMPTS`` into KV (``discord-dead-letter:<id>``, kept for
+  ``DEAD_LETTER_TTL_SECONDS``) instead of retrying forever.
+
+Two backends share ``send(message, delay_seconds)``:
+
+- ``CloudflareDeliveryQueue`` — the ``DISCORD_QUEUE`` Queues binding
+  (``wrangler.jsonc``). Batches reach ``Default.queue`` in ``main.py``,
+  which hands them to ``consume``. The consumer's ``max_batch_timeout``
+  is the coalescing window.
+- ``LocalDeliveryQueue`` — an in-process stand-in used when the binding is
+  not configured (local dev, tests). ``enqueue`` drains it from the
+  request's ``BackgroundTasks``. Messages live only as long as the isolate.
+  Notifications already pending when a drain runs are sent together.
+  With ``coalesce_seconds`` set, notifications arriving within that long
+  of a post are also buffered and sent together when the window closes;
+  it defaults to 0 because the drain runs in the request's background
+  tasks, which would stay open for the whole window.
+
+Usage::
+
+    await discord_queue.enqueue(settings, webhook_url, embed, background_tasks)
+"""
+
+import asyncio
+import json
+import logging
+import math
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Protocol
+
+from fastapi import BackgroundTasks, HTTPException
+
+from services.discord_client import post_webhook
+from utils.js import from_js, to_js_object
+
+logger = logging.getLogger(__name__)
+
+# Delivery attempts before a message is dead-lettered.
+MAX_ATTEMPTS = 8
+
+# Backoff: BASE * 2^(attempt-1), capped, and never below Retry-After.
+BASE_DELAY_SECONDS = 2
+MAX_DELAY_SECONDS = 15 * 60
+
+# Messages per consumer batch (matches ``max_batch_size`` in wrangler.jsonc).
+MAX_BATCH_SIZE = 25
+
+# Discord's per-message limits: embeds, and characters across all embeds.
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARS_PER_MESSAGE = 6000
+
+# Local stand-in: buffer a webhook's notifications for this long after a post.
+COALESCE_WINDOW_SECONDS = 0
+
+DEAD_LETTER_PREFIX = "discord-dead-letter:"
+DEAD_LETTER_TTL_SECONDS = 7 * 24 * 60 * 60
+
+# The local stand-in waits in-process for retries due within this window;
+# later ones are picked up by the next drain.
+LOCAL_MAX_WAIT_SECONDS = 30
+
+# ``deliver(webhook_url, *embeds)`` — ``discord_client.post_webhook``.
+Deliver = Callable[..., Awaitable[Any]]
+
+
+class QueueMessage(Protocol):
+    """The parts of a Cloudflare Queues ``Message`` the consumer uses."""
+    body: dict
+    attempts: int
+
+    def ack(self) -> None: ...
+    def retry(self, delay_seconds: int) -> None: ...
+
+
+def new_message(webhook_url: str, embed: dict) -> dict:
+    return {"id": uuid.uuid4().hex, "webhook_url": webhook_url, "embed": embed, "enqueued_at": time.time()}
+
+
+def backoff_seconds(attempts: int, retry_after: float = 0) -> int:
+    """Delay before attempt ``attempts + 1``."""
+    delay = min(MAX_DELAY_SECONDS, BASE_DELAY_SECONDS * 2 ** (attempts - 1))
+    return math.ceil(max(delay, retry_after))
+
+
+def classify_failure(exc: Exception) -> tuple[bool, float]:
+    """``(retryable, retry_after_seconds)`` for an exception from ``post_webhook``."""
+    if isinstance(exc, HTTPException):
+        if exc.status_code == 503:  # Discord 429, Retry-After forwarded
+            try:
+                return True, float((exc.headers or {}).get("Retry-After", 0))
+            except ValueError:
+                return True, 0
+        # 502: Discord answered with another error; 500: invalid webhook URL.
+        return exc.status_code == 502, 0
+    # Network errors, timeouts and anything unexpected are worth another try.
+    return True, 0
+
+
+def embed_chars(embed: dict) -> int:
+    """Characters Discord counts towards the per-message total for ``embed``."""
+    fields = embed.get("fields") or ()
+    return (
+        len(embed.get("title") or "")
+        + len(embed.get("description") or "")
+        + sum(len(f.get("name") or "") + len(f.get("value") or "") for f in fields)
+        + len((embed.get("footer") or {}).get("text") or "")
+        + len((embed.get("author") or {}).get("name") or "")
+    )
+
+
+def pack_embeds(messages: list[QueueMessage]) -> list[list[QueueMessage]]:
+    """Split one webhook's messages, in order, into Discord-sized messages."""
+    packs: list[list[QueueMessage]] = []
+    chars = 0
+    for message in messages:
+        size = embed_chars(message.body["embed"])
+        if not packs or len(packs[-1]) == MAX_EMBEDS_PER_MESSAGE or chars + size > MAX_EMBED_CHARS_PER_MESSAGE:
+            packs.append([])
+            chars = 0
+        packs[-1].append(message)
+        chars += size
+    return packs
+
+
+async def process_batch(messages: list[QueueMessage], deliver: Deliver, kv) -> None:
+    """Deliver a batch: per-webhook in order, different webhooks concurrently."""
+    by_webhook: dict[str, list[QueueMessage]] = {}
+    for message in messages:
+        by_webhook.setdefault(message.body["webhook_url"], []).append(message)
+    await asyncio.gather(*(_deliver_in_order(group, deliver, kv) for group in by_webhook.values()))
+
+
+async def _deliver_in_order(messages: list[QueueMessage], deliver: Deliver, kv) -> None:
+    packs = pack_embeds(messages)
+    for position, pack in enumerate(packs):
+        try:
+            await deliver(pack[0].body["webhook_url"], *(m.body["embed"] for m in pack))
+        except Exception as exc:
+            retryable, retry_after = classify_failure(exc)
+            attempts = max(m.attempts for m in pack)
+            if retryable and attempts < MAX_ATTEMPTS:
+                delay = backoff_seconds(attempts, retry_after)
+                logger.warning(
+                    "Discord delivery of %d embed(s) failed (attempt %d); retrying in %ds: %s",
+                    len(pack), attempts, delay, exc,
+                )
+                # Everything queued behind it for this webhook waits too.
+                for held in messages[messages.index(pack[0]):]:
+                    held.retry(delay)
+                return
+            for message in pack:
+                await dead_letter(kv, message, repr(exc))
+        for message in pack:
+            message.ack()
+
+
+async def dead_letter(kv, message: QueueMessage, reason: str) -> None:
+    """Park an undeliverable message in KV for inspection."""
+    logger.error("Discord delivery %s dead-lettered after %d attempt(s): %s",
+                 message.body["id"], message.attempts, reason)
+    if kv is None:
+        return
+    record = {"message": message.body, "attempts": message.attempts, "reason": reason, "failed_at": time.time()}
+    try:
+        await kv.put(DEAD_LETTER_PREFIX + message.body["id"], json.dumps(record),
+                     expirationTtl=DEAD_LETTER_TTL_SECONDS)
+    except Exception:
+        logger.exception("Failed to store dead-lettered Discord message %s", message.body["id"])
+
+
+# --- Cloudflare Queues ---
+
+class CloudflareDeliveryQueue:
+    """Producer side of the ``DISCORD_QUEUE`` binding."""
+
+    def __init__(self, binding):
+        self.binding = binding
+
+    async def send(self, message: dict, delay_seconds: int = 0) -> None:
+        await self.binding.send(to_js_object(message), to_js_object({"delaySeconds": delay_seconds}))
+
+
+class _CloudflareMessage:
+    """``QueueMessage`` over a JS ``Message`` from a consumer batch."""
+
+    def __init__(self, message):
+        self._message = message
+        self.body = from_js(message.body)
+        self.attempts = message.attempts
+
+    def ack(self):
+        self._message.ack()
+
+    def retry(self, delay_seconds: int):
+        self._message.retry(to_js_object({"delaySeconds": delay_seconds}))
+
+
+async def consume(batch, kv, deliver: Deliver = post_webhook) -> None:
+    """Consumer for ``Default.queue`` in ``main.py``."""
+    await process_batch([_CloudflareMessage(m) for m in batch.messages], deliver, kv)
+
+
+# --- In-process stand-in ---
+
+@dataclass
+class _LocalMessage:
+    body: dict
+    seq: int
+    not_before: float
+    queue: "LocalDeliveryQueue" = field(repr=False)
+    attempts: int = 1
+
+    def ack(self):
+        pass
+
+    def retry(self, delay_seconds: int):
+        self.attempts += 1
+        self.not_before = self.queue.clock() + delay_seconds
+        self.queue._pending.append(self)
+
+
+class LocalDeliveryQueue:
+    """In-process queue with the consumer semantics of ``DISCORD_QUEUE``.
+
+    ``clock`` and ``sleep`` are injectable so tests can move time forward.
+    """
+
+    def __init__(
+        self,
+        clock: Callable[[], float] = time.monotonic,
+        sleep=asyncio.sleep,
+        coalesce_seconds: float = COALESCE_WINDOW_SECONDS,
+    ):
+        self.clock = clock
+        self.sleep = sleep
+        self.coalesce_seconds = coalesce_seconds
+        self._pending: list[_LocalMessage] = []
+        self._in_flight: set[str] = set()  # webhooks a drain is delivering to
+        self._last_post: dict[str, float] = {}
+        self._seq = 0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def reset(self):
+        self._pending.clear()
+        self._in_flight.clear()
+        self._last_post.clear()
+
+    async def send(self, message: dict, delay_seconds: int = 0) -> None:
+        self._seq += 1
+        self._pending.append(_LocalMessage(message, self._seq, self.clock() + delay_seconds, self))
+
+    async def drain(self, deliver: Deliver, kv) -> None:
+        """Deliver every ready message, waiting for windows and retries that end soon."""
+        while True:
+            batch = self._take_ready()
+            if batch:
+                webhooks = {m.body["webhook_url"] for m in batch}
+                self._in_flight |= webhooks
+                try:
+                    await process_batch(batch, deliver, kv)
+                finally:
+                    self._in_flight -= webhooks
+                    for webhook in webhooks:
+                        self._last_post[webhook] = self.clock()
+                continue
+            # Webhooks another drain is delivering to are that drain's job.
+            waiting = [
+                self._ready_at(m) for m in self._pending
+                if m.body["webhook_url"] not in self._in_flight
+            ]
+            if not waiting:
+                return
+            wait = min(waiting) - self.clock()
+            if wait > LOCAL_MAX_WAIT_SECONDS:
+                return
+            await self.sleep(max(wait, 0))
+
+    def _ready_at(self, message: _LocalMessage) -> float:
+        last_post = self._last_post.get(message.body["webhook_url"])
+        window_ends = last_post + self.coalesce_seconds if last_post is not None else 0
+        return max(message.not_before, window_ends)
+
+    def _take_ready(self) -> list[_LocalMessage]:
+        """Up to ``MAX_BATCH_SIZE`` ready messages, in per-webhook order.
+
+        A webhook whose oldest pending message is not ready yet (retry
+        delay or coalescing window), or that another drain is delivering
+        to, contributes nothing.
+        """
+        now = self.clock()
+        blocked = set(self._in_flight)
+        batch = []
+        for message in sorted(self._pending, key=lambda m: m.seq):
+            webhook = message.body["webhook_url"]
+            if webhook in blocked:
+                continue
+            if self._ready_at(message) > now:
+                blocked.add(webhook)
+                continue
+            batch.append(message)
+            if len(batch) == MAX_BATCH_SIZE:
+                break
+        for message in batch:
+            self._pending.remove(message)
+        return batch
+
+
+# Shared for the lifetime of the isolate.
+local_queue = LocalDeliveryQueue()
+
+
+def reset():
+    """Drop everything queued in-process (tests)."""
+    local_queue.reset()
+
+
+def get_delivery_queue(settings) -> CloudflareDeliveryQueue | LocalDeliveryQueue:
+    """The Queues-backed producer when ``DISCORD_QUEUE`` is bound, else the local one."""
+    if settings.discord_queue is not None:
+        return CloudflareDeliveryQueue(settings.discord_queue)
+    return local_queue
+
+
+async def enqueue(
+    settings,
+    webhook_url: str,
+    embed: dict,
+    background_tasks: BackgroundTasks,
+    deliver: Deliver = post_webhook,
+    delay_seconds: int = 0,
+) -> None:
+    """Queue ``embed`` for ``webhook_url``.
+
+    With the local stand-in, delivery (through ``deliver``) runs after the
+    response on ``background_tasks``.
+    """
+    queue = get_delivery_queue(settings)
+    await queue.send(new_message(webhook_url, embed), delay_seconds)
+    if queue is local_queue:
+        background_tasks.add_task(local_queue.drain, deliver, settings.kv)
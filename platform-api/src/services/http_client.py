@@ -3,10 +3,16 @@
 Cloudflare Workers have specific constraints around HTTP connections that
 differ from a traditional Python application:
 
-1. **No persistent connections.** Workers isolates are short-lived and
-   share-nothing. You MUST create a new ``httpx.AsyncClient`` for every
-   request. Never store a client in a module-level global — it will
-   either fail on the next request or leak state across requests.
+1. **Connection reuse is scoped to the isolate.** Workers isolates are
+   reused across requests, so a client kept in module state can save the
+   TLS/connection setup on every upstream call. ``get_client(origin=...)``
+   leases a client from an isolate-scoped registry keyed by upstream
+   origin (and event loop). Idle clients are evicted after
+   ``POOL_IDLE_TIMEOUT`` seconds. If the runtime refuses to reuse a client
+   across requests, the request that hit it is retried once on fresh
+   connections, the pooled client is closed, and the registry disables
+   itself for the rest of the isolate's life so every later call gets a
+   fresh client. Calls without an ``origin`` always get a fresh client.
 
 2. **HTTP/2 must be disabled.** Setting ``http2=True`` on httpx causes
    intermittent connection errors in the Workers runtime because the
@@ -30,52 +36,257 @@ Usage::
     # Simple POST (returns parsed JSON):
     result = await http_post("https://api.example.com/items", json={"name": "foo"})
 
-    # Custom request (full httpx control):
+    # Custom request (full httpx control, fresh client):
     async with get_client() as client:
         response = await client.patch(url, json=payload, headers=headers)
+
+    # Pooled client shared by every call to the same upstream host:
+    async with get_client(origin="https://api.cloudflare.com") as client:
+        response = await client.get(url, headers=headers)
 """
 
+import asyncio
+import logging
+import time
 from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
 
 import httpx
 from fastapi import HTTPException
 
+logger = logging.getLogger(__name__)
 
 # Default timeout for all requests (seconds).
 # Workers have a 30s CPU limit; 10s leaves room for your own logic.
 DEFAULT_TIMEOUT = 10.0
 
+# Pooled clients unused for this long (seconds) are closed on the next lease.
+POOL_IDLE_TIMEOUT = 60.0
+
+# Upper bound on pooled clients per isolate (one per upstream origin/loop).
+POOL_MAX_CLIENTS = 16
+
+# Error fragments that mean the runtime will not let a client outlive the
+# request (or event loop) that created it.
+_REUSE_ERROR_MARKERS = (
+    "on behalf of a different request",
+    "Event loop is closed",
+)
+
+
+# When set, every client built here sends through this transport instead of
+# the network (local stand-ins for benchmarks; see ``use_transport``).
+_transport_override: httpx.AsyncBaseTransport | None = None
+
+
+def use_transport(transport: httpx.AsyncBaseTransport | None):
+    """Route all outgoing requests through ``transport`` (``None`` restores the network).
+
+    Set it before the first request: clients already pooled keep the
+    transport they were built with.
+    """
+    global _transport_override
+    _transport_override = transport
+
+
+def _new_client(**kwargs) -> httpx.AsyncClient:
+    """Build an ``httpx.AsyncClient`` with the Workers-safe defaults."""
+    if _transport_override is not None:
+        kwargs.setdefault("transport", _transport_override)
+    return httpx.AsyncClient(
+        http2=False,  # REQUIRED — http2 causes issues in Workers runtime
+        timeout=kwargs.pop("timeout", DEFAULT_TIMEOUT),
+        **kwargs,
+    )
+
+
+def origin_of(url: str) -> str:
+    """Reduce a URL to its ``scheme://host[:port]`` origin (the pool key)."""
+    parsed = httpx.URL(url)
+    port = f":{parsed.port}" if parsed.port else ""
+    return f"{parsed.scheme}://{parsed.host}{port}"
+
+
+def _is_reuse_error(exc: BaseException) -> bool:
+    message = str(exc)
+    return any(marker in message for marker in _REUSE_ERROR_MARKERS)
+
+
+class _ReuseFallbackTransport(httpx.AsyncBaseTransport):
+    """Transport of a pooled client: retries once on fresh connections when
+    the runtime refuses to reuse the old ones, and tells the registry."""
+
+    def __init__(self, registry: "ClientRegistry"):
+        self.registry = registry
+        self._inner = self._new_inner()
+
+    @staticmethod
+    def _new_inner() -> httpx.AsyncBaseTransport:
+        return _transport_override or httpx.AsyncHTTPTransport(http2=False)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        try:
+            return await self._inner.handle_async_request(request)
+        except Exception as exc:
+            if not _is_reuse_error(exc):
+                raise
+            self.registry.reuse_rejected()
+            stale, self._inner = self._inner, self._new_inner()
+            try:
+                await stale.aclose()
+            except Exception:
+                logger.debug("Ignoring error while closing rejected HTTP transport", exc_info=True)
+            return await self._inner.handle_async_request(request)
+
+    async def aclose(self):
+        await self._inner.aclose()
+
+
+@dataclass
+class _PooledClient:
+    client: httpx.AsyncClient
+    loop: asyncio.AbstractEventLoop
+    last_used: float = field(default_factory=time.monotonic)
+    in_use: int = 0
+
+
+class ClientRegistry:
+    """Isolate-scoped pool of ``httpx.AsyncClient`` instances.
+
+    Clients are keyed by ``(origin, timeout, event loop)`` so a client is
+    never shared across event loops (pytest's ``TestClient`` starts a new
+    loop per client, and a closed loop cannot drive the old connections).
+
+    Attributes:
+        enabled: False once the runtime has rejected cross-request reuse.
+            Callers then transparently get a fresh client per call.
+    """
+
+    def __init__(self, idle_timeout: float = POOL_IDLE_TIMEOUT, max_clients: int = POOL_MAX_CLIENTS):
+        self.idle_timeout = idle_timeout
+        self.max_clients = max_clients
+        self.enabled = True
+        self._clients: dict[tuple, _PooledClient] = {}
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    @asynccontextmanager
+    async def lease(self, origin: str, timeout: float = DEFAULT_TIMEOUT):
+        """Yield the pooled client for ``origin``, creating it on first use."""
+        loop = asyncio.get_running_loop()
+        key = (origin_of(origin), timeout, id(loop))
+        await self._evict(loop)
+
+        entry = self._clients.get(key)
+        if entry is None or entry.loop is not loop:
+            client = _new_client(timeout=timeout, transport=_ReuseFallbackTransport(self))
+            entry = _PooledClient(client=client, loop=loop)
+            self._clients[key] = entry
+
+        entry.in_use += 1
+        try:
+            yield entry.client
+        except BaseException as exc:
+            if _is_reuse_error(exc):
+                self.reuse_rejected()
+            raise
+        finally:
+            entry.in_use -= 1
+            entry.last_used = time.monotonic()
+            if not self.enabled:
+                # Close pooled clients instead of leaking their connections.
+                for idle_key, idle in list(self._clients.items()):
+                    if idle.in_use == 0:
+                        del self._clients[idle_key]
+                        await self._close(idle, loop)
+
+    def reuse_rejected(self):
+        """Stop pooling: the runtime won't let clients outlive their request."""
+        if self.enabled:
+            logger.warning("HTTP client reuse rejected by runtime; falling back to per-request clients")
+        self.enabled = False
+
+    async def _evict(self, loop: asyncio.AbstractEventLoop):
+        """Close idle clients, clients from dead loops, and overflow (LRU)."""
+        now = time.monotonic()
+        for key, entry in list(self._clients.items()):
+            if entry.loop.is_closed():
+                # Connections bound to a closed loop can't be closed cleanly.
+                del self._clients[key]
+            elif entry.in_use == 0 and now - entry.last_used > self.idle_timeout:
+                del self._clients[key]
+                await self._close(entry, loop)
+
+        idle = sorted(
+            (e.last_used, k) for k, e in self._clients.items() if e.in_use == 0
+        )
+        while len(self._clients) >= self.max_clients and idle:
+            _, key = idle.pop(0)
+            await self._close(self._clients.pop(key), loop)
+
+    async def _close(self, entry: _PooledClient, loop: asyncio.AbstractEventLoop):
+        if entry.loop is not loop:
+            return
+        try:
+            await entry.client.aclose()
+        except Exception:
+            logger.debug("Ignoring error while closing pooled HTTP client", exc_info=True)
+
+    async def aclose(self):
+        """Close every pooled client owned by the running loop and reset."""
+        loop = asyncio.get_running_loop()
+        entries, self._clients = list(self._clients.values()), {}
+        for entry in entries:
+            await self._close(entry, loop)
+
+
+client_registry = ClientRegistry()
+"""The isolate-wide registry behind ``get_client(origin=...)``."""
+
 
 @asynccontextmanager
-async def get_client(**kwargs):
-    """Create a fresh ``httpx.AsyncClient`` with Workers-safe defaults.
+async def get_client(origin: str | None = None, **kwargs):
+    """Provide an ``httpx.AsyncClient`` with Workers-safe defaults.
 
-    This is an async context manager that ensures the client is properly
-    closed after use. Every call creates a **new** client instance — this
-    is required because Workers don't support persistent connections.
+    This is an async context manager. Without ``origin`` every call creates
+    a **new** client that is closed on exit. With ``origin`` the client is
+    leased from ``client_registry`` and stays open for the next call to the
+    same upstream host, so repeated calls skip the TLS/connection setup.
 
     Args:
+        origin: Any URL on the upstream host (e.g. the request URL). When
+            set, a pooled client for that origin is used.
         **kwargs: Additional keyword arguments passed to
             ``httpx.AsyncClient()``. You can override ``timeout`` here.
-            The ``http2`` flag is always forced to ``False``.
+            The ``http2`` flag is always forced to ``False``. Passing any
+            option other than ``timeout`` opts out of pooling, because a
+            shared client can't carry per-caller configuration.
 
     Yields:
         An ``httpx.AsyncClient`` instance ready for use.
 
     Example::
 
-        async with get_client() as client:
-            response = await client.get("https://example.com")
+        async with get_client(origin=url) as client:
+            response = await client.get(url)
             data = response.json()
     """
-    async with httpx.AsyncClient(
-        http2=False,  # REQUIRED — http2 causes issues in Workers runtime
-        timeout=kwargs.pop("timeout", DEFAULT_TIMEOUT),
-        **kwargs,
-    ) as client:
+    poolable = set(kwargs) <= {"timeout"}
+    if origin and poolable and client_registry.enabled:
+        async with client_registry.lease(origin, kwargs.get("timeout", DEFAULT_TIMEOUT)) as client:
+            yield client
+        return
+
+    async with _new_client(**kwargs) as client:
         yield client
 
 
+async def close_pooled_clients():
+    """Close every pooled client (used on shutdown and between tests)."""
+    await client_registry.aclose()
+
+
 def raise_for_status(response: httpx.Response):
     """Convert an HTTP error response into a FastAPI ``HTTPException``.
 
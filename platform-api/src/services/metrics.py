@@ -0,0 +1,220 @@
+"""Request metrics written to Workers Analytics Engine.
+
+``/platform/analytics`` (``services/cf_client.get_cf_analytics``) sums
+``double1`` per hour for a ``blob1`` metric name. This module produces those
+data points: route code calls ``increment``/``observe`` while serving a
+request, ``MetricsMiddleware`` collects them in a per-request batch, and the
+batch is written to the ``ANALYTICS`` binding once the response has been
+sent — through ``ctx.waitUntil`` in production (``main.py`` hands it over
+with ``bind_wait_until``), so it never adds to response latency.
+
+Data point layout (one point per metric and dimension per request):
+
+- ``blobs``:   ``(metric, dimension)``
+- ``doubles``: counters ``(value,)``; histograms
+  ``(count, sum_ms, max_ms, *bucket_counts)`` with the buckets of
+  ``HISTOGRAM_BUCKETS_MS`` plus one overflow bucket
+- ``indexes``: ``(metric,)``
+
+``double1`` is always an event count, so the analytics endpoint's hourly
+``sum(double1)`` is throughput for every metric.
+
+Usage::
+
+    from services import metrics
+
+    metrics.increment(metrics.FORM_SUBMISSIONS, dimension=body.site)
+    metrics.observe("upstream_ms", 84.0, dimension="sanity")
+
+Outside a request (cron, tests calling services directly) both are no-ops.
+"""
+
+import logging
+from bisect import bisect_left
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Any, Callable
+
+from services import timing
+from utils.js import to_js_object
+
+logger = logging.getLogger(__name__)
+
+# Metric names read by /platform/analytics (cf_client.get_cf_analytics).
+CHATBOT_QUERIES = "chatbot_queries"
+FORM_SUBMISSIONS = "form_submissions"
+WEBHOOK_EVENTS = "webhook_events"
+# Operational metrics: dimension is the X-Cache status / upstream / route.
+CONTENT_CACHE = "content_cache"
+SESSION_CACHE = "session_cache"
+SEARCH_INDEX = "search_index"
+UPSTREAM_MS = "upstream_ms"
+REQUEST_MS = "request_ms"
+STAGE_MS = "stage_ms"
+RESPONSES = "responses"
+
+# Server-Timing spans reported as upstream latency.
+UPSTREAM_SPANS = ("sanity", "kv", "d1")
+# Server-Timing route stages, reported per route as ``stage_ms``.
+ROUTE_STAGES = ("deps", "handler", "serialize", "settings")
+
+# Upper bounds (inclusive) of the latency histogram buckets.
+HISTOGRAM_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500)
+
+
+@dataclass
+class Histogram:
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+    buckets: list[int] = field(default_factory=lambda: [0] * (len(HISTOGRAM_BUCKETS_MS) + 1))
+
+    def observe(self, value: float):
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        self.buckets[bisect_left(HISTOGRAM_BUCKETS_MS, value)] += 1
+
+    def doubles(self) -> list[float]:
+        return [self.count, self.total, self.max, *self.buckets]
+
+
+class MetricsBatch:
+    """Counters and histograms recorded while serving one request."""
+
+    def __init__(self):
+        self.counters: dict[tuple[str, str], float] = {}
+        self.histograms: dict[tuple[str, str], Histogram] = {}
+
+    def increment(self, name: str, value: float = 1, dimension: str = ""):
+        key = (name, dimension)
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, dimension: str = ""):
+        self.histograms.setdefault((name, dimension), Histogram()).observe(value)
+
+    def data_points(self) -> list[dict[str, Any]]:
+        points = [
+            {"blobs": [name, dimension], "doubles": [value], "indexes": [name]}
+            for (name, dimension), value in self.counters.items()
+        ]
+        points += [
+            {"blobs": [name, dimension], "doubles": histogram.doubles(), "indexes": [name]}
+            for (name, dimension), histogram in self.histograms.items()
+        ]
+        return points
+
+
+_current: ContextVar[MetricsBatch | None] = ContextVar("metrics_batch", default=None)
+_wait_until: ContextVar[Callable[[Any], None] | None] = ContextVar("metrics_wait_until", default=None)
+
+
+def increment(name: str, value: float = 1, dimension: str = ""):
+    batch = _current.get()
+    if batch is not None:
+        batch.increment(name, value, dimension)
+
+
+def observe(name: str, value: float, dimension: str = ""):
+    batch = _current.get()
+    if batch is not None:
+        batch.observe(name, value, dimension)
+
+
+def bind_wait_until(wait_until: Callable[[Any], None]) -> Token:
+    """Flush batches through ``wait_until`` (``ctx.waitUntil``) in this context."""
+    return _wait_until.set(wait_until)
+
+
+def unbind_wait_until(token: Token):
+    _wait_until.reset(token)
+
+
+def current_wait_until() -> Callable[[Any], None] | None:
+    """The bound ``ctx.waitUntil``, for other after-response work (``request_kv``)."""
+    return _wait_until.get()
+
+
+class MetricsMiddleware:
+    """ASGI middleware that writes each request's metrics after the response.
+
+    Register it before ``ServerTimingMiddleware`` (i.e. inside it) so the
+    request's spans can be read. Latency and spans are taken when the last
+    body chunk is sent, so ``BackgroundTasks`` that run afterwards are not
+    counted as request time.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        batch = MetricsBatch()
+        token = _current.set(batch)
+        started = perf_counter()
+        status = None
+        recorded = False
+
+        async def send_and_record(message):
+            nonlocal status, recorded
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                _record_request(batch, scope, perf_counter() - started, status)
+                recorded = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_and_record)
+        finally:
+            _current.reset(token)
+            if not recorded:
+                _record_request(batch, scope, perf_counter() - started, status)
+            await _flush(scope, batch)
+
+
+def _record_request(batch: MetricsBatch, scope, elapsed: float, status: int | None):
+    """Add the request's latency, status and Server-Timing spans to ``batch``."""
+    route = getattr(scope.get("route"), "path", None)
+    totals = timing.current_timer().totals() if timing.current_timer() is not None else {}
+    if route is not None:
+        batch.observe(REQUEST_MS, elapsed * 1000, route)
+        batch.increment(RESPONSES, dimension=f"{scope['method']} {route} {status or 500}")
+        for stage in ROUTE_STAGES:
+            if stage in totals:
+                batch.observe(STAGE_MS, totals[stage][0], f"{route} {stage}")
+    for name in UPSTREAM_SPANS:
+        if name in totals:
+            batch.observe(UPSTREAM_MS, totals[name][0], name)
+
+
+async def _flush(scope, batch: MetricsBatch):
+    """Hand ``batch`` to Analytics Engine without holding up the response."""
+    env = scope.get("env")
+    if env is None:
+        return
+    from models.settings import WorkerSettings
+
+    dataset = WorkerSettings.for_env(env).analytics
+    points = batch.data_points()
+    if dataset is None or not points:
+        return
+
+    async def write():
+        try:
+            for point in points:
+                dataset.writeDataPoint(to_js_object(point))
+        except Exception:
+            logger.exception("Failed to write %d metric data points", len(points))
+
+    wait_until = _wait_until.get()
+    if wait_until is not None:
+        wait_until(write())
+    else:
+        # No execution context (local dev, tests): the response has already
+        # been sent, so writing inline costs the client nothing.
+        await write()
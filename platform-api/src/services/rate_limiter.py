@@ -0,0 +1,117 @@
+"""Rate limiting with one round trip per decision.
+
+The old limiters read a KV counter, compared it, then read and wrote it
+again — three KV operations per request and no atomicity, so a burst of
+concurrent requests all saw the same count and all got through.
+
+Two backends share one interface (``await limiter.hit(key, limit)``):
+
+- ``DurableObjectLimiter`` — the ``SlidingWindowRateLimiter`` Durable Object
+  from ``rate-limiter-worker`` (``RATE_LIMITER`` binding in
+  ``wrangler.jsonc``). One DO instance per key serializes every decision,
+  so limits hold under bursts across all isolates.
+- ``TokenBucketLimiter`` — in-process buckets used when the binding is
+  not configured (local dev, tests) and as a fail-safe if the DO call
+  fails. Limits are per isolate only.
+
+Usage::
+
+    limiter = get_rate_limiter(settings)
+    decision = await limiter.hit(client_ip, FORMS_LIMIT)
+    if not decision.allowed:
+        raise HTTPException(429, ...)
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import Callable, NamedTuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """``max_requests`` per ``window_seconds`` for keys in namespace ``name``."""
+    name: str
+    max_requests: int
+    window_seconds: int
+
+
+class Decision(NamedTuple):
+    allowed: bool
+    remaining: int
+    retry_after: float = 0.0  # seconds until the next request would be allowed
+
+
+FORMS_LIMIT = RateLimit("forms", max_requests=5, window_seconds=3600)
+DISCORD_CHANNEL_LIMIT = RateLimit("discord", max_requests=30, window_seconds=60)
+
+
+class TokenBucketLimiter:
+    """In-process token buckets: ``max_requests`` burst, refilled over the window.
+
+    ``clock`` is injectable so tests can move time forward.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self._buckets: dict[tuple[str, str], tuple[float, float]] = {}
+
+    def reset(self):
+        self._buckets.clear()
+
+    async def hit(self, key: str, limit: RateLimit) -> Decision:
+        now = self.clock()
+        rate = limit.max_requests / limit.window_seconds
+        tokens, updated = self._buckets.get((limit.name, key), (float(limit.max_requests), now))
+        tokens = min(float(limit.max_requests), tokens + (now - updated) * rate)
+
+        if tokens < 1:
+            self._buckets[(limit.name, key)] = (tokens, now)
+            return Decision(False, 0, (1 - tokens) / rate)
+
+        tokens -= 1
+        self._buckets[(limit.name, key)] = (tokens, now)
+        return Decision(True, int(tokens))
+
+
+class DurableObjectLimiter:
+    """Sliding-window decisions from the ``SlidingWindowRateLimiter`` DO.
+
+    Fails over to ``fallback`` when the RPC call raises, so a DO outage
+    degrades to per-isolate limits instead of rejecting traffic.
+    """
+
+    def __init__(self, namespace, fallback: TokenBucketLimiter):
+        self.namespace = namespace
+        self.fallback = fallback
+
+    async def hit(self, key: str, limit: RateLimit) -> Decision:
+        try:
+            stub = self.namespace.get(self.namespace.idFromName(f"{limit.name}:{key}"))
+            result = await stub.checkLimit(limit.window_seconds * 1000, limit.max_requests)
+        except Exception:
+            logger.warning("Rate limiter DO call failed; using in-process limiter", exc_info=True)
+            return await self.fallback.hit(key, limit)
+        return Decision(
+            allowed=bool(result.allowed),
+            remaining=int(result.remaining),
+            retry_after=result.retryAfterMs / 1000,
+        )
+
+
+# Shared for the lifetime of the isolate.
+local_limiter = TokenBucketLimiter()
+
+
+def reset():
+    """Forget all in-process buckets (tests)."""
+    local_limiter.reset()
+
+
+def get_rate_limiter(settings) -> DurableObjectLimiter | TokenBucketLimiter:
+    """The DO-backed limiter when ``RATE_LIMITER`` is bound, else the local one."""
+    if settings.rate_limiter is not None:
+        return DurableObjectLimiter(settings.rate_limiter, local_limiter)
+    return local_limiter
@@ -0,0 +1,163 @@
+"""Request-scoped KV: memoized reads and write-behind.
+
+One request can read the same KV key several times from different layers
+(settings-driven lookups, caches, auth), and cache fills used to be
+written to KV before the response was sent. ``wrap(settings.kv)`` returns
+a facade over the binding that, while serving a request:
+
+- **memoizes reads** — ``get`` answers repeated reads of a key (with the
+  same options) from the request's memo, misses included;
+- **defers non-critical writes** — ``put_later`` and ``defer`` queue cache
+  fills, counters and session-cache puts. ``RequestKVMiddleware`` runs
+  them after the response, through ``ctx.waitUntil`` in production (the
+  one ``main.py`` binds for ``services/metrics.py``), in order, each
+  failure logged and skipped.
+
+``put`` and ``delete`` still write through at once — use them when a later
+request must see the write. Writes the facade makes are reflected in the
+memo; writes made on the raw binding are not.
+
+Outside a request (cron, queue consumer, tests calling services directly)
+the facade reads and writes straight through.
+
+Usage::
+
+    kv = request_kv.wrap(settings.kv)
+    cached = await kv.get(cache_key)
+    ...
+    await kv.put_later(cache_key, value, expirationTtl=300)
+"""
+
+import logging
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable
+
+from services import metrics
+
+logger = logging.getLogger(__name__)
+
+WriteJob = Callable[[], Awaitable[Any]]
+
+
+class _RequestScope:
+    """Facades and queued writes of one request."""
+
+    def __init__(self):
+        self.facades: dict[int, "RequestKV"] = {}
+        self.writes: list[WriteJob] = []
+
+
+_current: ContextVar[_RequestScope | None] = ContextVar("request_kv", default=None)
+
+
+class RequestKV:
+    """KV binding facade bound to the current request (if any).
+
+    Attributes other than ``get``/``put``/``put_later``/``delete``/``defer``
+    (``list``, ``getWithMetadata``, ...) pass through to the binding.
+    """
+
+    def __init__(self, kv, scope: _RequestScope | None):
+        self.kv = kv
+        self._scope = scope
+        self._reads: dict[tuple, Any] = {}
+
+    def __getattr__(self, name):
+        return getattr(self.kv, name)
+
+    async def get(self, key: str, *args, **kwargs):
+        if self._scope is None:
+            return await self.kv.get(key, *args, **kwargs)
+        memo_key = _memo_key(key, args, kwargs)
+        if memo_key not in self._reads:
+            self._reads[memo_key] = await self.kv.get(key, *args, **kwargs)
+        return self._reads[memo_key]
+
+    async def put(self, key: str, value, *args, **kwargs):
+        await self.kv.put(key, value, *args, **kwargs)
+        self._remember(key, value)
+
+    async def delete(self, key: str):
+        await self.kv.delete(key)
+        self._remember(key, None)
+
+    async def put_later(self, key: str, value, *args, **kwargs):
+        """``put`` after the response; later reads in this request see ``value``."""
+        self._remember(key, value)
+        await self.defer(lambda: self.kv.put(key, value, *args, **kwargs))
+
+    async def defer(self, job: WriteJob):
+        """Run ``job()`` after the response (immediately outside a request)."""
+        if self._scope is None:
+            await job()
+        else:
+            self._scope.writes.append(job)
+
+    def _remember(self, key: str, value):
+        if self._scope is None:
+            return
+        # Drop memoized variants (e.g. ``type="json"``) of the old value.
+        for memo_key in [k for k in self._reads if k[0] == key]:
+            del self._reads[memo_key]
+        self._reads[_memo_key(key, (), {})] = value
+
+
+def _memo_key(key: str, args: tuple, kwargs: dict) -> tuple:
+    return (key, repr(args), repr(sorted(kwargs.items())))
+
+
+def wrap(kv) -> RequestKV | None:
+    """The current request's facade over ``kv`` (``None`` stays ``None``)."""
+    if kv is None:
+        return None
+    if isinstance(kv, RequestKV):
+        return kv
+    scope = _current.get()
+    if scope is None:
+        return RequestKV(kv, None)
+    facade = scope.facades.get(id(kv))
+    if facade is None:
+        facade = scope.facades[id(kv)] = RequestKV(kv, scope)
+    return facade
+
+
+class RequestKVMiddleware:
+    """ASGI middleware that opens a request scope and flushes its deferred writes.
+
+    Background tasks run inside the scope, so writes they defer are
+    flushed with the rest.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_scope = _RequestScope()
+        token = _current.set(request_scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current.reset(token)
+            if request_scope.writes:
+                await _flush(request_scope.writes)
+
+
+async def _flush(writes: list[WriteJob]):
+    async def run():
+        for job in writes:
+            try:
+                await job()
+            except Exception:
+                logger.exception("Deferred KV write failed")
+
+    wait_until = metrics.current_wait_until()
+    if wait_until is not None:
+        wait_until(run())
+    else:
+        # No execution context (local dev, tests): the response has already
+        # been sent, so writing inline costs the client nothing.
+        await run()
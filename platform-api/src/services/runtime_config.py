@@ -0,0 +1,163 @@
+"""Runtime configuration from one versioned KV bundle, loaded once per isolate.
+
+Discord webhook URLs used to live in one KV key per channel
+(``discord-webhook:<channel>``) and were read again on every notification,
+and ``/health`` re-read and re-validated all four on every probe. Instead,
+everything the Worker reads at runtime is published as a single JSON bundle:
+
+    config:version          -> "2026-10-18.1"
+    config:bundle:<version> -> {
+        "discord_webhooks":       {"announcements": "https://discord.com/api/webhooks/...", ...},
+        "discord_channel_limits": {"announcements": 30, ...},   # notifications per minute
+        "site_projects":          {"capstone": "ywcc-capstone", ...}
+    }
+
+Bundles are immutable: to change config, write a new bundle under a new
+version, then point ``config:version`` at it. Each isolate loads and
+validates the bundle once, keeps it in memory, and re-reads
+``config:version`` at most every ``VERSION_CHECK_SECONDS`` — the bundle
+itself is only fetched again when the version has changed. A malformed
+bundle is logged and the previous config kept.
+
+Until a bundle is published (``config:version`` unset), webhooks are read
+from the per-channel keys as before, and channel limits and site projects
+use the defaults in ``rate_limiter`` and ``cf_client``.
+"""
+
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+
+from fastapi import HTTPException
+
+from services import request_kv
+from services.discord_client import validate_webhook_url
+from services.rate_limiter import DISCORD_CHANNEL_LIMIT, RateLimit
+from services.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = "config:version"
+BUNDLE_KEY_PREFIX = "config:bundle:"
+
+# Legacy per-channel webhook keys, read when no bundle is published.
+WEBHOOK_KEY_PREFIX = "discord-webhook:"
+
+# Webhooks every deployment is expected to configure (see ``/health``).
+REQUIRED_WEBHOOKS = ("announcements", "events", "bot-audit", "form-submissions")
+
+# How long an isolate trusts its copy before re-reading ``config:version``.
+VERSION_CHECK_SECONDS = 30
+
+
+def bundle_key(version: str) -> str:
+    return f"{BUNDLE_KEY_PREFIX}{version}"
+
+
+@dataclass(frozen=True)
+class RuntimeConfig:
+    """One validated config bundle. ``version`` is None when none is published."""
+
+    version: str | None = None
+    webhooks: dict[str, str] = field(default_factory=dict)  # channel -> validated URL
+    invalid_webhooks: frozenset[str] = frozenset()
+    channel_limits: dict[str, RateLimit] = field(default_factory=dict)
+    site_projects: dict[str, str] | None = None
+
+    def channel_limit(self, channel: str) -> RateLimit:
+        return self.channel_limits.get(channel, DISCORD_CHANNEL_LIMIT)
+
+    def projects(self) -> dict[str, str]:
+        """Site -> Cloudflare Pages project."""
+        if self.site_projects is not None:
+            return self.site_projects
+        from services.cf_client import SITE_TO_CF_PROJECT
+        return SITE_TO_CF_PROJECT
+
+
+def parse_bundle(version: str, raw: str) -> RuntimeConfig:
+    """Validate a stored bundle. Raises ``ValueError`` if it is malformed."""
+    try:
+        data = json.loads(raw)
+    except json.JSONDecodeError as exc:
+        raise ValueError(f"bundle is not JSON: {exc}") from exc
+    if not isinstance(data, dict):
+        raise ValueError("bundle must be a JSON object")
+
+    webhooks, invalid = {}, set()
+    for channel, url in (data.get("discord_webhooks") or {}).items():
+        try:
+            webhooks[channel] = validate_webhook_url(str(url))
+        except HTTPException as exc:
+            logger.error("Config %s: webhook for %s rejected: %s", version, channel, exc.detail)
+            invalid.add(channel)
+
+    limits = {}
+    for channel, per_minute in (data.get("discord_channel_limits") or {}).items():
+        if not isinstance(per_minute, int) or per_minute < 1:
+            raise ValueError(f"channel limit for {channel} must be a positive integer")
+        limits[channel] = RateLimit(DISCORD_CHANNEL_LIMIT.name, per_minute, window_seconds=60)
+
+    projects = data.get("site_projects")
+    if projects is not None and not (
+        isinstance(projects, dict) and all(isinstance(p, str) and p for p in projects.values())
+    ):
+        raise ValueError("site_projects must map site names to project names")
+
+    return RuntimeConfig(
+        version=version,
+        webhooks=webhooks,
+        invalid_webhooks=frozenset(invalid),
+        channel_limits=limits,
+        site_projects=projects,
+    )
+
+
+_DEFAULT = RuntimeConfig()
+_current: RuntimeConfig = _DEFAULT
+_checked_at: float | None = None  # monotonic time of the last version check
+_inflight = SingleFlight()
+
+
+def reset():
+    """Forget the loaded bundle (tests)."""
+    global _current, _checked_at
+    _current, _checked_at = _DEFAULT, None
+
+
+async def get_runtime_config(kv) -> RuntimeConfig:
+    """The isolate's config, re-checking ``config:version`` when it is due."""
+    if kv is None:
+        return _DEFAULT
+    if _checked_at is not None and time.monotonic() - _checked_at < VERSION_CHECK_SECONDS:
+        return _current
+    return await _inflight.do(VERSION_KEY, lambda: _refresh(kv))
+
+
+async def _refresh(kv) -> RuntimeConfig:
+    global _current, _checked_at
+    try:
+        version = await kv.get(VERSION_KEY)
+        if not version:
+            _current = _DEFAULT
+        elif version != _current.version:
+            raw = await kv.get(bundle_key(version))
+            if raw is None:
+                raise ValueError(f"{bundle_key(version)} is missing")
+            _current = parse_bundle(version, raw)
+    except Exception:
+        # Keep serving what we have; try again after the next check interval.
+        logger.exception("Runtime config refresh failed; keeping version %s", _current.version)
+    _checked_at = time.monotonic()
+    return _current
+
+
+async def discord_webhook(kv, channel: str) -> str | None:
+    """Webhook URL for ``channel``, or None if it isn't configured."""
+    config = await get_runtime_config(kv)
+    if config.version is not None:
+        return config.webhooks.get(channel)
+    if kv is None:
+        return None
+    return await request_kv.wrap(kv).get(f"{WEBHOOK_KEY_PREFIX}{channel}")
@@ -1,27 +1,123 @@
 # src/services/sanity_client.py
+import json
+from typing import Literal
+from urllib.parse import urlencode
+
 from services.http_client import get_client, raise_for_status
+from services.single_flight import SingleFlight
+from services.timing import span
+from utils.groq import query_fingerprint
+
+# Identical concurrent reads share one upstream request (see single_flight.py).
+_inflight_queries = SingleFlight()
+
+# Queries whose GET URL would exceed this many characters are POSTed instead.
+# Sanity accepts ~11 KB URLs; staying well below also keeps edge cache keys sane.
+MAX_GET_URL_LENGTH = 8000
+
+ReadMode = Literal["auto", "cdn", "live"]
+"""Where ``SanityClient.query`` sends reads.
+
+- ``"live"`` — the uncached API (``api.sanity.io``), authenticated when a
+  token is configured. Needed for drafts and private documents.
+- ``"cdn"`` — the API CDN (``apicdn.sanity.io``), always anonymous, so only
+  published public documents are visible. Use for public content.
+- ``"auto"`` — CDN when the client has no token, live otherwise.
+
+``mutate`` always goes to the live API.
+"""
+
+def build_query_url(url: str, groq: str, params: dict | None = None) -> str:
+    """Encode a GROQ query as a GET URL (``?query=...&$param=<json>``).
+
+    Each param is JSON-encoded under a ``$``-prefixed key, matching what the
+    Sanity HTTP API expects (and ``discord-bot/src/sanity.py``). ``None``
+    becomes ``null`` so ``!defined($x)`` filters behave as with POST.
+    """
+    query_params = {"query": groq}
+    for key, value in (params or {}).items():
+        query_params[f"${key}"] = json.dumps(value)
+    separator = "&" if "?" in url else "?"
+    return f"{url}{separator}{urlencode(query_params)}"
+
 
 class SanityClient:
-    def __init__(self, project_id: str, token: str, api_version: str = "2024-01-01"):
+    def __init__(
+        self,
+        project_id: str,
+        token: str,
+        api_version: str = "2024-01-01",
+        read_mode: ReadMode = "auto",
+    ):
         self.project_id = project_id
         self.token = token
         self.api_version = api_version
+        self.read_mode = read_mode
         self.base_url = f"https://{project_id}.api.sanity.io/v{api_version}/data"
+        self.cdn_base_url = f"https://{project_id}.apicdn.sanity.io/v{api_version}/data"
 
-    async def query(self, groq: str, dataset: str, params: dict | None = None) -> list | dict:
-        url = f"{self.base_url}/query/{dataset}"
+    def with_read_mode(self, read_mode: ReadMode) -> "SanityClient":
+        """A copy of this client that reads in ``read_mode``."""
+        return SanityClient(self.project_id, self.token, self.api_version, read_mode)
 
-        headers = {}
+    def _auth_headers(self) -> dict:
         token = str(self.token).strip() if self.token else ""
         if token and token.startswith("sk"):
-            headers["Authorization"] = f"Bearer {token}"
+            return {"Authorization": f"Bearer {token}"}
+        return {}
 
-        async with get_client() as client:
-            resp = await client.post(
-                url,
-                headers=headers,
-                json={"query": groq, "params": params or {}},
+    async def query(
+        self,
+        groq: str,
+        dataset: str,
+        params: dict | None = None,
+        read_mode: ReadMode | None = None,
+        perspective: str | None = None,
+    ) -> list | dict:
+        """Run a GROQ query, coalescing identical concurrent calls.
+
+        Concurrent calls with the same host, dataset, query, params and
+        authentication share a single upstream request and its result (or
+        exception). The shared result must be treated as read-only.
+
+        Args:
+            read_mode: Overrides the client's ``read_mode`` for this call.
+            perspective: Sanity perspective (e.g. ``"published"``). An
+                authenticated live read on API v2024-01-01 defaults to
+                ``raw``, which includes drafts.
+        """
+        headers = self._auth_headers()
+        mode = read_mode or self.read_mode
+        if mode == "cdn" or (mode == "auto" and not headers):
+            url = f"{self.cdn_base_url}/query/{dataset}"
+            headers = {}
+        else:
+            url = f"{self.base_url}/query/{dataset}"
+        if perspective:
+            url = f"{url}?{urlencode({'perspective': perspective})}"
+
+        # Reads under different credentials can see different documents
+        # (drafts, private datasets), so never share them.
+        auth = headers.get("Authorization", "")
+        flight_key = f"{url}|{hash(auth)}|{query_fingerprint(dataset, groq, params)}"
+        with span("sanity"):
+            return await _inflight_queries.do(
+                flight_key, lambda: self._send_query(url, headers, groq, params)
             )
+
+    async def _send_query(self, url: str, headers: dict, groq: str, params: dict | None) -> list | dict:
+        """GET short queries (cacheable by Sanity's CDN and the Workers fetch
+        cache); POST anything whose URL would exceed ``MAX_GET_URL_LENGTH``."""
+        get_url = build_query_url(url, groq, params)
+        async with get_client(origin=url) as client:
+            if len(get_url) <= MAX_GET_URL_LENGTH:
+                resp = await client.get(get_url, headers=headers)
+            else:
+                resp = await client.post(
+                    url,
+                    headers=headers,
+                    json={"query": groq, "params": params or {}},
+                )
             raise_for_status(resp)
             return resp.json().get("result", [])
         
@@ -30,7 +126,7 @@ class SanityClient:
         url = f"{self.base_url}/mutate/{dataset}"
         headers = {"Authorization": f"Bearer {write_token}"}
         
-        async with get_client() as client:
+        async with get_client(origin=url) as client:
             resp = await client.post(
                 url,
                 headers=headers,
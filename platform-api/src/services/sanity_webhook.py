@@ -0,0 +1,78 @@
+"""Verification and routing helpers for Sanity document-change webhooks.
+
+Sanity signs each webhook delivery with the secret configured on the
+webhook. The ``sanity-webhook-signature`` header looks like::
+
+    t=1700000000000,v1=<base64url HMAC-SHA256 of "<t>.<raw body>">
+
+where ``t`` is a millisecond timestamp. Rejecting old timestamps stops a
+captured delivery from being replayed later.
+"""
+
+import base64
+import hashlib
+import hmac
+import time
+
+from utils.dataset import SITE_TO_DATASET, resolve_dataset
+from services.content_cache import content_tag
+
+# Deliveries signed more than this many seconds ago (or ahead) are rejected.
+SIGNATURE_TOLERANCE_SECONDS = 300
+
+
+def _b64url(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def verify_signature(
+    body: bytes,
+    header: str | None,
+    secret: str,
+    now: float | None = None,
+) -> bool:
+    """Check a ``sanity-webhook-signature`` header against the raw body."""
+    if not header:
+        return False
+    try:
+        parts = dict(item.strip().split("=", 1) for item in header.split(","))
+        timestamp = int(parts["t"])
+        received = parts["v1"]
+    except (KeyError, ValueError):
+        return False
+
+    now = time.time() if now is None else now
+    if abs(now - timestamp / 1000) > SIGNATURE_TOLERANCE_SECONDS:
+        return False
+
+    payload = f"{timestamp}.".encode("utf-8") + body
+    digest = hmac.new(secret.encode("utf-8"), payload, hashlib.sha256).digest()
+    # Sanity sends base64url without padding; accept plain base64 as well.
+    normalized = received.replace("+", "-").replace("/", "_").rstrip("=")
+    return hmac.compare_digest(_b64url(digest), normalized)
+
+
+def affected_views(dataset: str, site: str | None = None) -> list[tuple[str, str | None]]:
+    """(dataset, site filter) pairs touched by a change to one document.
+
+    A document with a ``site`` field only affects that site. Without one
+    (e.g. everything in the single-site ``production`` dataset) every site
+    served from ``dataset`` is affected, per ``SITE_TO_DATASET``.
+    """
+    sites = [site] if site in SITE_TO_DATASET else [
+        s for s, ds in SITE_TO_DATASET.items() if ds == dataset
+    ]
+    views = []
+    for s in sites:
+        view = resolve_dataset(s)
+        if view[0] == dataset and view not in views:
+            views.append(view)
+    return views
+
+
+def affected_tags(dataset: str, doc_type: str, site: str | None = None) -> list[str]:
+    """Content-cache tags touched by a change to one document."""
+    return [
+        content_tag(dataset, site_filter, doc_type)
+        for dataset, site_filter in affected_views(dataset, site)
+    ]
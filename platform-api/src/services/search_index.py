@@ -0,0 +1,314 @@
+"""Prefix-aware inverted index behind ``POST /content/search``.
+
+``SEARCH_QUERY`` asks Sanity to ``match`` and ``score()`` every event,
+sponsor and project on each keystroke. The corpus is small, so each
+(dataset, site) view is instead tokenized once into an inverted index,
+serialized to KV under ``search-index:<dataset>:<site>`` and held in
+memory by each isolate. A query is a binary search over the sorted
+vocabulary per token — no Sanity round trip.
+
+Scoring mirrors ``score([title, name] match $term)``: a token found in the
+title/name is worth ``TITLE_WEIGHT``, one found only in the description
+``BODY_WEIGHT``. Every query token is a prefix (search-as-you-type) and all
+of them must match.
+
+The index is kept current by:
+
+- ``POST /content/webhook`` — upserts/removes the changed document,
+- the cron trigger in ``main.py`` — full rebuild,
+- ``search_content`` — schedules a build when a view has no index yet
+  (that request falls back to ``SEARCH_QUERY``). A burst of misses shares
+  one build (``build_missing``).
+
+Webhook changes never rewrite the index blob, which would let webhooks
+handled by different isolates overwrite each other. Each change is its own
+KV record, ``search-change:<dataset>:<site>:<ms>:<id>``, and ``load``
+applies the records newer than the index's ``built_at`` in order. A full
+rebuild makes older records irrelevant, and they expire after
+``CHANGE_TTL_SECONDS``.
+
+Builds read the live API with the read token, which also sees drafts, so
+``SEARCH_INDEX_DOCS`` excludes ``drafts.*`` documents: only published
+content is searchable.
+"""
+
+import bisect
+import json
+import logging
+import re
+import time
+
+from queries.search import SEARCH_INDEX_DOCS
+from services.single_flight import SingleFlight
+from utils.dataset import SITE_TO_DATASET, resolve_dataset
+from utils.js import from_js
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "search-index:"
+CHANGE_PREFIX = "search-change:"
+FORMAT_VERSION = 2
+
+# Change records outlive many cron rebuilds (REFRESH_CRON, every 30 minutes).
+CHANGE_TTL_SECONDS = 24 * 60 * 60
+
+INDEXED_TYPES = ("event", "sponsor", "project")
+
+TITLE_WEIGHT = 2.0
+BODY_WEIGHT = 1.0
+
+# In-isolate copies are re-read from KV after this many seconds.
+MEMORY_TTL_SECONDS = 60
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+_memory: dict[str, tuple[float, "SearchIndex"]] = {}
+
+
+def reset():
+    """Forget the in-isolate copies (tests)."""
+    _memory.clear()
+
+
+def index_key(dataset: str, site: str | None) -> str:
+    return f"{KEY_PREFIX}{dataset}:{site or '*'}"
+
+
+def change_prefix(dataset: str, site: str | None) -> str:
+    return f"{CHANGE_PREFIX}{dataset}:{site or '*'}:"
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def tokenize(text: str | None) -> list[str]:
+    """Lowercased word tokens, in order, without duplicates."""
+    if not text:
+        return []
+    return list(dict.fromkeys(_TOKEN_RE.findall(text.lower())))
+
+
+class SearchIndex:
+    """Inverted index: term → {doc id: weight}, plus a sorted vocabulary."""
+
+    def __init__(
+        self,
+        docs: dict[str, list[str]] | None = None,
+        postings: dict[str, dict[str, float]] | None = None,
+        built_at: int = 0,
+    ):
+        # doc id -> [type, display title]
+        self.docs = docs or {}
+        self.postings = postings or {}
+        self.built_at = built_at  # epoch ms of the Sanity read it was built from
+        self._vocab = sorted(self.postings)
+
+    @classmethod
+    def from_documents(cls, documents: list[dict], built_at: int = 0) -> "SearchIndex":
+        index = cls(built_at=built_at)
+        for doc in documents:
+            index._add(doc)
+        index._vocab = sorted(index.postings)
+        return index
+
+    @classmethod
+    def from_json(cls, raw: str) -> "SearchIndex | None":
+        data = json.loads(raw)
+        if data.get("v") != FORMAT_VERSION:
+            return None
+        return cls(data["docs"], data["terms"], data["built_at"])
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {"v": FORMAT_VERSION, "built_at": self.built_at, "docs": self.docs, "terms": self.postings},
+            separators=(",", ":"),
+        )
+
+    def _add(self, doc: dict):
+        doc_id = doc["_id"]
+        title = doc.get("title") or doc.get("name") or "Unknown"
+        self.docs[doc_id] = [doc["_type"], title]
+        weights: dict[str, float] = {}
+        for token in tokenize(doc.get("description")):
+            weights[token] = BODY_WEIGHT
+        for token in tokenize(f"{doc.get('title') or ''} {doc.get('name') or ''}"):
+            weights[token] = TITLE_WEIGHT
+        for token, weight in weights.items():
+            self.postings.setdefault(token, {})[doc_id] = weight
+
+    def remove(self, doc_id: str):
+        if self.docs.pop(doc_id, None) is None:
+            return
+        for token in [t for t, ids in self.postings.items() if doc_id in ids]:
+            del self.postings[token][doc_id]
+            if not self.postings[token]:
+                del self.postings[token]
+        self._vocab = sorted(self.postings)
+
+    def upsert(self, doc: dict):
+        self.remove(doc["_id"])
+        self._add(doc)
+        self._vocab = sorted(self.postings)
+
+    def apply(self, change: dict):
+        """Apply one change record (``{"doc": ..., "deleted": bool}``)."""
+        if change["deleted"]:
+            self.remove(change["doc"]["_id"])
+        else:
+            self.upsert(change["doc"])
+
+    def _prefix_matches(self, prefix: str) -> dict[str, float]:
+        """Best weight per doc over every term starting with ``prefix``."""
+        found: dict[str, float] = {}
+        start = bisect.bisect_left(self._vocab, prefix)
+        for term in self._vocab[start:]:
+            if not term.startswith(prefix):
+                break
+            for doc_id, weight in self.postings[term].items():
+                if weight > found.get(doc_id, 0.0):
+                    found[doc_id] = weight
+        return found
+
+    def search(self, query: str, types: list[str] | None = None, limit: int = 10) -> list[dict]:
+        """Documents matching every token of ``query`` as a prefix.
+
+        Returns ``SearchResult``-shaped dicts ordered by score, best first.
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        scores: dict[str, float] | None = None
+        for token in tokens:
+            matches = self._prefix_matches(token)
+            if scores is None:
+                scores = matches
+            else:
+                scores = {d: s + matches[d] for d, s in scores.items() if d in matches}
+            if not scores:
+                return []
+
+        wanted = set(types) if types else None
+        results = [
+            {"_id": doc_id, "_type": self.docs[doc_id][0], "title": self.docs[doc_id][1], "_score": score}
+            for doc_id, score in scores.items()
+            if wanted is None or self.docs[doc_id][0] in wanted
+        ]
+        results.sort(key=lambda r: (-r["_score"], r["title"]))
+        return results[:limit]
+
+
+def _remember(key: str, index: SearchIndex):
+    _memory[key] = (time.monotonic(), index)
+
+
+async def load(kv, dataset: str, site: str | None) -> SearchIndex | None:
+    """The index for one view from memory or KV, or ``None`` if unbuilt."""
+    key = index_key(dataset, site)
+    cached = _memory.get(key)
+    if cached and time.monotonic() - cached[0] < MEMORY_TTL_SECONDS:
+        return cached[1]
+    if kv is None:
+        return cached[1] if cached else None
+
+    try:
+        raw = await kv.get(key)
+        index = SearchIndex.from_json(raw) if raw else None
+        if index is not None:
+            await _apply_changes(kv, dataset, site, index)
+    except Exception:
+        logger.warning("Search index KV read failed for %s", key, exc_info=True)
+        return cached[1] if cached else None
+    if index is not None:
+        _remember(key, index)
+    return index
+
+
+async def _apply_changes(kv, dataset: str, site: str | None, index: SearchIndex):
+    """Apply the change records written since ``index`` was built, oldest first."""
+    prefix = change_prefix(dataset, site)
+    names, cursor = [], None
+    while True:
+        options = {"prefix": prefix, **({"cursor": cursor} if cursor else {})}
+        page = from_js(await kv.list(**options))
+        names += [item["name"] for item in page["keys"]]
+        cursor = page.get("cursor")
+        if page.get("list_complete", True) or not cursor:
+            break
+    for name in sorted(names):
+        if int(name[len(prefix):].split(":", 1)[0]) < index.built_at:
+            continue
+        raw = await kv.get(name)
+        if raw:  # expired between list and get
+            index.apply(json.loads(raw))
+
+
+async def _store(kv, key: str, index: SearchIndex):
+    _remember(key, index)
+    if kv is not None:
+        await kv.put(key, index.to_json())
+
+
+async def rebuild(kv, sanity, dataset: str, site: str | None) -> SearchIndex:
+    """Build one view's index from the live API and store it."""
+    # Taken before the read, so a change landing during it is re-applied.
+    built_at = _now_ms()
+    docs = await sanity.query(
+        SEARCH_INDEX_DOCS, dataset, {"site": site, "types": list(INDEXED_TYPES)}, read_mode="live"
+    )
+    index = SearchIndex.from_documents(docs or [], built_at)
+    await _store(kv, index_key(dataset, site), index)
+    return index
+
+
+_builds = SingleFlight()
+
+
+async def build_missing(kv, sanity, dataset: str, site: str | None) -> SearchIndex:
+    """Build one view's index unless it already has one.
+
+    Concurrent calls for a view share one build, and calls that start after
+    it finished find its index, so a burst of misses scans Sanity once.
+    """
+    async def build():
+        index = await load(kv, dataset, site)
+        return index if index is not None else await rebuild(kv, sanity, dataset, site)
+
+    return await _builds.do(index_key(dataset, site), build)
+
+
+async def rebuild_all(kv, sanity) -> int:
+    """Rebuild the index for every site in ``SITE_TO_DATASET`` (cron).
+
+    Returns:
+        The number of (dataset, site) views rebuilt.
+    """
+    views = {resolve_dataset(site) for site in SITE_TO_DATASET}
+    for dataset, site in sorted(views, key=str):
+        try:
+            await rebuild(kv, sanity, dataset, site)
+        except Exception:
+            logger.exception("Search index rebuild failed for %s/%s", dataset, site)
+    return len(views)
+
+
+async def apply_change(kv, dataset: str, site: str | None, doc: dict, deleted: bool = False) -> bool:
+    """Upsert or remove one document in an existing index.
+
+    The change is written as its own KV record rather than by rewriting the
+    index, so concurrent webhooks never lose each other's updates. Views
+    without an index are left alone; their first search builds one.
+
+    Returns:
+        Whether an index was updated.
+    """
+    index = await load(kv, dataset, site)
+    if index is None:
+        return False
+    change = {"doc": doc, "deleted": deleted}
+    index.apply(change)
+    if kv is not None:
+        name = f"{change_prefix(dataset, site)}{_now_ms():013d}:{doc['_id']}"
+        await kv.put(name, json.dumps(change), expirationTtl=CHANGE_TTL_SECONDS)
+    return True
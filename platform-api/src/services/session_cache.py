@@ -0,0 +1,120 @@
+"""In-isolate cache of resolved session tokens.
+
+``_resolve_session_email`` (``dependencies.py``) runs on every
+authenticated request. An admin dashboard page makes dozens of them with
+the same bearer token, and each used to cost a KV read (plus a D1 join on
+a KV miss). This module keeps recent answers in isolate memory:
+
+- **Bounded LRU** — at most ``MAX_ENTRIES`` tokens per isolate.
+- **TTL-aware** — valid sessions are trusted for ``SESSION_TTL`` seconds,
+  well inside the 5-minute KV entry, so an expired or revoked session is
+  noticed quickly.
+- **Negative caching** — tokens that resolved to nothing are remembered
+  for ``NEGATIVE_TTL`` seconds, so a client retrying a dead token does not
+  hit D1 each time.
+- **Hashed keys** — raw bearer tokens are never held as dict keys; entries
+  are keyed by their SHA-256.
+- **Revocation** — ``revoke(token)`` drops a token immediately (see
+  ``POST /auth/revoke``).
+
+Like every module-level cache here, state lives for the isolate only.
+``stats`` counts per isolate; each lookup (and eviction) is also reported
+to Analytics Engine as the ``session_cache`` metric, dimension ``HIT``,
+``NEGATIVE_HIT``, ``MISS`` or ``EVICTED``.
+"""
+
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, fields
+
+from services import metrics
+
+MAX_ENTRIES = 512
+SESSION_TTL = 60
+NEGATIVE_TTL = 30
+
+# Marker for "this token resolved to no session".
+_NEGATIVE = ""
+
+
+@dataclass
+class SessionCacheStats:
+    """Isolate-lifetime counters for the session cache."""
+
+    hits: int = 0
+    negative_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    revocations: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        looked_up = self.hits + self.negative_hits + self.misses
+        return (self.hits + self.negative_hits) / looked_up if looked_up else 0.0
+
+    def as_dict(self) -> dict:
+        return {**asdict(self), "hit_ratio": round(self.hit_ratio, 4)}
+
+    def clear(self):
+        """Zero every counter in place, so imported references stay live."""
+        for counter in fields(self):
+            setattr(self, counter.name, counter.default)
+
+
+stats = SessionCacheStats()
+# (token hash, role) -> (monotonic expiry, email or _NEGATIVE)
+_entries: "OrderedDict[tuple[str, str], tuple[float, str]]" = OrderedDict()
+
+
+def reset():
+    """Drop every entry and zero the counters (tests, deploys)."""
+    _entries.clear()
+    stats.clear()
+
+
+def token_hash(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def lookup(token: str, role: str | None = None) -> tuple[bool, str | None]:
+    """Return ``(found, email)``; ``(True, None)`` is a cached rejection."""
+    key = (token_hash(token), role or "")
+    entry = _entries.get(key)
+    if entry is None or entry[0] <= time.monotonic():
+        if entry is not None:
+            del _entries[key]
+        stats.misses += 1
+        metrics.increment(metrics.SESSION_CACHE, dimension="MISS")
+        return False, None
+
+    _entries.move_to_end(key)
+    if entry[1] == _NEGATIVE:
+        stats.negative_hits += 1
+        metrics.increment(metrics.SESSION_CACHE, dimension="NEGATIVE_HIT")
+        return True, None
+    stats.hits += 1
+    metrics.increment(metrics.SESSION_CACHE, dimension="HIT")
+    return True, entry[1]
+
+
+def store(token: str, email: str | None, role: str | None = None):
+    """Remember a resolved session, or a rejection when ``email`` is None."""
+    ttl = SESSION_TTL if email else NEGATIVE_TTL
+    key = (token_hash(token), role or "")
+    _entries[key] = (time.monotonic() + ttl, email or _NEGATIVE)
+    _entries.move_to_end(key)
+    while len(_entries) > MAX_ENTRIES:
+        _entries.popitem(last=False)
+        stats.evictions += 1
+        metrics.increment(metrics.SESSION_CACHE, dimension="EVICTED")
+
+
+def revoke(token: str) -> int:
+    """Forget ``token`` under every role. Returns the entries removed."""
+    digest = token_hash(token)
+    keys = [key for key in _entries if key[0] == digest]
+    for key in keys:
+        del _entries[key]
+    stats.revocations += 1
+    return len(keys)
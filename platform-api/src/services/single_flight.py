@@ -0,0 +1,71 @@
+"""Request coalescing ("single-flight") for identical concurrent upstream calls.
+
+When a rebuild or an announcement drives a burst of identical requests,
+each one would otherwise issue its own upstream call. ``SingleFlight``
+lets the first caller for a key start the call and makes every concurrent
+caller with the same key await that same call:
+
+- **Results** are shared — every waiter receives the same object, so treat
+  it as read-only.
+- **Errors** propagate — every waiter sees the exception the call raised.
+- **Cancellation** is per waiter — a cancelled waiter (e.g. a client that
+  disconnected) does not cancel the call for the others. The upstream call
+  is only cancelled once *every* waiter has gone away.
+
+Only calls that are in flight are tracked; as soon as the call finishes
+the key is forgotten and the next caller starts a fresh one. Caching
+completed results is ``services.content_cache``'s job.
+"""
+
+import asyncio
+from dataclasses import dataclass
+from typing import Awaitable, Callable, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class _Call:
+    task: asyncio.Future
+    waiters: int = 0
+
+
+class SingleFlight:
+    """Deduplicate concurrent awaitables by key within one event loop."""
+
+    def __init__(self):
+        self._calls: dict[str, _Call] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Return ``await fn()``, sharing one in-flight call per ``key``.
+
+        Args:
+            key: Identity of the call — callers with equal keys coalesce.
+            fn: Zero-argument factory for the awaitable. Only invoked by
+                the caller that starts the flight.
+        """
+        loop = asyncio.get_running_loop()
+        call = self._calls.get(key)
+        if call is None or call.task.done() or call.task.get_loop() is not loop:
+            call = _Call(task=asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _task, key=key, call=call: self._forget(key, call))
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # Nobody is left to receive the result.
+                call.task.cancel()
+
+    def _forget(self, key: str, call: _Call):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if not call.task.cancelled():
+            # Mark the exception as retrieved even if every waiter left.
+            call.task.exception()
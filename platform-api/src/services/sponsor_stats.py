@@ -0,0 +1,118 @@
+"""Materialized per-sponsor project counts.
+
+``GET_SPONSORS`` used to compute ``projectCount`` with a correlated
+``count(*[_type == "project" && references(^._id)])`` per sponsor — an
+N×M scan on Sanity's side that grows with every semester of projects.
+Instead, the counts for each (dataset, site) are tallied from one linear
+pass over project→sponsor references and stored in KV under
+``sponsor-stats:<dataset>:<site>``. ``get_sponsors`` joins them in-process.
+
+The view is rebuilt:
+
+- when a project changes (``POST /content/webhook``),
+- by the cron trigger in ``main.py`` (``Default.scheduled``),
+- on demand, the first time a (dataset, site) is requested.
+"""
+
+import json
+import logging
+import time
+from collections import Counter
+
+from queries.sponsors import GET_SPONSOR_PROJECT_REFS
+from services import request_kv
+from utils.dataset import SITE_TO_DATASET, resolve_dataset
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "sponsor-stats:"
+
+# KV copy outlives several cron periods so a missed run never empties it.
+KV_TTL_SECONDS = 24 * 60 * 60
+
+# In-isolate copies are re-read from KV after this many seconds.
+MEMORY_TTL_SECONDS = 60
+
+_memory: dict[str, tuple[float, dict[str, int]]] = {}
+
+
+def reset():
+    """Forget the in-isolate copies (tests)."""
+    _memory.clear()
+
+
+def stats_key(dataset: str, site: str | None) -> str:
+    return f"{KEY_PREFIX}{dataset}:{site or '*'}"
+
+
+async def compute_project_counts(sanity, dataset: str, site: str | None) -> dict[str, int]:
+    """Tally published projects per sponsor ``_id`` from the live API.
+
+    The live API with a read token also returns drafts, so ``drafts.*``
+    projects are skipped; otherwise a published project with an open draft
+    would be counted twice.
+    """
+    projects = await sanity.query(GET_SPONSOR_PROJECT_REFS, dataset, {"site": site}, read_mode="live")
+    return dict(Counter(
+        project["sponsor"]
+        for project in projects or []
+        if project.get("sponsor") and not project["_id"].startswith("drafts.")
+    ))
+
+
+async def refresh_project_counts(kv, sanity, dataset: str, site: str | None) -> dict[str, int]:
+    """Recompute one (dataset, site) view and store it in memory and KV."""
+    counts = await compute_project_counts(sanity, dataset, site)
+    key = stats_key(dataset, site)
+    _memory[key] = (time.monotonic(), counts)
+    if kv is not None:
+        await request_kv.wrap(kv).put_later(key, json.dumps(counts), expirationTtl=KV_TTL_SECONDS)
+    return counts
+
+
+async def refresh_all(kv, sanity) -> int:
+    """Rebuild the view for every site in ``SITE_TO_DATASET`` (cron).
+
+    Returns:
+        The number of (dataset, site) views rebuilt.
+    """
+    views = {resolve_dataset(site) for site in SITE_TO_DATASET}
+    for dataset, site in sorted(views, key=str):
+        try:
+            await refresh_project_counts(kv, sanity, dataset, site)
+        except Exception:
+            logger.exception("Sponsor stats refresh failed for %s/%s", dataset, site)
+    return len(views)
+
+
+async def get_project_counts(kv, sanity, dataset: str, site: str | None) -> dict[str, int]:
+    """Return ``{sponsor_id: project_count}`` for one (dataset, site).
+
+    Served from memory, then KV; computed (and stored) only when neither
+    has it.
+    """
+    key = stats_key(dataset, site)
+    cached = _memory.get(key)
+    if cached and time.monotonic() - cached[0] < MEMORY_TTL_SECONDS:
+        return cached[1]
+
+    if kv is not None:
+        try:
+            raw = await request_kv.wrap(kv).get(key)
+        except Exception:
+            logger.warning("Sponsor stats KV read failed for %s", key, exc_info=True)
+            raw = None
+        if raw:
+            counts = json.loads(raw)
+            _memory[key] = (time.monotonic(), counts)
+            return counts
+
+    return await refresh_project_counts(kv, sanity, dataset, site)
+
+
+def with_project_counts(sponsors: list[dict], counts: dict[str, int]) -> list[dict]:
+    """Copy each sponsor with its ``projectCount`` joined in.
+
+    Copies, because ``sponsors`` may be a shared cached result.
+    """
+    return [{**s, "projectCount": counts.get(s.get("_id"), 0)} for s in sponsors]
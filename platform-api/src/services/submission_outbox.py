@@ -0,0 +1,171 @@
+"""D1 outbox for form submissions.
+
+``POST /forms/submit`` used to wait for Sanity's mutate API before
+answering, and a Sanity outage lost the submission. Instead the Sanity
+document is inserted into the ``form_submission_outbox`` D1 table
+(``astro-app/migrations/0011_create_form_submission_outbox.sql``) and the
+request is acknowledged. ``flush`` then moves due rows to Sanity:
+
+- **Batched** — up to ``BATCH_SIZE`` rows per run, one ``mutate``
+  transaction per dataset.
+- **Idempotent** — documents are sent as ``createIfNotExists``, so a row
+  flushed twice (overlapping flushers, or a delete that failed after Sanity
+  accepted the batch) is harmless.
+- **Retried** — when a batch fails, its rows are sent again one at a time,
+  so only the rows that still fail are held back: each stays in the outbox
+  with ``attempts`` incremented and ``next_attempt_at`` pushed back by
+  ``backoff_seconds``; ``last_error`` records why it is waiting.
+- **Dead-lettered** — a row Sanity rejects outright (4xx other than 408 and
+  429) or that has failed ``MAX_ATTEMPTS`` times gets ``dead_lettered_at``
+  set (``0012_add_form_outbox_dead_letter.sql``) and is no longer flushed.
+  Rows are never deleted until Sanity has them.
+
+``flush`` runs from the submitting request's ``BackgroundTasks`` and from
+the ``OUTBOX_CRON`` trigger in ``main.py``, which picks up anything a
+request could not deliver.
+"""
+
+import json
+import logging
+import time
+import uuid
+from datetime import datetime, timezone
+
+from services.timing import span
+from utils.js import from_js
+
+logger = logging.getLogger(__name__)
+
+TABLE = "form_submission_outbox"
+
+# Rows moved to Sanity per flush.
+BATCH_SIZE = 50
+
+# Retry delays: BASE_DELAY_SECONDS doubling per attempt, capped.
+BASE_DELAY_SECONDS = 30
+MAX_DELAY_SECONDS = 3600
+
+# Failed flushes before a row is dead-lettered (~6 hours of retries).
+MAX_ATTEMPTS = 12
+
+# Upstream statuses worth retrying even though they are 4xx.
+RETRYABLE_CLIENT_ERRORS = {408, 429}
+
+
+def backoff_seconds(attempts: int) -> int:
+    """Delay before the next flush of a row that has failed ``attempts`` times."""
+    return min(MAX_DELAY_SECONDS, BASE_DELAY_SECONDS * 2 ** max(attempts - 1, 0))
+
+
+def new_document(body) -> dict:
+    """The Sanity ``submission`` document for a ``FormSubmission``."""
+    return {
+        "_id": f"submission.{uuid.uuid4()}",
+        "_type": "submission",
+        "name": body.name,
+        "email": body.email,
+        "organization": body.organization,
+        "message": body.message,
+        "submittedAt": datetime.now(timezone.utc).isoformat(),
+        "status": "submitted",
+        "formType": body.form_type,
+        "site": body.site,
+    }
+
+
+async def enqueue(db, dataset: str, doc: dict) -> None:
+    """Persist ``doc`` for delivery to ``dataset``."""
+    with span("d1"):
+        await db.prepare(
+            f"INSERT INTO {TABLE} (id, dataset, document, created_at) VALUES (?, ?, ?, ?)"
+        ).bind(doc["_id"], dataset, json.dumps(doc), _now_ms()).run()
+
+
+async def flush(db, sanity, write_token: str, limit: int = BATCH_SIZE) -> int:
+    """Send due outbox rows to Sanity; returns how many were delivered.
+
+    Never raises: failed rows are rescheduled or dead-lettered, and a D1
+    error leaves the rows for the next flush.
+    """
+    try:
+        result = await db.prepare(
+            f"SELECT id, dataset, document, attempts FROM {TABLE} "
+            "WHERE dead_lettered_at IS NULL AND next_attempt_at <= ? ORDER BY created_at LIMIT ?"
+        ).bind(_now_ms(), limit).all()
+        rows = from_js(result.results) or []
+    except Exception:
+        logger.exception("Outbox read failed")
+        return 0
+
+    by_dataset: dict[str, list[dict]] = {}
+    for row in rows:
+        by_dataset.setdefault(row["dataset"], []).append(row)
+
+    delivered = 0
+    for dataset, batch in by_dataset.items():
+        try:
+            await _send(sanity, dataset, batch, write_token)
+        except Exception as exc:
+            if len(batch) == 1:
+                await _failed(db, batch[0], exc)
+                continue
+            # One bad document fails the whole transaction; find it.
+            logger.warning("Outbox flush of %d submission(s) to %s failed, retrying singly: %r",
+                           len(batch), dataset, exc)
+            for row in batch:
+                try:
+                    await _send(sanity, dataset, [row], write_token)
+                except Exception as row_exc:
+                    await _failed(db, row, row_exc)
+                    continue
+                delivered += 1
+                await _delete(db, [row])
+            continue
+        delivered += len(batch)
+        await _delete(db, batch)
+    return delivered
+
+
+def is_permanent(exc: Exception) -> bool:
+    """Whether Sanity rejected the request itself, so retrying cannot help."""
+    status = getattr(exc, "status_code", None)
+    return status is not None and 400 <= status < 500 and status not in RETRYABLE_CLIENT_ERRORS
+
+
+async def _send(sanity, dataset: str, rows: list[dict], write_token: str) -> None:
+    mutations = [{"createIfNotExists": json.loads(row["document"])} for row in rows]
+    await sanity.mutate(mutations, dataset=dataset, write_token=write_token)
+
+
+async def _delete(db, rows: list[dict]) -> None:
+    ids = [row["id"] for row in rows]
+    try:
+        await db.prepare(
+            f"DELETE FROM {TABLE} WHERE id IN ({', '.join('?' * len(ids))})"
+        ).bind(*ids).run()
+    except Exception:
+        # Sanity has them; re-sending later is a no-op (createIfNotExists).
+        logger.exception("Outbox delete failed for %d delivered submission(s)", len(ids))
+
+
+async def _failed(db, row: dict, exc: Exception) -> None:
+    """Reschedule ``row`` after a failed send, or dead-letter it."""
+    attempts = row["attempts"] + 1
+    error = repr(exc)[:500]
+    now = _now_ms()
+    if is_permanent(exc) or attempts >= MAX_ATTEMPTS:
+        logger.error("Outbox submission %s dead-lettered after %d attempt(s): %s", row["id"], attempts, error)
+        sql = f"UPDATE {TABLE} SET attempts = ?, dead_lettered_at = ?, last_error = ? WHERE id = ?"
+        params = (attempts, now, error, row["id"])
+    else:
+        logger.warning("Outbox submission %s failed (attempt %d): %s", row["id"], attempts, error)
+        sql = f"UPDATE {TABLE} SET attempts = ?, next_attempt_at = ?, last_error = ? WHERE id = ?"
+        params = (attempts, now + backoff_seconds(attempts) * 1000, error, row["id"])
+    try:
+        await db.prepare(sql).bind(*params).run()
+    except Exception:
+        logger.exception("Outbox reschedule failed for %s", row["id"])
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
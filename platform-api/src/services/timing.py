@@ -0,0 +1,183 @@
+"""Per-request latency spans, reported as a ``Server-Timing`` header.
+
+A slow response can spend its time in settings, KV, D1, Sanity, the route
+handler or response-model serialization. This module times each stage so
+the breakdown shows up in the browser's network panel and in ``curl -I``.
+``services/metrics.py`` reports the same stages to Analytics Engine.
+
+Three pieces work together:
+
+- ``ServerTimingMiddleware`` (pure ASGI, registered outermost in
+  ``app.py``) opens a collector for each HTTP request and adds the
+  ``Server-Timing`` header when the response starts.
+- ``TimedRoute`` (the ``route_class`` of every router) splits the routed
+  part of the request into ``deps`` (body parsing and dependencies),
+  ``handler`` (the endpoint itself) and ``serialize`` (response-model
+  validation and JSON rendering).
+- ``span(name)`` times any block of code. Services wrap their upstream calls
+  in it (``sanity``, ``kv``, ``d1``). Outside a request (cron, tests that
+  call services directly) it does nothing.
+
+Spans with the same name are summed, so ``kv;dur=4.1;desc="3 calls"``
+covers every KV read of the request. Spans can overlap: ``handler``
+includes the ``sanity`` and ``kv`` time spent inside the endpoint.
+"""
+
+import functools
+import inspect
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Any, Callable, Iterator
+
+from fastapi.routing import APIRoute
+
+
+class RequestTimer:
+    """Spans collected while serving one request."""
+
+    def __init__(self):
+        self.started = perf_counter()
+        self.spans: list[tuple[str, float]] = []  # (name, milliseconds)
+        self.endpoint_window: tuple[float, float] | None = None
+
+    def record(self, name: str, duration_ms: float):
+        self.spans.append((name, duration_ms))
+
+    def totals(self) -> dict[str, tuple[float, int]]:
+        """``{name: (total ms, calls)}`` in first-recorded order."""
+        totals: dict[str, tuple[float, int]] = {}
+        for name, duration in self.spans:
+            total, calls = totals.get(name, (0.0, 0))
+            totals[name] = (total + duration, calls + 1)
+        return totals
+
+    def header_value(self) -> str:
+        entries = []
+        for name, (duration, calls) in self.totals().items():
+            entry = f"{name};dur={duration:.1f}"
+            if calls > 1:
+                entry += f';desc="{calls} calls"'
+            entries.append(entry)
+        entries.append(f"total;dur={(perf_counter() - self.started) * 1000:.1f}")
+        return ", ".join(entries)
+
+
+_current: ContextVar[RequestTimer | None] = ContextVar("request_timer", default=None)
+
+
+def current_timer() -> RequestTimer | None:
+    return _current.get()
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Time the enclosed block as ``name`` on the current request, if any."""
+    timer = _current.get()
+    if timer is None:
+        yield
+        return
+    started = perf_counter()
+    try:
+        yield
+    finally:
+        timer.record(name, (perf_counter() - started) * 1000)
+
+
+class ServerTimingMiddleware:
+    """ASGI middleware that adds a ``Server-Timing`` header to every HTTP response.
+
+    Register it last in ``app.py`` so it wraps everything else, including
+    lazy router imports. Background tasks run after the response has
+    started and are not included.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timer = RequestTimer()
+        token = _current.set(timer)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timer.header_value().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+
+
+def _timed_endpoint(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap ``endpoint`` to note when it starts and finishes.
+
+    The wrapper keeps the endpoint's signature (``functools.wraps``) so
+    FastAPI resolves the same parameters, and stays sync or async to match.
+    """
+    if getattr(endpoint, "__server_timing__", False):
+        return endpoint
+
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def timed(*args, **kwargs):
+            started = perf_counter()
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                _mark_endpoint(started)
+    else:
+        @functools.wraps(endpoint)
+        def timed(*args, **kwargs):
+            started = perf_counter()
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                _mark_endpoint(started)
+
+    timed.__server_timing__ = True
+    return timed
+
+
+def _mark_endpoint(started: float):
+    timer = _current.get()
+    if timer is not None:
+        timer.endpoint_window = (started, perf_counter())
+
+
+class TimedRoute(APIRoute):
+    """``APIRoute`` that records ``deps``, ``handler`` and ``serialize`` spans.
+
+    Use it as the router's ``route_class``::
+
+        router = APIRouter(prefix="/content", route_class=TimedRoute)
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs):
+        super().__init__(path, _timed_endpoint(endpoint), **kwargs)
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def timed_handler(request):
+            timer = _current.get()
+            if timer is None:
+                return await handler(request)
+            started = perf_counter()
+            timer.endpoint_window = None
+            response = await handler(request)
+            if timer.endpoint_window is not None:
+                endpoint_started, endpoint_finished = timer.endpoint_window
+                timer.record("deps", (endpoint_started - started) * 1000)
+                timer.record("handler", (endpoint_finished - endpoint_started) * 1000)
+                timer.record("serialize", (perf_counter() - endpoint_finished) * 1000)
+            return response
+
+        return timed_handler
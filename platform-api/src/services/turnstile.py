@@ -4,14 +4,16 @@ from services.http_client import get_client
 
 logger = logging.getLogger(__name__)
 
+SITEVERIFY_URL = "https://challenges.cloudflare.com/turnstile/v0/siteverify"
+
 async def verify_turnstile(token: str, ip: str, secret_key: str | None) -> bool:
     if not secret_key:
         logger.error("verify_turnstile: turnstile_secret_key is not configured")
         return False
     try:
-        async with get_client() as client:
+        async with get_client(origin=SITEVERIFY_URL) as client:
             resp = await client.post(
-                "https://challenges.cloudflare.com/turnstile/v0/siteverify",
+                SITEVERIFY_URL,
                 json={"secret": secret_key, "response": token, "remoteip": ip},
             )
         return bool(resp.json().get("success", False))
@@ -0,0 +1,62 @@
+# src/utils/groq.py
+import hashlib
+import json
+import re
+
+
+def normalize_params(params: dict | None) -> str:
+    """Serialize GROQ params deterministically (sorted keys, compact separators).
+
+    Two calls that differ only in key order produce the same string.
+    ``None`` values are kept rather than dropped: a null param is sent as
+    ``null``, which is not the same query as leaving the param out.
+    """
+    return json.dumps(params or {}, sort_keys=True, separators=(",", ":"), default=str)
+
+
+# A quoted GROQ string literal (kept verbatim) or a whitespace run.
+_WHITESPACE_OR_STRING = re.compile(r""""(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*'|\s+""")
+
+
+def query_fingerprint(dataset: str, groq: str, params: dict | None = None) -> str:
+    """Stable SHA-256 hex digest identifying a (dataset, GROQ, params) read.
+
+    Whitespace runs outside string literals are collapsed so reformatting a
+    query constant does not split cache entries. Whitespace inside quotes
+    is part of the query (``title == "a  b"``) and is kept as written.
+    """
+    compact_groq = _WHITESPACE_OR_STRING.sub(
+        lambda m: m.group(0) if m.group(0)[0] in "\"'" else " ", groq
+    ).strip()
+    payload = f"{dataset}\n{compact_groq}\n{normalize_params(params)}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+_PARAM_REF = re.compile(r"\$([A-Za-z_][A-Za-z0-9_]*)")
+
+
+def namespace_params(groq: str, prefix: str) -> str:
+    """Rename every ``$param`` reference in ``groq`` to ``$<prefix>_param``.
+
+    Lets several queries that use the same param names (``$site``,
+    ``$limit``) be combined into one request without their params colliding.
+    String literals are not parsed, so keep ``$`` out of quoted text.
+    """
+    return _PARAM_REF.sub(lambda m: f"${prefix}_{m.group(1)}", groq)
+
+
+def combine_queries(parts: dict[str, tuple[str, dict]]) -> tuple[str, dict]:
+    """Compile named ``(groq, params)`` pairs into one object-projection query.
+
+    ``{"events": (GET_EVENTS, {...}), "sponsors": (GET_SPONSORS, {...})}``
+    becomes ``{"events": *[...]{...}, "sponsors": *[...]{...}}`` with each
+    part's params namespaced by its name, so Sanity resolves every part in a
+    single round trip and returns ``{"events": [...], "sponsors": [...]}``.
+    """
+    fields = []
+    combined_params = {}
+    for name, (groq, params) in parts.items():
+        fields.append(f"  {json.dumps(name)}: {namespace_params(groq.strip(), name)}")
+        for key, value in params.items():
+            combined_params[f"{name}_{key}"] = value
+    return "{\n" + ",\n".join(fields) + "\n}", combined_params
@@ -0,0 +1,22 @@
+# src/utils/js.py
+"""Conversions between Python values and Workers (JavaScript) objects.
+
+Bindings such as Analytics Engine and Queues expect plain JS objects, not
+Pyodide proxies of Python dicts. Outside the Workers runtime (tests,
+scripts) there is no JS side, so values pass through unchanged.
+"""
+
+try:
+    from js import Object
+    from pyodide.ffi import to_js
+except ImportError:  # Plain CPython (tests, scripts) — no JS objects to build.
+    def to_js_object(value):
+        return value
+else:
+    def to_js_object(value):
+        return to_js(value, dict_converter=Object.fromEntries)
+
+
+def from_js(value):
+    """Python copy of a JS value (e.g. a queue message body); Python values pass through."""
+    return value.to_py() if hasattr(value, "to_py") else value
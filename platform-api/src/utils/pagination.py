@@ -0,0 +1,34 @@
+# src/utils/pagination.py
+"""Opaque keyset cursors for paginated list endpoints.
+
+A cursor encodes the sort key of the last item on a page — for
+submissions ``(submittedAt, _id)`` — so the next page is a range filter
+(``submittedAt < $cursorAt || ...``) instead of ``[$offset...$end]``,
+which makes Sanity sort and skip every earlier row again.
+"""
+
+import base64
+import json
+
+from fastapi import HTTPException
+
+
+def encode_cursor(*key: str) -> str:
+    raw = json.dumps(list(key), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, size: int) -> list[str]:
+    """Decode a cursor made by ``encode_cursor`` with ``size`` key parts.
+
+    Raises:
+        HTTPException(400): If the token is malformed or was tampered with.
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(key, list) or len(key) != size or not all(isinstance(k, str) for k in key):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return key
@@ -0,0 +1,120 @@
+"""Cold-start measurements, run in a fresh interpreter by test_cold_start.py.
+
+Usage: python _cold_start_probe.py <probe>
+
+Prints one JSON object on stdout.
+"""
+
+import json
+import sys
+import time
+import tracemalloc
+import types
+from pathlib import Path
+
+# Same module root as the Workers runtime (and tests/conftest.py).
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+
+ROUTERS = ["routers.health", "routers.content", "routers.forms",
+           "routers.platform", "routers.discord", "routers.auth"]
+
+# Modules main.py must only import inside the cron/queue handlers that use them.
+HANDLER_ONLY_MODULES = ["httpx", "models.settings", "services.sanity_client",
+                        "services.sponsor_stats", "services.search_index",
+                        "services.discord_queue", "services.submission_outbox"]
+
+
+def _peak_rss_kb() -> int:
+    import resource
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss  # macOS reports bytes
+
+
+def probe_import() -> dict:
+    start = time.perf_counter()
+    import app  # noqa: F401
+    elapsed = time.perf_counter() - start
+    for module in ROUTERS:
+        __import__(module)
+    # Without tracemalloc, which roughly doubles the footprint.
+    return {"import_app_ms": elapsed * 1000, "peak_rss_kb": _peak_rss_kb()}
+
+
+def probe_import_main() -> dict:
+    """Import the Worker entrypoint the way the runtime does on a cold start.
+
+    ``workers`` and ``asgi`` only exist inside Pyodide; empty stand-ins let
+    CPython import ``main`` so its own top-level imports are measured.
+    """
+    workers = types.ModuleType("workers")
+    workers.WorkerEntrypoint = object
+    sys.modules["workers"] = workers
+    sys.modules["asgi"] = types.ModuleType("asgi")
+
+    start = time.perf_counter()
+    import main  # noqa: F401
+    elapsed = time.perf_counter() - start
+    loaded = [module for module in HANDLER_ONLY_MODULES if module in sys.modules]
+    return {"import_main_ms": elapsed * 1000, "handler_only_modules_loaded": len(loaded)}
+
+
+def probe_first_request() -> dict:
+    start = time.perf_counter()
+    from app import app
+    from dependencies import get_settings
+    from fastapi.testclient import TestClient
+    from models.settings import WorkerSettings
+    imported = time.perf_counter()
+
+    settings = WorkerSettings(sanity_project_id="bench", api_key="k", admin_api_key="k")
+    app.dependency_overrides[get_settings] = lambda: settings
+    with TestClient(app) as client:
+        t0 = time.perf_counter()
+        client.get("/api/v1/platform/health")
+        health = time.perf_counter()
+        client.get("/api/v1/platform/health")
+        warm = time.perf_counter()
+        client.get("/openapi.json")
+        schema = time.perf_counter()
+
+    return {
+        "first_request_total_ms": (health - start) * 1000,
+        "first_request_ms": (health - t0) * 1000,
+        "warm_request_ms": (warm - health) * 1000,
+        "openapi_all_routers_ms": (schema - warm) * 1000,
+        "import_with_testclient_ms": (imported - start) * 1000,
+    }
+
+
+def _group(filename: str) -> str:
+    """Bucket an allocation by top-level package (or app module under src/)."""
+    parts = filename.replace("\\", "/").split("/")
+    if "site-packages" in parts:
+        return parts[parts.index("site-packages") + 1].split(".")[0]
+    if "src" in parts:
+        rest = parts[parts.index("src") + 1:]
+        return "src/" + (rest[0] if len(rest) > 1 else rest[0].removesuffix(".py"))
+    return "stdlib"
+
+
+def probe_memory() -> dict:
+    tracemalloc.start()
+    import app  # noqa: F401
+    for module in ROUTERS:
+        __import__(module)
+    snapshot = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    groups: dict[str, int] = {}
+    for stat in snapshot.statistics("filename"):
+        key = _group(stat.traceback[0].filename)
+        groups[key] = groups.get(key, 0) + stat.size
+    result = {"tracemalloc_peak_kb": peak / 1024}
+    for key, size in sorted(groups.items(), key=lambda kv: kv[1], reverse=True)[:12]:
+        result[f"alloc_kb[{key}]"] = size / 1024
+    return result
+
+
+if __name__ == "__main__":
+    print(json.dumps(globals()[f"probe_{sys.argv[1]}"]()))
@@ -0,0 +1,61 @@
+"""Benchmark harness for platform-api.
+
+Benchmarks are slow and machine-dependent, so they only run when asked::
+
+    RUN_BENCHMARKS=1 python -m pytest tests/benchmarks -q -s
+
+Each measurement is compared with ``baselines.json``; a test fails when a
+value exceeds its baseline by more than ``BENCHMARK_TOLERANCE`` (default
+1.5, i.e. 50% slower/larger). After an intentional change, refresh the
+stored numbers on the reference machine::
+
+    RUN_BENCHMARKS=1 UPDATE_BENCHMARK_BASELINES=1 python -m pytest tests/benchmarks -q
+"""
+
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+BASELINES_PATH = Path(__file__).parent / "baselines.json"
+
+if not os.environ.get("RUN_BENCHMARKS"):
+    collect_ignore_glob = ["test_*.py"]
+
+
+class Baselines:
+    """Stored reference values keyed by benchmark name (lower is better)."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.values = json.loads(path.read_text()) if path.exists() else {}
+        self.tolerance = float(os.environ.get("BENCHMARK_TOLERANCE", "1.5"))
+        self.update = bool(os.environ.get("UPDATE_BENCHMARK_BASELINES"))
+        self.measured: dict[str, float] = {}
+
+    def check(self, name: str, value: float):
+        """Record ``value`` and fail if it regressed past the tolerance."""
+        value = round(value, 3)
+        self.measured[name] = value
+        baseline = self.values.get(name)
+        print(f"  {name}: {value} (baseline {baseline})")
+        if self.update or baseline is None:
+            return
+        limit = baseline * self.tolerance
+        assert value <= limit, (
+            f"{name} regressed: {value} > {limit:.3f} "
+            f"(baseline {baseline} x tolerance {self.tolerance})"
+        )
+
+    def save(self):
+        merged = {**self.values, **self.measured}
+        self.path.write_text(json.dumps(dict(sorted(merged.items())), indent=2) + "\n")
+
+
+@pytest.fixture(scope="session")
+def baselines():
+    store = Baselines(BASELINES_PATH)
+    yield store
+    if store.update and store.measured:
+        store.save()
@@ -0,0 +1,149 @@
+"""Local stand-ins for Sanity, Cloudflare, Turnstile and Discord.
+
+``UpstreamStandIn`` is an ``httpx.MockTransport`` handler. Installed with
+``http_client.use_transport``, it answers every outgoing request the API
+makes — so benchmarks exercise the real ``SanityClient``, GET/POST query
+encoding, JSON decoding, Pydantic validation and routing, without the
+network. Responses are serialized once per dataset and reused, so the
+stand-in itself adds almost nothing to the measured time.
+"""
+
+import json
+import re
+from urllib.parse import parse_qs, urlsplit
+
+import httpx
+
+TYPES = ("event", "sponsor", "project", "page", "submission")
+TIERS = ("platinum", "gold", "silver", "bronze")
+WORDS = ("smart", "city", "grid", "solar", "health", "data", "robot", "water",
+         "campus", "network", "energy", "vision", "mobile", "secure", "cloud")
+
+_BATCH_PART = re.compile(r'"(\w+)":\s*\*\[\s*_type\s*==\s*"(\w+)"')
+_SINGLE_TYPE = re.compile(r"_type\s*==\s*[\"'](\w+)[\"']")
+
+
+def _title(i: int) -> str:
+    return " ".join(WORDS[(i * k) % len(WORDS)] for k in (1, 3, 7)).title()
+
+
+def build_dataset(size: int) -> dict[str, list[dict]]:
+    """``size`` documents split evenly across the content types."""
+    per_type = max(1, size // len(TYPES))
+    sponsors = [
+        {"_id": f"sponsor-{i}", "name": f"{_title(i)} Corp", "tier": TIERS[i % 4],
+         "website": f"https://sponsor{i}.example.com"}
+        for i in range(per_type)
+    ]
+    return {
+        "event": [
+            {"_id": f"event-{i}", "title": _title(i), "date": f"2026-{1 + i % 12:02d}-{1 + i % 28:02d}T18:00:00Z",
+             "eventType": "lecture", "location": f"Room {i % 300}", "description": f"Talk about {_title(i + 1)}"}
+            for i in range(per_type)
+        ],
+        "sponsor": sponsors,
+        "project": [
+            {"_id": f"project-{i}", "title": _title(i + 2), "slug": f"project-{i}", "status": "active",
+             "sponsor": sponsors[i % len(sponsors)]["name"], "technologyTags": ["Python", "React"],
+             "description": f"Built with {_title(i + 3)}"}
+            for i in range(per_type)
+        ],
+        "page": [
+            {"_id": f"page-{i}", "title": _title(i), "slug": f"page-{i}", "blocks": [{"_type": "text"}]}
+            for i in range(per_type)
+        ],
+        "submission": [
+            {"_id": f"submission-{i:06d}", "name": "Jane Doe", "email": f"jane{i}@example.com",
+             "organization": "Acme", "submittedAt": f"2026-01-01T00:{i // 60 % 60:02d}:{i % 60:02d}Z",
+             "status": "submitted", "formType": "contact", "site": "capstone"}
+            for i in range(per_type)
+        ],
+    }
+
+
+class UpstreamStandIn:
+    """Answers Sanity, Cloudflare, Turnstile and Discord requests."""
+
+    def __init__(self, size: int):
+        self.docs = build_dataset(size)
+        self.requests = 0
+        self._encoded: dict[str, bytes] = {}
+
+    @property
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self)
+
+    def _result(self, key: str, build) -> httpx.Response:
+        body = self._encoded.get(key)
+        if body is None:
+            body = self._encoded[key] = json.dumps({"result": build()}).encode()
+        return httpx.Response(200, content=body, headers={"content-type": "application/json"})
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        host, path = request.url.host, request.url.path
+        if host.endswith("sanity.io"):
+            if "/data/mutate/" in path:
+                return httpx.Response(200, json={"transactionId": "bench", "results": [{"id": "new"}]})
+            return self._sanity_query(request)
+        if host == "challenges.cloudflare.com":
+            return httpx.Response(200, json={"success": True})
+        if host == "api.cloudflare.com":
+            if path.endswith("/graphql"):
+                groups = [{"dimensions": {"datetimeHour": f"2026-01-01T{h:02d}:00:00Z"}, "sum": {"double1": h}}
+                          for h in range(24)]
+                return httpx.Response(200, json={"data": {"viewer": {"accounts": [
+                    {"analyticsEngineEventsAdaptiveGroups": groups}]}}})
+            if path.endswith("/deployments"):
+                return httpx.Response(200, json={"result": [{"url": "https://capstone.pages.dev",
+                    "created_on": "2026-01-01T00:00:00Z", "environment": "production",
+                    "latest_stage": {"status": "success"}}]})
+            return httpx.Response(200, json={"success": True})
+        if host in ("discord.com", "discordapp.com"):
+            return httpx.Response(200, json={"id": "1"})
+        return httpx.Response(404, json={"error": f"no stand-in for {host}"})
+
+    def _sanity_query(self, request: httpx.Request) -> httpx.Response:
+        if request.method == "GET":
+            qs = parse_qs(urlsplit(str(request.url)).query)
+            groq = qs["query"][0]
+            params = {k[1:]: json.loads(v[0]) for k, v in qs.items() if k.startswith("$")}
+        else:
+            body = json.loads(request.content)
+            groq, params = body["query"], body.get("params") or {}
+
+        stripped = groq.strip()
+        if "sponsor._ref" in groq:
+            return self._result("refs", lambda: [
+                {"_id": project["_id"], "sponsor": self.docs["sponsor"][i % len(self.docs["sponsor"])]["_id"]}
+                for i, project in enumerate(self.docs["project"])
+            ])
+        if "match $searchTerm" in groq:
+            return self._result("search", lambda: [
+                {"_id": d["_id"], "_type": "event", "title": d["title"], "_score": 1.0}
+                for d in self.docs["event"][:10]
+            ])
+        if "_type in $types" in groq:
+            return self._result("index-docs", lambda: [
+                {**d, "_type": t} for t in ("event", "sponsor", "project") for d in self.docs[t]
+            ])
+        if "'submission'" in groq:
+            fetch = params.get("fetch", 21)
+            start = 0
+            if "cursorId" in params:
+                start = next((i + 1 for i, d in enumerate(self.docs["submission"])
+                              if d["_id"] == params["cursorId"]), 0)
+            rows = self.docs["submission"][start:start + fetch]
+            if stripped.startswith("{"):
+                total = len(self.docs["submission"])
+                return self._result(f"submissions:{start}:{fetch}:total", lambda: {"items": rows, "total": total})
+            return self._result(f"submissions:{start}:{fetch}", lambda: rows)
+        if stripped.startswith("{"):
+            parts = _BATCH_PART.findall(groq)
+            return self._result("batch:" + ",".join(n for n, _ in parts), lambda: {
+                name: self.docs.get(doc_type, []) for name, doc_type in parts
+            })
+        match = _SINGLE_TYPE.search(groq)
+        doc_type = match.group(1) if match else ""
+        limit = params.get("limit")
+        return self._result(f"type:{doc_type}:{limit}", lambda: self.docs.get(doc_type, [])[:limit])
@@ -0,0 +1,58 @@
+# tests/benchmarks/test_cold_start.py
+"""Cold-start cost of platform-api: import time, first request, memory.
+
+CPython numbers are a proxy for Pyodide: compare them against the stored
+baselines to catch regressions rather than reading them as Workers times.
+
+Each probe runs in a fresh interpreter (``_cold_start_probe.py``) so
+nothing is already imported. Times are the median of ``RUNS`` runs.
+"""
+
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).parent.parent.parent / "src"
+PROBE = Path(__file__).parent / "_cold_start_probe.py"
+RUNS = 5
+
+# Workers isolate memory limit (see main.py).
+WORKERS_MEMORY_LIMIT_KB = 128 * 1024
+
+
+def _run(probe: str) -> dict:
+    out = subprocess.run(
+        [sys.executable, str(PROBE), probe], cwd=SRC, capture_output=True, text=True, check=True
+    )
+    return json.loads(out.stdout)
+
+
+def _median(probe: str) -> dict:
+    runs = [_run(probe) for _ in range(RUNS)]
+    return {key: statistics.median(r[key] for r in runs) for key in runs[0]}
+
+
+def test_import_time_and_rss(baselines):
+    result = _median("import")
+    assert result["peak_rss_kb"] < WORKERS_MEMORY_LIMIT_KB
+    baselines.check("import_app_ms", result["import_app_ms"])
+    baselines.check("peak_rss_kb", result["peak_rss_kb"])
+
+
+def test_import_main_defers_handler_imports(baselines):
+    result = _median("import_main")
+    assert result["handler_only_modules_loaded"] == 0
+    baselines.check("import_main_ms", result["import_main_ms"])
+
+
+def test_first_request_latency(baselines):
+    for name, value in _median("first_request").items():
+        baselines.check(name, value)
+
+
+def test_memory_footprint(baselines):
+    result = _run("memory")
+    for name, value in result.items():
+        baselines.check(name, value)
@@ -0,0 +1,184 @@
+# tests/benchmarks/test_endpoint_latency.py
+"""Per-route latency and throughput against local upstream stand-ins.
+
+Every ``/api/v1`` route is called through ``TestClient`` with the real
+``SanityClient``, caches and models; only the network is replaced
+(``standins.UpstreamStandIn`` via ``http_client.use_transport``). For each
+dataset size the suite reports, per route, the cold first request and
+p50/p95/p99 over ``BENCHMARK_REQUESTS`` warm requests.
+
+    RUN_BENCHMARKS=1 BENCHMARK_DATASET_SIZES=1000,50000 python -m pytest tests/benchmarks/test_endpoint_latency.py -q -s
+
+Only p95 is compared with ``baselines.json``.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import os
+import statistics
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import app
+from dependencies import get_settings
+from models.settings import WorkerSettings
+from services import http_client, rate_limiter
+from tests.benchmarks.standins import UpstreamStandIn
+
+SIZES = [int(s) for s in os.environ.get("BENCHMARK_DATASET_SIZES", "1000,10000,50000").split(",")]
+REQUESTS = int(os.environ.get("BENCHMARK_REQUESTS", "30"))
+
+ADMIN = {"Authorization": "Bearer bench-session"}
+WEBHOOK_SECRET = "bench-webhook-secret"
+
+
+class DictKV:
+    def __init__(self):
+        self.store = {}
+
+    async def get(self, key, **kwargs):
+        return self.store.get(key)
+
+    async def put(self, key, value, *args, **kwargs):
+        self.store[key] = value
+
+    async def delete(self, key):
+        self.store.pop(key, None)
+
+    async def list(self, prefix="", **kwargs):
+        return {"keys": [{"name": k} for k in self.store if k.startswith(prefix)], "list_complete": True}
+
+
+class SessionD1:
+    """Answers the session lookup in ``_resolve_session_email``; accepts outbox writes."""
+
+    def prepare(self, query):
+        return self
+
+    def bind(self, *args):
+        return self
+
+    async def first(self):
+        return type("Row", (), {"email": "admin@example.com", "role": "sponsor"})()
+
+    async def all(self):
+        return type("Rows", (), {"results": []})()
+
+    async def run(self):
+        return type("Result", (), {"success": True})()
+
+
+def _settings() -> WorkerSettings:
+    kv = DictKV()
+    kv.store["discord-webhook:announcements"] = "https://discord.com/api/webhooks/1/bench"
+    kv.store["discord-webhook:form-submissions"] = "https://discord.com/api/webhooks/2/bench"
+    return WorkerSettings(
+        sanity_project_id="bench",
+        api_key="k", admin_api_key="k",
+        sanity_api_write_token="write", sanity_webhook_secret=WEBHOOK_SECRET,
+        turnstile_secret_key="turnstile", cf_api_token="cf", cf_account_id="acct",
+        cf_deploy_hook_capstone="https://api.cloudflare.com/client/v4/pages/webhooks/deploy_hooks/bench",
+        kv=kv, db=SessionD1(),
+    )
+
+
+def _signed_webhook(i: int) -> dict:
+    body = json.dumps({"_id": f"event-{i}", "_type": "event", "dataset": "production",
+                       "title": f"Updated event {i}"}).encode()
+    t = int(time.time() * 1000)
+    digest = hmac.new(WEBHOOK_SECRET.encode(), f"{t}.".encode() + body, hashlib.sha256).digest()
+    sig = base64.urlsafe_b64encode(digest).decode().rstrip("=")
+    return {"content": body, "headers": {"sanity-webhook-signature": f"t={t},v1={sig}"}}
+
+
+@dataclass
+class Route:
+    name: str
+    call: Callable[[TestClient, int], object]
+
+
+def _form(i: int) -> dict:
+    return {"json": {"site": "capstone", "name": "Jane", "email": f"jane{i}@example.com",
+                     "message": "A realistic enquiry message", "cf-turnstile-response": "token"},
+            "headers": {"CF-Connecting-IP": "10.0.0.1"}}
+
+
+ROUTES = [
+    Route("GET /platform/health", lambda c, i: c.get("/api/v1/platform/health")),
+    Route("GET /content/pages", lambda c, i: c.get("/api/v1/content/pages")),
+    Route("GET /content/events", lambda c, i: c.get("/api/v1/content/events?limit=50")),
+    Route("GET /content/sponsors", lambda c, i: c.get("/api/v1/content/sponsors")),
+    Route("GET /content/projects", lambda c, i: c.get("/api/v1/content/projects")),
+    Route("POST /content/batch", lambda c, i: c.post("/api/v1/content/batch", json={"site": "capstone", "requests": [
+        {"name": "events", "resource": "events", "limit": 20},
+        {"name": "sponsors", "resource": "sponsors"}]})),
+    Route("POST /content/search", lambda c, i: c.post("/api/v1/content/search", json={"query": "smart ci"})),
+    Route("POST /content/mutations", lambda c, i: c.post("/api/v1/content/mutations", headers=ADMIN, json={
+        "dataset": "production", "mutations": [{"create": {"_type": "note", "title": f"n{i}"}}]})),
+    Route("POST /content/webhook", lambda c, i: c.post("/api/v1/content/webhook", **_signed_webhook(i))),
+    Route("POST /forms/submit", lambda c, i: c.post("/api/v1/forms/submit", **_form(i))),
+    Route("GET /forms/submissions", lambda c, i: c.get("/api/v1/forms/submissions?limit=50&include_total=true", headers=ADMIN)),
+    Route("GET /platform/deploy-status", lambda c, i: c.get("/api/v1/platform/deploy-status?site=capstone")),
+    Route("GET /platform/deploy-status/all", lambda c, i: c.get("/api/v1/platform/deploy-status/all")),
+    Route("POST /platform/rebuild", lambda c, i: c.post("/api/v1/platform/rebuild?site=capstone", headers=ADMIN)),
+    Route("GET /platform/analytics", lambda c, i: c.get("/api/v1/platform/analytics?period=7d", headers=ADMIN)),
+    Route("POST /discord/notify", lambda c, i: c.post("/api/v1/discord/notify", json={
+        "channel": "announcements", "title": "Bench", "message": f"Message {i}"})),
+    Route("POST /auth/token", lambda c, i: c.post("/api/v1/auth/token", data={
+        "username": "admin@example.com", "password": "bench-session"})),
+]
+
+
+def _percentile(samples: list[float], pct: int) -> float:
+    return statistics.quantiles(samples, n=100, method="inclusive")[pct - 1]
+
+
+@pytest.fixture(scope="module")
+def report():
+    rows = []
+    yield rows
+    print(f"\n{'route':<32} {'docs':>6} {'cold ms':>8} {'p50':>7} {'p95':>7} {'p99':>7} {'req/s':>8}")
+    for row in rows:
+        print(f"{row['route']:<32} {row['size']:>6} {row['cold']:>8.1f} {row['p50']:>7.2f} "
+              f"{row['p95']:>7.2f} {row['p99']:>7.2f} {row['rps']:>8.0f}")
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_endpoint_latency(size, baselines, report):
+    upstream = UpstreamStandIn(size)
+    http_client.use_transport(upstream.transport)
+    settings = _settings()
+    app.dependency_overrides[get_settings] = lambda: settings
+    try:
+        with TestClient(app) as client:
+            for route in ROUTES:
+                rate_limiter.reset()
+                start = time.perf_counter()
+                response = route.call(client, 0)
+                cold = (time.perf_counter() - start) * 1000
+                assert response.status_code < 300, (route.name, response.status_code, response.text[:200])
+
+                samples = []
+                for i in range(1, REQUESTS + 1):
+                    rate_limiter.reset()
+                    start = time.perf_counter()
+                    response = route.call(client, i)
+                    samples.append((time.perf_counter() - start) * 1000)
+                    assert response.status_code < 300, (route.name, response.status_code)
+
+                p95 = _percentile(samples, 95)
+                report.append({
+                    "route": route.name, "size": size, "cold": cold,
+                    "p50": _percentile(samples, 50), "p95": p95, "p99": _percentile(samples, 99),
+                    "rps": len(samples) / (sum(samples) / 1000),
+                })
+                baselines.check(f"latency_p95_ms[{route.name} @{size}]", p95)
+    finally:
+        http_client.use_transport(None)
+        app.dependency_overrides.clear()
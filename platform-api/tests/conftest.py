@@ -32,6 +32,7 @@ Important:
     standard Python raises ``ModuleNotFoundError``.
 """
 
+import sqlite3
 import sys
 from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock
@@ -57,7 +58,7 @@ class MockKV:
         - ``get(key)`` — Returns the value for a key, or None.
         - ``put(key, value)`` — Stores a value at a key.
         - ``delete(key)`` — Removes a key.
-        - ``list()`` — Returns an object with a ``keys`` attribute.
+        - ``list(prefix=...)`` — Returns ``{"keys": [{"name": ...}], "list_complete": True}``.
 
     Example in tests::
 
@@ -82,9 +83,9 @@ class MockKV:
         """Remove a key from the store."""
         self._store.pop(key, None)
 
-    async def list(self, **kwargs):
-        """List all keys in the namespace."""
-        return MagicMock(keys=[MagicMock(name=k) for k in self._store])
+    async def list(self, prefix="", **kwargs):
+        """List the keys starting with ``prefix`` (one page holds them all)."""
+        return {"keys": [{"name": k} for k in sorted(self._store) if k.startswith(prefix)], "list_complete": True}
 
 
 class MockD1:
@@ -123,6 +124,96 @@ class MockD1:
         return MagicMock(success=True)
 
 
+class SqliteD1:
+    """D1 stand-in backed by an in-memory SQLite database.
+
+    Unlike ``MockD1`` it executes the SQL, so tests can apply real
+    migrations from ``astro-app/migrations`` and inspect the rows::
+
+        db = SqliteD1()
+        db.apply_migration("0011_create_form_submission_outbox.sql")
+        rows = db.rows("SELECT * FROM form_submission_outbox")
+    """
+
+    MIGRATIONS = Path(__file__).parent.parent.parent / "astro-app" / "migrations"
+
+    def __init__(self):
+        self.conn = sqlite3.connect(":memory:", check_same_thread=False)  # TestClient runs the app in a worker thread
+        self.conn.row_factory = sqlite3.Row
+
+    def apply_migration(self, name: str):
+        self.conn.executescript((self.MIGRATIONS / name).read_text())
+
+    def rows(self, sql: str, *params) -> list[dict]:
+        return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def prepare(self, query):
+        return _SqliteStatement(self, query)
+
+
+class _SqliteStatement:
+    def __init__(self, db: SqliteD1, query: str, params: tuple = ()):
+        self.db, self.query, self.params = db, query, params
+
+    def bind(self, *params):
+        return _SqliteStatement(self.db, self.query, params)
+
+    async def all(self):
+        return MagicMock(results=self.db.rows(self.query, *self.params))
+
+    async def first(self):
+        rows = self.db.rows(self.query, *self.params)
+        return rows[0] if rows else None
+
+    async def run(self):
+        self.db.conn.execute(self.query, self.params)
+        self.db.conn.commit()
+        return MagicMock(success=True)
+
+
+@pytest.fixture
+def outbox_db():
+    """A ``SqliteD1`` with the form submission outbox migrations applied."""
+    db = SqliteD1()
+    db.apply_migration("0011_create_form_submission_outbox.sql")
+    db.apply_migration("0012_add_form_outbox_dead_letter.sql")
+    return db
+
+
+@pytest.fixture(autouse=True)
+def reset_isolate_state():
+    """Clear module-level (per-isolate) caches so tests don't leak state.
+
+    Several services keep in-memory state for the lifetime of a Workers
+    isolate. Under pytest every test is a "fresh isolate".
+    """
+    from models.settings import reset_settings_cache
+    from services import (
+        analytics_rollup, content_cache, discord_queue, rate_limiter, runtime_config, search_index,
+        session_cache, sponsor_stats,
+    )
+
+    content_cache.reset()
+    sponsor_stats.reset()
+    search_index.reset()
+    rate_limiter.reset()
+    session_cache.reset()
+    analytics_rollup.reset()
+    discord_queue.reset()
+    runtime_config.reset()
+    reset_settings_cache()
+    yield
+    content_cache.reset()
+    sponsor_stats.reset()
+    search_index.reset()
+    rate_limiter.reset()
+    session_cache.reset()
+    analytics_rollup.reset()
+    discord_queue.reset()
+    runtime_config.reset()
+    reset_settings_cache()
+
+
 @pytest.fixture
 def mock_settings():
     """Create a ``WorkerSettings`` with all bindings and secrets stubbed.
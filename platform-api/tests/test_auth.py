@@ -18,6 +18,9 @@ class MockKV:
     async def put(self, key, value, **kwargs):
         self.store[key] = value
 
+    async def delete(self, key):
+        self.store.pop(key, None)
+
 
 class MockDB:
     def __init__(self, return_value=None):
@@ -169,4 +172,59 @@ def test_cache_hit_short_circuits_require_sponsor(client, mock_db, mock_kv):
     
     assert response.status_code == 200
     # The cache handled the auth layer; D1 shouldn't have been queried
-    assert mock_db.call_count == 0
\ No newline at end of file
+    assert mock_db.call_count == 0
+
+
+def test_repeat_requests_skip_kv_after_first_hit(client, mock_db, mock_kv):
+    """Memory tier answers repeat calls; neither KV nor D1 is read again."""
+    from services import session_cache
+
+    headers = {"Authorization": "Bearer dashboard_token"}
+    assert client.get("/api/v1/forms/submissions", headers=headers).status_code == 200
+    assert mock_kv.store["session_token:dashboard_token"] == "sponsor@test.com"
+
+    kv_reads = []
+    original_get = mock_kv.get
+    async def counting_get(key, **kwargs):
+        kv_reads.append(key)
+        return await original_get(key, **kwargs)
+    mock_kv.get = counting_get
+
+    for _ in range(5):
+        assert client.get("/api/v1/forms/submissions", headers=headers).status_code == 200
+    assert kv_reads == []
+    assert mock_db.call_count == 1
+    assert session_cache.stats.hits == 5
+    assert "dashboard_token" not in repr(list(session_cache._entries))
+
+
+def test_session_cache_lookups_are_reported_as_metrics(client, mock_db, monkeypatch):
+    from services import metrics
+
+    recorded = []
+    monkeypatch.setattr(metrics, "increment", lambda name, value=1, dimension="": recorded.append((name, dimension)))
+
+    headers = {"Authorization": "Bearer metrics_token"}
+    for _ in range(2):
+        assert client.get("/api/v1/forms/submissions", headers=headers).status_code == 200
+
+    assert [d for name, d in recorded if name == metrics.SESSION_CACHE] == ["MISS", "HIT"]
+
+
+def test_invalid_token_is_negatively_cached(client, mock_db):
+    mock_db.return_value = None
+    headers = {"Authorization": "Bearer dead_token"}
+    for _ in range(3):
+        assert client.get("/api/v1/forms/submissions", headers=headers).status_code == 401
+    assert mock_db.call_count == 1
+
+
+def test_revoke_drops_cached_session(client, mock_db, mock_kv):
+    headers = {"Authorization": "Bearer revoked_token"}
+    assert client.get("/api/v1/forms/submissions", headers=headers).status_code == 200
+
+    assert client.post("/api/v1/auth/revoke", headers=headers).status_code == 204
+    assert "session_token:revoked_token" not in mock_kv.store
+
+    mock_db.return_value = None  # the session row is gone too
+    assert client.get("/api/v1/forms/submissions", headers=headers).status_code == 401
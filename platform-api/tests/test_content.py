@@ -10,14 +10,24 @@ from models.settings import WorkerSettings
 
 
 class MockSanityClient:
-    def __init__(self):
+    def __init__(self, read_mode="auto"):
         self.project_id = "test-project"
         self.token = "test-token"
+        self.read_mode = read_mode
+
+    def with_read_mode(self, read_mode):
+        return MockSanityClient(read_mode)
 
-    async def query(self, groq: str, _dataset: str, _params: dict | None = None):
+    async def query(self, groq: str, _dataset: str, _params: dict | None = None, **_kwargs):
         lower = groq.lower()
+        if "sponsor._ref" in lower:
+            return [
+                {"_id": "proj-1", "sponsor": "sponsor-1"},
+                {"_id": "proj-2", "sponsor": "sponsor-1"},
+                {"_id": "proj-3", "sponsor": "sponsor-2"},
+            ]
         if "_type == \"sponsor\"" in lower:
-            return[{"_id": "sponsor-1", "name": "Acme Corp", "tier": "gold", "website": "https://acme.com", "projectCount": 2}]
+            return[{"_id": "sponsor-1", "name": "Acme Corp", "tier": "gold", "website": "https://acme.com"}]
         elif "_type == \"event\"" in lower:
             return[{"_id": "evt-1", "title": "Tech Talk", "date": "2026-04-01T18:00:00Z", "eventType": "lecture", "location": "Room 101", "description": "A great talk"}]
         elif "_type == \"project\"" in lower:
@@ -38,6 +48,7 @@ def client():
         mock = MagicMock(spec=WorkerSettings)
         mock.optional_secrets = {"sanity_api_write_token": "test-write-token"}
         mock.env_vars = {"sanity_project_id": "test"}
+        mock.kv = None
         return mock
 
     # Mock the new OAuth2 dependency
@@ -67,6 +78,14 @@ def test_get_sponsors(client):
     assert response.headers["Cache-Control"] == "public, max-age=60"
 
 
+def test_get_sponsors_joins_precomputed_project_counts(client):
+    from services import sponsor_stats
+
+    response = client.get("/api/v1/content/sponsors")
+    assert response.json()[0]["projectCount"] == 2
+    assert sponsor_stats._memory["sponsor-stats:production:*"][1] == {"sponsor-1": 2, "sponsor-2": 1}
+
+
 def test_get_events(client):
     response = client.get("/api/v1/content/events?upcoming=true&limit=5")
     assert response.status_code == 200
@@ -109,4 +128,349 @@ def test_mutations_with_valid_admin_key(client):
         json={"mutations":[{"create": {"_type": "event", "title": "Test"}}], "dataset": "production"},
         headers={"Authorization": "Bearer valid-test-token"},
     )
-    assert response.status_code == 200
\ No newline at end of file
+    assert response.status_code == 200
+
+def test_content_cache_hit_skips_sanity(client):
+    calls = []
+
+    class CountingSanity(MockSanityClient):
+        async def query(self, groq, dataset, params=None):
+            calls.append(groq)
+            return await super().query(groq, dataset, params)
+
+    app.dependency_overrides[get_sanity] = lambda: CountingSanity()
+
+    first = client.get("/api/v1/content/events?limit=3")
+    second = client.get("/api/v1/content/events?limit=3")
+
+    assert first.headers["X-Cache"] == "MISS"
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.json() == first.json()
+    assert len(calls) == 1
+
+    # Different params are a different cache entry
+    third = client.get("/api/v1/content/events?limit=4")
+    assert third.headers["X-Cache"] == "MISS"
+    assert len(calls) == 2
+
+
+def test_content_cache_serves_stale_and_revalidates(client, monkeypatch):
+    from services import content_cache
+
+    response = client.get("/api/v1/content/pages")
+    assert response.headers["X-Cache"] == "MISS"
+
+    # Age every entry past "fresh" but inside the stale window
+    for _, entry in content_cache._memory.values():
+        entry["stored_at"] -= content_cache.ROUTE_TTLS["pages"].fresh + 1
+
+    stale = client.get("/api/v1/content/pages")
+    assert stale.headers["X-Cache"] == "STALE"
+    # The background revalidation refilled the entry
+    assert client.get("/api/v1/content/pages").headers["X-Cache"] == "HIT"
+    assert content_cache.stats.stale_hits == 1
+
+
+@pytest.mark.asyncio
+async def test_content_cache_kv_tier():
+    from services import content_cache
+    from services.content_cache import ContentCache
+
+    class DictKV:
+        def __init__(self):
+            self.store = {}
+        async def get(self, key, **kwargs):
+            return self.store.get(key)
+        async def put(self, key, value, **kwargs):
+            self.store[key] = value
+
+    kv = DictKV()
+    sanity = MockSanityClient()
+    result, status = await ContentCache(kv=kv).query("projects", sanity, "*[_type == \"project\"]", "production", {"site": None})
+    assert status == "MISS"
+    assert len(kv.store) == 1
+
+    # A new isolate (empty in-memory tier) is answered from KV
+    stats = content_cache.stats
+    content_cache.reset()
+    cached, status = await ContentCache(kv=kv).query("projects", sanity, "*[_type == \"project\"]", "production", {"site": None})
+    assert status == "HIT"
+    assert cached == result
+    # reset() zeroes the counters in place, so held references see new counts
+    assert content_cache.stats is stats and stats.kv_hits == 1
+
+
+def test_batch_resolves_all_parts_in_one_query(client):
+    queries = []
+
+    class BatchSanity(MockSanityClient):
+        async def query(self, groq, dataset, params=None, **kwargs):
+            if "sponsor._ref" in groq:
+                return await super().query(groq, dataset, params)
+            queries.append((groq, params))
+            return {
+                "events": await super().query('_type == "event"', dataset),
+                "sponsors": await super().query('_type == "sponsor"', dataset),
+                "projects": await super().query('_type == "project"', dataset),
+            }
+
+    app.dependency_overrides[get_sanity] = lambda: BatchSanity()
+
+    response = client.post("/api/v1/content/batch", json={
+        "site": "rwc-us",
+        "requests": [
+            {"name": "events", "resource": "events", "limit": 5},
+            {"name": "sponsors", "resource": "sponsors", "tier": "gold"},
+            {"name": "projects", "resource": "projects"},
+        ],
+    })
+
+    assert response.status_code == 200
+    data = response.json()
+    assert set(data) == {"events", "sponsors", "projects"}
+    assert data["sponsors"][0]["projectCount"] == 2
+    assert data["events"][0]["eventType"] == "lecture"
+
+    assert len(queries) == 1
+    groq, params = queries[0]
+    assert groq.startswith("{") and '"events": *[' in groq
+    assert "$events_limit" in groq and "$sponsors_tier" in groq
+    assert params["events_limit"] == 5
+    assert params["sponsors_tier"] == "gold"
+    assert params["projects_site"] == "rwc-us"
+
+
+def test_batch_rejects_duplicate_names(client):
+    response = client.post("/api/v1/content/batch", json={
+        "requests": [
+            {"name": "a", "resource": "events"},
+            {"name": "a", "resource": "pages"},
+        ],
+    })
+    assert response.status_code == 422
+
+
+def test_combine_queries_namespaces_params():
+    from utils.groq import combine_queries
+
+    groq, params = combine_queries({
+        "a": ("*[site == $site][0...$limit]", {"site": "x", "limit": 2}),
+        "b": ("*[site == $site]", {"site": None}),
+    })
+    assert '"a": *[site == $a_site][0...$a_limit]' in groq
+    assert '"b": *[site == $b_site]' in groq
+    assert params == {"a_site": "x", "a_limit": 2, "b_site": None}
+
+
+
+def test_query_fingerprint_keeps_whitespace_inside_strings():
+    from utils.groq import query_fingerprint
+
+    assert query_fingerprint("d", '*[a == "x"]\n  {b}') == query_fingerprint("d", '*[a == "x"] {b}')
+    assert query_fingerprint("d", '*[a == "x  y"]') != query_fingerprint("d", '*[a == "x y"]')
+    assert query_fingerprint("d", "*[a == 'x  y']") != query_fingerprint("d", "*[a == 'x y']")
+
+WEBHOOK_SECRET = "test-webhook-secret"
+
+
+def _signed(body: bytes, secret: str = WEBHOOK_SECRET) -> dict:
+    import base64, hashlib, hmac, time
+
+    timestamp = int(time.time() * 1000)
+    digest = hmac.new(secret.encode(), f"{timestamp}.".encode() + body, hashlib.sha256).digest()
+    signature = base64.urlsafe_b64encode(digest).decode().rstrip("=")
+    return {"sanity-webhook-signature": f"t={timestamp},v1={signature}", "content-type": "application/json"}
+
+
+@pytest.fixture
+def webhook_client(client):
+    def _settings():
+        mock = MagicMock(spec=WorkerSettings)
+        mock.optional_secrets = {"sanity_webhook_secret": WEBHOOK_SECRET}
+        mock.env_vars = {"sanity_project_id": "test"}
+        mock.kv = None
+        return mock
+
+    app.dependency_overrides[get_settings] = _settings
+    return client
+
+
+def test_webhook_invalidates_only_affected_entries(webhook_client):
+    import json
+
+    client = webhook_client
+    client.get("/api/v1/content/projects?site=rwc-us")
+    client.get("/api/v1/content/projects?site=rwc-intl")
+    client.get("/api/v1/content/events?site=rwc-us")
+    assert client.get("/api/v1/content/projects?site=rwc-us").headers["X-Cache"] == "HIT"
+
+    body = json.dumps({"_id": "proj-1", "_type": "project", "site": "rwc-us", "dataset": "rwc"}).encode()
+    response = client.post("/api/v1/content/webhook", content=body, headers=_signed(body))
+
+    assert response.status_code == 200
+    assert response.json() == {"invalidated": 1, "tags": ["rwc:rwc-us:project"]}
+    assert client.get("/api/v1/content/projects?site=rwc-us").headers["X-Cache"] == "MISS"
+    assert client.get("/api/v1/content/projects?site=rwc-intl").headers["X-Cache"] == "HIT"
+    assert client.get("/api/v1/content/events?site=rwc-us").headers["X-Cache"] == "HIT"
+
+
+@pytest.mark.asyncio
+async def test_sponsor_project_counts_exclude_drafts():
+    from services.sponsor_stats import compute_project_counts
+
+    class DraftsSanity:
+        async def query(self, groq, dataset, params=None, **kwargs):
+            return [
+                {"_id": "proj-1", "sponsor": "sponsor-1"},
+                {"_id": "drafts.proj-1", "sponsor": "sponsor-1"},  # open draft of a published project
+                {"_id": "drafts.proj-2", "sponsor": "sponsor-2"},  # never published
+                {"_id": "proj-3", "sponsor": "sponsor-2"},
+            ]
+
+    assert await compute_project_counts(DraftsSanity(), "production", None) == {"sponsor-1": 1, "sponsor-2": 1}
+
+
+def test_webhook_project_change_rebuilds_sponsor_stats(webhook_client):
+    import json
+    from services import sponsor_stats
+
+    sponsor_stats._memory["sponsor-stats:rwc:rwc-us"] = (float("inf"), {"sponsor-1": 9})
+    body = json.dumps({"_id": "proj-1", "_type": "project", "site": "rwc-us", "dataset": "rwc"}).encode()
+    response = webhook_client.post("/api/v1/content/webhook", content=body, headers=_signed(body))
+
+    assert response.status_code == 200
+    assert sponsor_stats._memory["sponsor-stats:rwc:rwc-us"][1] == {"sponsor-1": 2, "sponsor-2": 1}
+    assert "sponsor-stats:rwc:rwc-intl" not in sponsor_stats._memory
+
+
+def test_webhook_refreshes_sponsor_stats_from_live_api(webhook_client, monkeypatch):
+    import json
+    from services import sponsor_stats
+
+    read_modes = []
+
+    async def record(kv, sanity, dataset, site):
+        read_modes.append(sanity.read_mode)
+
+    monkeypatch.setattr(sponsor_stats, "refresh_project_counts", record)
+    body = json.dumps({"_id": "proj-1", "_type": "project", "site": "rwc-us", "dataset": "rwc"}).encode()
+    webhook_client.post("/api/v1/content/webhook", content=body, headers=_signed(body))
+
+    assert read_modes == ["live"]
+
+
+def test_webhook_without_site_invalidates_every_site_of_dataset(webhook_client):
+    import json
+
+    body = json.dumps({"_id": "sp-1", "_type": "sponsor"}).encode()
+    headers = {**_signed(body), "sanity-dataset": "rwc"}
+    response = webhook_client.post("/api/v1/content/webhook", content=body, headers=headers)
+
+    assert response.status_code == 200
+    assert response.json()["tags"] == ["rwc:rwc-us:sponsor", "rwc:rwc-intl:sponsor"]
+
+
+def test_webhook_rejects_bad_signature(webhook_client):
+    body = b'{"_id": "x", "_type": "event", "dataset": "production"}'
+    headers = _signed(body, secret="wrong-secret")
+    response = webhook_client.post("/api/v1/content/webhook", content=body, headers=headers)
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_invalidate_uses_kv_tag_index_across_isolates():
+    from services import content_cache
+    from services.content_cache import ContentCache, content_tags
+
+    class DictKV:
+        def __init__(self):
+            self.store = {}
+        async def get(self, key, **kwargs):
+            return self.store.get(key)
+        async def put(self, key, value, **kwargs):
+            self.store[key] = value
+        async def delete(self, key):
+            self.store.pop(key, None)
+        async def list(self, prefix="", **kwargs):
+            return {"keys": [{"name": k} for k in self.store if k.startswith(prefix)], "list_complete": True}
+
+    kv = DictKV()
+    sanity = MockSanityClient()
+    tags = content_tags("production", None, ["projects"])
+    await ContentCache(kv=kv).query("projects", sanity, '*[_type == "project"]', "production", {}, tags=tags)
+    assert any(k.startswith("content-tag:production:*:project:content-cache:") for k in kv.store)
+
+    # Invalidation arrives at an isolate that never saw the entry
+    content_cache.reset()
+    removed = await ContentCache(kv=kv).invalidate(["production:*:project"])
+
+    assert removed == 1
+    assert not any(k.startswith("content-cache:") for k in kv.store)
+    assert not any(k.startswith("content-tag:production:*:project") for k in kv.store)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_fills_for_one_tag_are_all_indexed():
+    import asyncio
+    from services import content_cache
+    from services.content_cache import ContentCache
+
+    class SlowKV:
+        """Interleaves writes from two isolates filling at the same moment."""
+        def __init__(self):
+            self.store = {}
+        async def get(self, key, **kwargs):
+            await asyncio.sleep(0)
+            return self.store.get(key)
+        async def put(self, key, value, **kwargs):
+            await asyncio.sleep(0)
+            self.store[key] = value
+        async def delete(self, key):
+            self.store.pop(key, None)
+        async def list(self, prefix="", **kwargs):
+            return {"keys": [{"name": k} for k in self.store if k.startswith(prefix)], "list_complete": True}
+
+    kv = SlowKV()
+    tags = ["production:*:project"]
+    await asyncio.gather(*(
+        ContentCache(kv=kv).query("projects", MockSanityClient(), f'*[_type == "project"][{i}]', "production", {}, tags=tags)
+        for i in range(2)
+    ))
+
+    content_cache.reset()
+    assert await ContentCache(kv=kv).invalidate(tags) == 2
+    assert not any(k.startswith(("content-cache:", "content-tag:")) for k in kv.store)
+
+
+class RecordingSanity(MockSanityClient):
+    def __init__(self):
+        super().__init__()
+        self.reads = []
+
+    async def query(self, groq, dataset, params=None, **kwargs):
+        self.reads.append(kwargs)
+        return await super().query(groq, dataset, params)
+
+
+@pytest.mark.asyncio
+async def test_fills_after_invalidation_bypass_the_cdn(mock_settings, monkeypatch):
+    from services import content_cache
+    from services.content_cache import ContentCache
+
+    kv = mock_settings.kv
+    tags = ["production:*:project"]
+    groq = '*[_type == "project"]'
+    sanity = RecordingSanity()
+    await ContentCache(kv=kv).query("projects", sanity, groq, "production", {}, tags=tags)
+    await ContentCache(kv=kv).invalidate(tags)
+
+    # Another isolate refills from the live API, published perspective.
+    content_cache.reset()
+    await ContentCache(kv=kv).query("projects", sanity, groq, "production", {}, tags=tags)
+    assert sanity.reads == [{}, {"read_mode": "live", "perspective": "published"}]
+
+    # Once the CDN has caught up, fills go back to it.
+    monkeypatch.setattr(content_cache.time, "time", lambda: 10**10)
+    content_cache.reset()
+    await ContentCache(kv=kv).query("projects", sanity, groq, "production", {}, tags=tags)
+    assert sanity.reads[-1] == {}
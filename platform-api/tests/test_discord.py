@@ -47,6 +47,8 @@ def client(monkeypatch):
     def _mock_settings():
         mock = MagicMock(spec=WorkerSettings)
         mock.kv = mock_kv
+        mock.rate_limiter = None
+        mock.discord_queue = None
         return mock
 
     app.dependency_overrides[get_settings] = _mock_settings
@@ -98,17 +100,15 @@ def test_rate_limiting(client):
     assert response.status_code == 429
     assert "Rate limit" in response.json()["detail"]
 
-def test_time_to_live(client):
-    """Verify that the rate-limit window resets after the 60-second TTL expires."""
+def test_time_to_live(client, monkeypatch):
+    """Verify that the rate-limit window resets after the 60-second window."""
     import time
-    
-    # Grab the KV store instance from our mocked settings
-    settings = app.dependency_overrides[get_settings]()
-    mock_kv = settings.kv
-    
-    # Lock the KV's clock to a specific time
-    base_time = time.time()
-    mock_kv.custom_time = base_time
+    from services import rate_limiter
+
+    # Lock the in-process limiter's clock to a specific time
+    base_time = time.monotonic()
+    now = [base_time]
+    monkeypatch.setattr(rate_limiter.local_limiter, "clock", lambda: now[0])
 
     payload = {
         "channel": "announcements",
@@ -126,12 +126,12 @@ def test_time_to_live(client):
     assert response.status_code == 429
     assert "Rate limit" in response.json()["detail"]
 
-    # Fast-forward the KV clock by 61 seconds
-    mock_kv.custom_time = base_time + 61
+    # Fast-forward the limiter clock by 61 seconds
+    now[0] = base_time + 61
 
-    # After expiry, MockKV will delete the key → request succeeds!
+    # After the window the bucket has refilled → request succeeds!
     response = client.post("/api/v1/discord/notify", json=payload)
-    assert response.status_code == 200, "Request should succeed after TTL window resets"
+    assert response.status_code == 200, "Request should succeed after the window resets"
     assert response.json()["sent"] is True
 
 def test_async_mode(client, monkeypatch):
@@ -194,4 +194,32 @@ def test_with_fields(client, monkeypatch):
     assert "fields" in embed
     assert len(embed["fields"]) == 2
     assert embed["fields"][0]["name"] == "Status"
-    assert embed["fields"][0]["value"] == "Online"
\ No newline at end of file
+    assert embed["fields"][0]["value"] == "Online"
+def test_rate_limited_sync_send_is_queued_for_retry(client, monkeypatch):
+    from fastapi import HTTPException
+    from services import discord_queue
+
+    now = [0.0]
+    async def fake_sleep(seconds):
+        now[0] += seconds
+    monkeypatch.setattr(discord_queue.local_queue, "clock", lambda: now[0])
+    monkeypatch.setattr(discord_queue.local_queue, "sleep", fake_sleep)
+
+    webhook_calls = []
+
+    async def flaky_post_webhook(url, embed):
+        webhook_calls.append(embed["title"])
+        if len(webhook_calls) == 1:
+            raise HTTPException(503, "Discord rate limited, retry after 4s", headers={"Retry-After": "4"})
+        return True
+
+    monkeypatch.setattr("routers.discord.post_webhook", flaky_post_webhook)
+
+    payload = {"channel": "announcements", "title": "Burst", "message": "Absorbed"}
+    response = client.post("/api/v1/discord/notify", json=payload)
+
+    assert response.status_code == 202
+    assert response.json()["message"] == "Queued for retry"
+    # The queued copy is delivered after the Retry-After delay.
+    assert webhook_calls == ["Burst", "Burst"]
+    assert now[0] == 4
@@ -0,0 +1,213 @@
+"""Tests for queued Discord delivery (services/discord_queue.py)."""
+
+import json
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi import HTTPException
+
+from services import discord_queue
+from services.discord_queue import LocalDeliveryQueue, backoff_seconds, pack_embeds, process_batch
+
+HOOK_A = "https://discord.com/api/webhooks/1/a"
+HOOK_B = "https://discord.com/api/webhooks/2/b"
+
+
+class FakeMessage:
+    def __init__(self, webhook_url, title, attempts=1, **embed):
+        self.body = discord_queue.new_message(webhook_url, {"title": title, **embed})
+        self.attempts = attempts
+        self.acked = False
+        self.retried_after = None
+
+    def ack(self):
+        self.acked = True
+
+    def retry(self, delay_seconds):
+        self.retried_after = delay_seconds
+
+
+def rate_limited(retry_after="5"):
+    return HTTPException(503, "Discord rate limited", headers={"Retry-After": retry_after})
+
+
+def test_backoff_doubles_and_honours_retry_after():
+    assert [backoff_seconds(n) for n in (1, 2, 3, 4)] == [2, 4, 8, 16]
+    assert backoff_seconds(1, retry_after=7.2) == 8
+    assert backoff_seconds(30) == discord_queue.MAX_DELAY_SECONDS
+
+
+@pytest.mark.asyncio
+async def test_failed_message_holds_back_its_webhook_only():
+    sent = []
+
+    async def deliver(url, *embeds):
+        if url == HOOK_A:
+            raise rate_limited("5")
+        sent.append([e["title"] for e in embeds])
+
+    a1, a2 = (FakeMessage(HOOK_A, t) for t in ("a1", "a2"))
+    b1 = FakeMessage(HOOK_B, "b1")
+
+    await process_batch([a1, b1, a2], deliver, kv=None)
+
+    assert sent == [["b1"]]
+    assert b1.acked
+    assert (a1.retried_after, a2.retried_after) == (5, 5)
+    assert not a1.acked and not a2.acked
+
+
+@pytest.mark.asyncio
+async def test_webhook_messages_are_coalesced_within_discord_limits():
+    sent = []
+
+    async def deliver(url, *embeds):
+        sent.append([e["title"] for e in embeds])
+
+    messages = [FakeMessage(HOOK_A, f"m{i}") for i in range(12)]
+    await process_batch(messages, deliver, kv=None)
+
+    assert [len(embeds) for embeds in sent] == [10, 2]
+    assert sum(sent, []) == [f"m{i}" for i in range(12)]
+    assert all(m.acked for m in messages)
+
+
+def test_pack_embeds_splits_on_total_characters():
+    long = "x" * 2500
+    messages = [FakeMessage(HOOK_A, str(i), description=long) for i in range(5)]
+
+    packs = pack_embeds(messages)
+
+    assert [len(pack) for pack in packs] == [2, 2, 1]
+
+
+@pytest.mark.asyncio
+async def test_retry_holds_back_later_packs():
+    sent = []
+
+    async def deliver(url, *embeds):
+        if embeds[0]["title"] == "m10":
+            raise rate_limited("5")
+        sent.append(len(embeds))
+
+    messages = [FakeMessage(HOOK_A, f"m{i}") for i in range(25)]
+    await process_batch(messages, deliver, kv=None)
+
+    assert sent == [10]
+    assert all(m.acked for m in messages[:10])
+    assert all(m.retried_after == 5 for m in messages[10:])
+
+
+@pytest.mark.asyncio
+async def test_permanent_failure_is_dead_lettered(mock_settings):
+    kv = mock_settings.kv
+
+    async def deliver(url, *embeds):
+        raise HTTPException(500, "Invalid webhook host: evil.example")
+
+    message = FakeMessage(HOOK_A, "bad")
+    await process_batch([message], deliver, kv)
+
+    assert message.acked and message.retried_after is None
+    record = json.loads(kv._store[discord_queue.DEAD_LETTER_PREFIX + message.body["id"]])
+    assert record["message"]["embed"] == {"title": "bad"}
+    assert "Invalid webhook host" in record["reason"]
+
+
+@pytest.mark.asyncio
+async def test_exhausted_retries_are_dead_lettered(mock_settings):
+    kv = mock_settings.kv
+
+    async def deliver(url, *embeds):
+        raise rate_limited()
+
+    message = FakeMessage(HOOK_A, "late", attempts=discord_queue.MAX_ATTEMPTS)
+    await process_batch([message], deliver, kv)
+
+    assert message.acked
+    assert len(kv._store) == 1
+
+
+@pytest.mark.asyncio
+async def test_consume_wraps_queue_messages():
+    message = SimpleNamespace(
+        body=discord_queue.new_message(HOOK_A, {"title": "hi"}),
+        attempts=1, ack=MagicMock(), retry=MagicMock(),
+    )
+    delivered = []
+
+    async def deliver(url, *embeds):
+        delivered.append((url, embeds[0]["title"]))
+
+    await discord_queue.consume(SimpleNamespace(messages=[message]), None, deliver)
+
+    assert delivered == [(HOOK_A, "hi")]
+    message.ack.assert_called_once()
+    message.retry.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_local_queue_waits_for_retry_after_then_delivers():
+    now = [1000.0]
+    slept = []
+
+    async def sleep(seconds):
+        slept.append(seconds)
+        now[0] += seconds
+
+    queue = LocalDeliveryQueue(clock=lambda: now[0], sleep=sleep)
+    attempts = []
+
+    async def deliver(url, *embeds):
+        attempts.append([e["title"] for e in embeds])
+        if len(attempts) == 1:
+            raise rate_limited("3")
+
+    await queue.send(discord_queue.new_message(HOOK_A, {"title": "first"}))
+    await queue.send(discord_queue.new_message(HOOK_A, {"title": "second"}))
+    await queue.drain(deliver, kv=None)
+
+    assert attempts == [["first", "second"], ["first", "second"]]
+    assert slept == [3]
+    assert len(queue) == 0
+
+
+@pytest.mark.asyncio
+async def test_local_queue_coalesces_notifications_after_a_post():
+    now = [1000.0]
+    slept = []
+
+    async def sleep(seconds):
+        slept.append(seconds)
+        now[0] += seconds
+
+    queue = LocalDeliveryQueue(clock=lambda: now[0], sleep=sleep, coalesce_seconds=2)
+    sent = []
+
+    async def deliver(url, *embeds):
+        sent.append([e["title"] for e in embeds])
+
+    await queue.send(discord_queue.new_message(HOOK_A, {"title": "first"}))
+    await queue.drain(deliver, kv=None)
+    now[0] += 0.5
+    for title in ("second", "third"):
+        await queue.send(discord_queue.new_message(HOOK_A, {"title": title}))
+    await queue.drain(deliver, kv=None)
+
+    assert sent == [["first"], ["second", "third"]]
+    assert slept == [1.5]
+
+
+@pytest.mark.asyncio
+async def test_local_queue_leaves_distant_retries_for_a_later_drain():
+    now = [0.0]
+    queue = LocalDeliveryQueue(clock=lambda: now[0])
+
+    async def deliver(url, *embeds):
+        raise rate_limited("120")
+
+    await queue.send(discord_queue.new_message(HOOK_A, {"title": "x"}))
+    await queue.drain(deliver, kv=None)
+
+    assert len(queue) == 1
@@ -16,6 +16,10 @@ class MockKV:
         self.store[key] = value
 
 class MockSanityClient:
+    def __init__(self):
+        self.mutations = []
+        self.fail_mutate = False
+
     async def query(self, groq: str, dataset: str, params: dict | None = None):
         return[{
             "_id": "sub-1", 
@@ -27,10 +31,17 @@ class MockSanityClient:
             "formType": "contact"
         }]
     async def mutate(self, mutations: list[dict], dataset: str, write_token: str):
+        if self.fail_mutate:
+            raise HTTPException(502, "Sanity upstream error")
+        self.mutations.append((dataset, mutations))
         return {"results": [{"id": "new-doc"}]}
 
 @pytest.fixture
-def client(monkeypatch):
+def sanity():
+    return MockSanityClient()
+
+@pytest.fixture
+def client(monkeypatch, sanity, outbox_db):
     async def fake_verify_turnstile(token, ip, secret):
         return token == "1x0000000000000000000000000000000AA"
     
@@ -52,6 +63,9 @@ def client(monkeypatch):
         mock.sanity_project_id = "test"
         mock.turnstile_secret_key = "test-turnstile-secret"
         mock.kv = mock_kv
+        mock.db = outbox_db
+        mock.rate_limiter = None
+        mock.discord_queue = None
         return mock
 
     async def mock_require_auth(request: Request):
@@ -60,7 +74,7 @@ def client(monkeypatch):
             raise HTTPException(status_code=401, detail="Not authenticated")
         return "admin@example.com"
 
-    app.dependency_overrides[get_sanity] = lambda: MockSanityClient()
+    app.dependency_overrides[get_sanity] = lambda: sanity
     app.dependency_overrides[get_settings] = _mock_settings
     app.dependency_overrides[require_authenticated_user] = mock_require_auth
 
@@ -94,6 +108,35 @@ def test_successful_submission(client, monkeypatch):
     assert response.json()["status"] == "submitted"
     assert len(notify_calls) == 1
 
+def test_submission_is_acked_from_outbox_then_flushed(client, sanity, outbox_db, monkeypatch):
+    async def mock_notify_discord(*args, **kwargs):
+        pass
+
+    monkeypatch.setattr("routers.forms.notify_discord", mock_notify_discord)
+
+    response = client.post("/api/v1/forms/submit", json=VALID_PAYLOAD, headers={"CF-Connecting-IP": "1.2.3.4"})
+
+    assert response.status_code == 200
+    # The background flush moved the outbox row to Sanity in one transaction.
+    (dataset, mutations), = sanity.mutations
+    assert dataset == "production"
+    assert mutations[0]["createIfNotExists"]["_id"] == response.json()["id"]
+    assert outbox_db.rows("SELECT * FROM form_submission_outbox") == []
+
+def test_sanity_outage_keeps_submission_in_outbox(client, sanity, outbox_db, monkeypatch):
+    async def mock_notify_discord(*args, **kwargs):
+        pass
+
+    monkeypatch.setattr("routers.forms.notify_discord", mock_notify_discord)
+    sanity.fail_mutate = True
+
+    response = client.post("/api/v1/forms/submit", json=VALID_PAYLOAD, headers={"CF-Connecting-IP": "1.2.3.4"})
+
+    assert response.status_code == 200
+    (row,) = outbox_db.rows("SELECT id, attempts, last_error FROM form_submission_outbox")
+    assert row["id"] == response.json()["id"]
+    assert row["attempts"] == 1 and "Sanity upstream error" in row["last_error"]
+
 def test_turnstile_failure(client):
     payload = {**VALID_PAYLOAD, "cf-turnstile-response": "2x0000000000000000000000000000000AA"}
     response = client.post("/api/v1/forms/submit", json=payload, headers={"CF-Connecting-IP": "1.2.3.4"})
@@ -131,4 +174,82 @@ def test_list_submissions_with_auth(client):
         "/api/v1/forms/submissions",
         headers={"Authorization": "Bearer valid-test-token"}
     )
-    assert response.status_code == 200
\ No newline at end of file
+    assert response.status_code == 200
+    assert response.json()["items"][0]["_id"] == "sub-1"
+    assert response.json()["next_cursor"] is None
+
+def test_list_submissions_keyset_pages(client):
+    rows = [
+        {"_id": f"sub-{i}", "name": "Jane", "email": "jane@example.com",
+         "submittedAt": f"2026-01-0{9 - i}T00:00:00Z"}
+        for i in range(3)
+    ]
+    seen = []
+
+    class PagingSanity:
+        async def query(self, groq, dataset, params=None):
+            seen.append((groq, params))
+            start = 0
+            if "cursorAt" in params:
+                start = next(i for i, r in enumerate(rows) if r["_id"] == params["cursorId"]) + 1
+            page = rows[start:start + params["fetch"]]
+            return {"items": page, "total": len(rows)} if groq.lstrip().startswith("{") else page
+
+    app.dependency_overrides[get_sanity] = lambda: PagingSanity()
+    headers = {"Authorization": "Bearer valid-test-token"}
+
+    first = client.get("/api/v1/forms/submissions?limit=2&include_total=true", headers=headers).json()
+    assert [r["_id"] for r in first["items"]] == ["sub-0", "sub-1"]
+    assert first["total"] == 3 and first["next_cursor"]
+    assert "[$offset" not in seen[0][0] and "$cursorAt" not in seen[0][0]
+
+    second = client.get(f"/api/v1/forms/submissions?limit=2&cursor={first['next_cursor']}", headers=headers).json()
+    assert [r["_id"] for r in second["items"]] == ["sub-2"]
+    assert second["next_cursor"] is None and second["total"] is None
+    assert seen[1][1]["cursorAt"] == "2026-01-08T00:00:00Z" and seen[1][1]["cursorId"] == "sub-1"
+    assert "count(" not in seen[1][0]
+
+def test_list_submissions_pages_past_legacy_rows_without_submitted_at(client):
+    rows = [
+        {"_id": "sub-new", "name": "Jane", "email": "jane@example.com",
+         "submittedAt": "2026-01-09T00:00:00Z", "_createdAt": "2026-01-09T00:00:00Z"},
+        {"_id": "sub-legacy", "name": "Jane", "email": "jane@example.com",
+         "submittedAt": None, "_createdAt": "2025-06-01T00:00:00Z"},
+        {"_id": "sub-old", "name": "Jane", "email": "jane@example.com",
+         "submittedAt": None, "_createdAt": "2025-01-01T00:00:00Z"},
+    ]
+    seen = []
+
+    class PagingSanity:
+        async def query(self, groq, dataset, params=None):
+            seen.append((groq, params))
+            assert '"submittedAt": coalesce(submittedAt, _createdAt)' in groq
+            start = 0
+            if "cursorAt" in params:
+                start = next(i for i, r in enumerate(rows) if r["_id"] == params["cursorId"]) + 1
+            return [
+                {**r, "submittedAt": r["submittedAt"] or r["_createdAt"]}
+                for r in rows[start:start + params["fetch"]]
+            ]
+
+    app.dependency_overrides[get_sanity] = lambda: PagingSanity()
+    headers = {"Authorization": "Bearer valid-test-token"}
+
+    first = client.get("/api/v1/forms/submissions?limit=2", headers=headers)
+    assert first.status_code == 200
+    assert first.json()["items"][1]["submittedAt"] == "2025-06-01T00:00:00Z"
+
+    second = client.get(
+        f"/api/v1/forms/submissions?limit=2&cursor={first.json()['next_cursor']}", headers=headers
+    )
+    assert second.status_code == 200
+    assert [r["_id"] for r in second.json()["items"]] == ["sub-old"]
+    assert seen[1][1]["cursorAt"] == "2025-06-01T00:00:00Z"
+    assert "coalesce(submittedAt, _createdAt) < $cursorAt" in seen[1][0]
+
+def test_list_submissions_rejects_malformed_cursor(client):
+    response = client.get(
+        "/api/v1/forms/submissions?cursor=not-a-cursor",
+        headers={"Authorization": "Bearer valid-test-token"}
+    )
+    assert response.status_code == 400
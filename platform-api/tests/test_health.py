@@ -127,7 +127,7 @@ def test_health_checks_optional_secrets(client, mock_settings):
     optional = response.json()["checks"]["optional_secrets"]
     assert optional["status"] == "ok"
     # Should show count only, no secret names
-    assert "0 of 11" in optional["message"]
+    assert "0 of 12" in optional["message"]
     # Must never leak secret names
     assert "discord_bot_token" not in optional["message"]
 
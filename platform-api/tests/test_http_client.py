@@ -0,0 +1,123 @@
+# tests/test_http_client.py
+import pytest
+
+from services import http_client
+from services.http_client import ClientRegistry, get_client, origin_of
+
+
+@pytest.fixture(autouse=True)
+def fresh_registry(monkeypatch):
+    registry = ClientRegistry()
+    monkeypatch.setattr(http_client, "client_registry", registry)
+    return registry
+
+
+def test_origin_of_strips_path_and_query():
+    assert origin_of("https://abc.api.sanity.io/v2024-01-01/data/query/production?x=1") == "https://abc.api.sanity.io"
+    assert origin_of("http://localhost:8787/api") == "http://localhost:8787"
+
+
+@pytest.mark.asyncio
+async def test_same_origin_reuses_client(fresh_registry):
+    async with get_client(origin="https://discord.com/api/webhooks/1/a") as first:
+        pass
+    async with get_client(origin="https://discord.com/api/webhooks/2/b") as second:
+        pass
+
+    assert first is second
+    assert not first.is_closed
+    assert len(fresh_registry) == 1
+    await http_client.close_pooled_clients()
+    assert first.is_closed
+
+
+@pytest.mark.asyncio
+async def test_different_origins_get_different_clients(fresh_registry):
+    async with get_client(origin="https://api.cloudflare.com") as cf:
+        async with get_client(origin="https://discord.com") as discord:
+            assert cf is not discord
+    assert len(fresh_registry) == 2
+    await http_client.close_pooled_clients()
+
+
+@pytest.mark.asyncio
+async def test_no_origin_gets_fresh_closed_client(fresh_registry):
+    async with get_client() as client:
+        pass
+    assert client.is_closed
+    assert len(fresh_registry) == 0
+
+
+@pytest.mark.asyncio
+async def test_idle_clients_are_evicted(fresh_registry):
+    fresh_registry.idle_timeout = 0
+    async with get_client(origin="https://api.cloudflare.com") as first:
+        pass
+    async with get_client(origin="https://api.cloudflare.com") as second:
+        pass
+
+    assert first is not second
+    assert first.is_closed
+    await http_client.close_pooled_clients()
+
+
+@pytest.mark.asyncio
+async def test_reuse_error_falls_back_to_fresh_clients(fresh_registry):
+    with pytest.raises(RuntimeError):
+        async with get_client(origin="https://api.cloudflare.com"):
+            raise RuntimeError("Cannot perform I/O on behalf of a different request")
+
+    assert fresh_registry.enabled is False
+    async with get_client(origin="https://api.cloudflare.com") as client:
+        pass
+    assert client.is_closed
+
+
+@pytest.mark.asyncio
+async def test_rejected_reuse_is_retried_on_fresh_connections(fresh_registry, monkeypatch):
+    import httpx
+
+    class RejectingTransport(httpx.AsyncBaseTransport):
+        """Fails the first request like the Workers runtime refusing reuse."""
+
+        built = []
+
+        def __init__(self):
+            self.closed = False
+            self.calls = 0
+            RejectingTransport.built.append(self)
+
+        async def handle_async_request(self, request):
+            self.calls += 1
+            if len(RejectingTransport.built) == 1:
+                raise RuntimeError("Cannot perform I/O on behalf of a different request")
+            return httpx.Response(204)
+
+        async def aclose(self):
+            self.closed = True
+
+    monkeypatch.setattr(httpx, "AsyncHTTPTransport", lambda **kwargs: RejectingTransport())
+
+    async with get_client(origin="https://api.cloudflare.com") as client:
+        response = await client.get("https://api.cloudflare.com/ping")
+
+    assert response.status_code == 204
+    stale, fresh = RejectingTransport.built
+    assert stale.closed and (stale.calls, fresh.calls) == (1, 1)
+    assert fresh_registry.enabled is False
+    assert len(fresh_registry) == 0 and client.is_closed
+
+
+@pytest.mark.asyncio
+async def test_use_transport_replaces_the_network(fresh_registry, monkeypatch):
+    import httpx
+
+    seen = []
+    monkeypatch.setattr(http_client, "_transport_override", None)
+    http_client.use_transport(httpx.MockTransport(lambda r: seen.append(r.url.host) or httpx.Response(204)))
+
+    async with get_client() as client:
+        response = await client.get("https://api.sanity.example/ping")
+
+    assert response.status_code == 204
+    assert seen == ["api.sanity.example"]
@@ -0,0 +1,54 @@
+# tests/test_lazy_routers.py
+import subprocess
+import sys
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from lazy_routers import LazyRouters, LazyRouterMiddleware
+
+SRC = Path(__file__).parent.parent / "src"
+
+
+def test_importing_app_does_not_import_routers():
+    code = "import sys, app; print(sorted(m for m in sys.modules if m.startswith('routers.')))"
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=SRC, capture_output=True, text=True, check=True
+    )
+    assert out.stdout.strip() == "[]"
+
+
+def _app_with(tmp_path, monkeypatch, *names):
+    for name in names:
+        (tmp_path / f"lazy_{name}.py").write_text(
+            "from fastapi import APIRouter\n"
+            f"router = APIRouter(prefix='/{name}')\n"
+            f"@router.get('/ping')\n"
+            f"def ping():\n    return {{'router': '{name}'}}\n"
+        )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    app = FastAPI()
+    routers = LazyRouters(app)
+    for name in names:
+        routers.add(f"lazy_{name}", prefix="/api", mount=f"/api/{name}")
+    app.add_middleware(LazyRouterMiddleware, routers=routers)
+    return app, routers
+
+
+def test_router_is_mounted_on_first_request_to_its_prefix(tmp_path, monkeypatch):
+    app, routers = _app_with(tmp_path, monkeypatch, "alpha", "beta")
+    client = TestClient(app)
+
+    assert client.get("/api/alpha/ping").json() == {"router": "alpha"}
+    assert routers.pending == ["lazy_beta"]
+    assert client.get("/api/alphabet").status_code == 404
+    assert routers.pending == ["lazy_beta"]
+
+
+def test_openapi_loads_every_router(tmp_path, monkeypatch):
+    app, routers = _app_with(tmp_path, monkeypatch, "gamma", "delta")
+    paths = TestClient(app).get("/openapi.json").json()["paths"]
+
+    assert set(paths) == {"/api/gamma/ping", "/api/delta/ping"}
+    assert routers.pending == []
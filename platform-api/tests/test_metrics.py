@@ -0,0 +1,127 @@
+"""Tests for the Analytics Engine metrics emitter (services/metrics.py)."""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import httpx
+import pytest
+from fastapi import APIRouter, BackgroundTasks, FastAPI
+
+from services import metrics
+from services.timing import ServerTimingMiddleware, TimedRoute, span
+
+
+def _metrics_app(analytics) -> FastAPI:
+    """A minimal app wired like app.py, with ``env`` injected into the scope."""
+    router = APIRouter(route_class=TimedRoute)
+
+    @router.post("/submit/{site}")
+    async def submit(site: str, background_tasks: BackgroundTasks):
+        with span("sanity"):
+            pass
+        metrics.increment(metrics.FORM_SUBMISSIONS, dimension=site)
+        background_tasks.add_task(after_response)
+        return {"ok": True}
+
+    async def after_response():
+        with span("sanity"):
+            await asyncio.sleep(0.2)
+
+    inner = FastAPI()
+    inner.include_router(router)
+    inner.add_middleware(metrics.MetricsMiddleware)
+    inner.add_middleware(ServerTimingMiddleware)
+
+    env = SimpleNamespace(ANALYTICS=analytics)
+
+    async def with_env(scope, receive, send):
+        await inner(scope | {"env": env}, receive, send)
+
+    return with_env
+
+
+async def _post(app, path):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.post(path)
+
+
+def _points(dataset) -> dict[tuple[str, str], list]:
+    return {
+        tuple(call.args[0]["blobs"]): call.args[0]["doubles"]
+        for call in dataset.writeDataPoint.call_args_list
+    }
+
+
+def test_batch_data_points_layout():
+    batch = metrics.MetricsBatch()
+    batch.increment(metrics.WEBHOOK_EVENTS, dimension="event")
+    batch.increment(metrics.WEBHOOK_EVENTS, dimension="event")
+    batch.observe(metrics.UPSTREAM_MS, 5, "sanity")
+    batch.observe(metrics.UPSTREAM_MS, 300, "sanity")
+    batch.observe(metrics.UPSTREAM_MS, 9000, "sanity")
+
+    counter, histogram = batch.data_points()
+
+    assert counter == {"blobs": ["webhook_events", "event"], "doubles": [2], "indexes": ["webhook_events"]}
+    count, total, peak, *buckets = histogram["doubles"]
+    assert (count, total, peak) == (3, 9305, 9000)
+    assert buckets == [1, 0, 0, 0, 0, 1, 0, 0, 1]
+
+
+def test_recording_outside_a_request_is_a_no_op():
+    metrics.increment(metrics.FORM_SUBMISSIONS)
+    metrics.observe(metrics.UPSTREAM_MS, 1.0)
+
+
+@pytest.mark.asyncio
+async def test_request_metrics_are_written_after_response():
+    dataset = MagicMock()
+
+    response = await _post(_metrics_app(dataset), "/submit/capstone")
+
+    assert response.status_code == 200
+    points = _points(dataset)
+    assert points[("form_submissions", "capstone")] == [1]
+    assert points[("request_ms", "/submit/{site}")][0] == 1
+    assert points[("upstream_ms", "sanity")][0] == 1
+    assert points[("stage_ms", "/submit/{site} handler")][0] == 1
+    assert points[("responses", "POST /submit/{site} 200")] == [1]
+
+
+@pytest.mark.asyncio
+async def test_background_tasks_are_not_request_latency():
+    dataset = MagicMock()
+
+    await _post(_metrics_app(dataset), "/submit/capstone")
+
+    points = _points(dataset)
+    _, request_ms, *_ = points[("request_ms", "/submit/{site}")]
+    _, sanity_ms, *_ = points[("upstream_ms", "sanity")]
+    assert request_ms < 150 and sanity_ms < 150
+
+
+@pytest.mark.asyncio
+async def test_flush_is_deferred_to_wait_until():
+    dataset = MagicMock()
+    deferred = []
+    token = metrics.bind_wait_until(deferred.append)
+    try:
+        await _post(_metrics_app(dataset), "/submit/capstone")
+    finally:
+        metrics.unbind_wait_until(token)
+
+    assert _points(dataset) == {}
+    await deferred[0]
+    assert ("form_submissions", "capstone") in _points(dataset)
+
+
+@pytest.mark.asyncio
+async def test_failing_dataset_does_not_fail_request():
+    dataset = MagicMock()
+    dataset.writeDataPoint.side_effect = RuntimeError("binding unavailable")
+
+    response = await _post(_metrics_app(dataset), "/submit/capstone")
+
+    assert response.status_code == 200
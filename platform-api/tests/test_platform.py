@@ -1,7 +1,9 @@
 # tests/test_platform.py
+import json
 import pytest
 from fastapi import Request, HTTPException
 from fastapi.testclient import TestClient
+from datetime import datetime, timedelta, timezone
 from unittest.mock import MagicMock
 
 from app import app
@@ -16,8 +18,15 @@ class MockKV:
     async def put(self, key, value, *args, **kwargs):
         self.store[key] = value
 
+def _hour(hours_ago: int = 0) -> str:
+    now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    return (now - timedelta(hours=hours_ago)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
 @pytest.fixture
 def client(monkeypatch):
+    graphql_calls = []
+    kv = MockKV()
+
     class MockResponse:
         def __init__(self, json_data, status_code=200):
             self._json = json_data
@@ -38,8 +47,9 @@ def client(monkeypatch):
             
         async def post(self, url, **kwargs):
             if "graphql" in url:
+                graphql_calls.append(kwargs["json"]["variables"])
                 return MockResponse({
-                    "data": {"viewer": {"accounts": [{"analyticsEngineEventsAdaptiveGroups":[{"sum": {"double1": 10}, "dimensions": {"datetimeHour": "2026-01-01T00:00:00Z"}}]}]}}
+                    "data": {"viewer": {"accounts": [{"analyticsEngineEventsAdaptiveGroups":[{"sum": {"double1": 10}, "dimensions": {"datetimeHour": _hour()}}]}]}}
                 })
             if "rebuild" in url:
                 return MockResponse({"site": "capstone", "triggered": True, "message": "Rebuild triggered"})
@@ -74,7 +84,7 @@ def client(monkeypatch):
         mock.cf_deploy_hook_capstone = "https://fake.url/hook"
         mock.sanity_project_id = "test"
         
-        mock.kv = MockKV()
+        mock.kv = kv
         
         mock_db = MagicMock()
         mock_db.prepare.return_value.bind.return_value.first = MagicMock(return_value={"email": "admin@example.com"})
@@ -93,6 +103,8 @@ def client(monkeypatch):
     app.dependency_overrides[require_authenticated_user] = mock_require_auth
 
     with TestClient(app) as test_client:
+        test_client.graphql_calls = graphql_calls
+        test_client.kv = kv
         yield test_client
 
     app.dependency_overrides.clear()
@@ -133,4 +145,104 @@ def test_analytics(client):
     data = response.json()
     assert data["metric"] == "form_submissions"
     assert len(data["data"]) == 1
-    assert data["data"][0]["value"] == 10
\ No newline at end of file
+    assert data["data"][0]["value"] == 10
+
+def _get_analytics(client, period="24h"):
+    return client.get(
+        f"/api/v1/platform/analytics?metric=form_submissions&period={period}",
+        headers={"Authorization": "Bearer valid-test-token"},
+    )
+
+def test_analytics_polling_reuses_stored_series(client):
+    for _ in range(3):
+        assert _get_analytics(client).status_code == 200
+
+    assert len(client.graphql_calls) == 1
+
+def test_analytics_periods_slice_one_series(client):
+    from services import analytics_rollup
+
+    _get_analytics(client)
+    analytics_rollup._memory["form_submissions"]["buckets"][_hour(48)] = 7
+
+    day = _get_analytics(client, "24h").json()["data"]
+    week = _get_analytics(client, "7d").json()["data"]
+
+    assert [b["value"] for b in day] == [10]
+    assert [b["value"] for b in week] == [7, 10]
+    assert len(client.graphql_calls) == 1
+
+def test_analytics_refresh_fetches_only_new_hours(client):
+    stored_at = datetime.now(timezone.utc) - timedelta(hours=3)
+    client.kv.store["analytics-rollup:form_submissions"] = json.dumps({
+        "fetched_at": stored_at.timestamp(),
+        "buckets": {_hour(5): 4},
+    })
+
+    data = _get_analytics(client, "7d").json()["data"]
+
+    since = client.graphql_calls[0]["since"]
+    assert since == stored_at.replace(minute=0, second=0, microsecond=0).strftime("%Y-%m-%dT%H:%M:%SZ")
+    assert [b["value"] for b in data] == [4, 10]
+    assert json.loads(client.kv.store["analytics-rollup:form_submissions"])["buckets"] == {_hour(5): 4, _hour(): 10}
+
+def test_deploy_status_all(client):
+    response = client.get("/api/v1/platform/deploy-status/all")
+    assert response.status_code == 200
+    data = response.json()
+    assert [s["site"] for s in data["sites"]] == ["capstone", "rwc-us", "rwc-intl"]
+    assert all(s["status"] == "active" for s in data["sites"])
+    assert data["errors"] == []
+
+def test_deploy_status_all_reports_partial_failure(client, monkeypatch):
+    import services.cf_client
+
+    class FailingClient:
+        async def __aenter__(self): return self
+        async def __aexit__(self, *exc): pass
+        async def get(self, url, **kwargs):
+            return MagicMock(status_code=503, text="upstream unavailable")
+
+    monkeypatch.setattr(services.cf_client, "get_client", lambda **kw: FailingClient())
+    cached = {"latest_stage": {"status": "success"}, "url": "https://cached.pages.dev"}
+    client.kv.store["deploy-status:capstone"] = json.dumps(cached)
+    client.kv.store["deploy-status:rwc-intl"] = json.dumps({"status": "no_deployments"})
+
+    data = client.get("/api/v1/platform/deploy-status/all").json()
+
+    assert {s["site"]: s["status"] for s in data["sites"]} == {"capstone": "active", "rwc-intl": "unknown"}
+    assert data["errors"] == [
+        {"site": "rwc-us", "status_code": 502, "detail": "Cloudflare API error 503: upstream unavailable"},
+    ]
+
+@pytest.mark.asyncio
+async def test_deploy_statuses_fan_out_concurrently(monkeypatch):
+    import asyncio
+    import services.cf_client
+    from services.cf_client import SITE_TO_CF_PROJECT, get_deploy_statuses
+
+    in_flight = []
+    all_started = asyncio.Event()
+
+    class GatedClient:
+        async def __aenter__(self): return self
+        async def __aexit__(self, *exc): pass
+        async def get(self, url, **kwargs):
+            in_flight.append(url)
+            if len(in_flight) == len(SITE_TO_CF_PROJECT):
+                all_started.set()
+            await asyncio.wait_for(all_started.wait(), timeout=1)
+            return MagicMock(status_code=200, json=lambda: {"result": []})
+
+    clients = []
+    def fake_get_client(**kw):
+        clients.append(GatedClient())
+        return clients[-1]
+
+    monkeypatch.setattr(services.cf_client, "get_client", fake_get_client)
+    settings = MagicMock(kv=None, optional_secrets={"cf_account_id": "acct", "cf_api_token": "token"})
+
+    results = await get_deploy_statuses(list(SITE_TO_CF_PROJECT), settings)
+
+    assert results == {site: {"status": "no_deployments"} for site in SITE_TO_CF_PROJECT}
+    assert len(clients) == 1
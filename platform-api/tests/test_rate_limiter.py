@@ -0,0 +1,82 @@
+# tests/test_rate_limiter.py
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from services.rate_limiter import (
+    DurableObjectLimiter,
+    RateLimit,
+    TokenBucketLimiter,
+    get_rate_limiter,
+    local_limiter,
+)
+
+LIMIT = RateLimit("test", max_requests=3, window_seconds=60)
+
+
+class FakeNamespace:
+    """Stands in for the RATE_LIMITER Durable Object namespace binding."""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.calls = []
+
+    def idFromName(self, name):
+        return name
+
+    def get(self, object_id):
+        namespace = self
+
+        class Stub:
+            async def checkLimit(self, window_ms, max_requests):
+                namespace.calls.append((object_id, window_ms, max_requests))
+                if namespace.fail:
+                    raise RuntimeError("DO unavailable")
+                return SimpleNamespace(allowed=False, remaining=0, retryAfterMs=4000)
+
+        return Stub()
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_refills_over_the_window():
+    now = [0.0]
+    limiter = TokenBucketLimiter(clock=lambda: now[0])
+
+    results = [(await limiter.hit("k", LIMIT)).allowed for _ in range(4)]
+    assert results == [True, True, True, False]
+
+    denied = await limiter.hit("k", LIMIT)
+    assert denied.retry_after == pytest.approx(20.0)
+
+    now[0] = 20.0
+    assert (await limiter.hit("k", LIMIT)).allowed
+    assert (await limiter.hit("other", LIMIT)).remaining == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_burst_cannot_exceed_limit():
+    limiter = TokenBucketLimiter(clock=lambda: 0.0)
+    decisions = await asyncio.gather(*(limiter.hit("burst", LIMIT) for _ in range(10)))
+    assert sum(d.allowed for d in decisions) == 3
+
+
+@pytest.mark.asyncio
+async def test_durable_object_makes_one_call_per_decision():
+    namespace = FakeNamespace()
+    decision = await DurableObjectLimiter(namespace, TokenBucketLimiter()).hit("1.2.3.4", LIMIT)
+
+    assert namespace.calls == [("test:1.2.3.4", 60_000, 3)]
+    assert decision == (False, 0, 4.0)
+
+
+@pytest.mark.asyncio
+async def test_durable_object_failure_falls_back_to_local_bucket():
+    decision = await DurableObjectLimiter(FakeNamespace(fail=True), TokenBucketLimiter()).hit("k", LIMIT)
+    assert decision.allowed and decision.remaining == 2
+
+
+def test_get_rate_limiter_picks_backend_from_binding(mock_settings):
+    assert get_rate_limiter(mock_settings) is local_limiter
+    mock_settings.rate_limiter = FakeNamespace()
+    assert isinstance(get_rate_limiter(mock_settings), DurableObjectLimiter)
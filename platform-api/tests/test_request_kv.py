@@ -0,0 +1,99 @@
+"""Tests for the request-scoped KV facade (services/request_kv.py)."""
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from services import metrics, request_kv
+
+
+class CountingKV:
+    def __init__(self):
+        self.store = {}
+        self.gets = []
+        self.fail_puts = False
+
+    async def get(self, key, **kwargs):
+        self.gets.append(key)
+        return self.store.get(key)
+
+    async def put(self, key, value, **kwargs):
+        if self.fail_puts:
+            raise RuntimeError("KV unavailable")
+        self.store[key] = value
+
+
+def _kv_app(kv, seen: dict) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/")
+    async def endpoint():
+        facade = request_kv.wrap(kv)
+        seen["first"] = await facade.get("a")
+        seen["second"] = await request_kv.wrap(kv).get("a")
+        await facade.put_later("b", "2")
+        seen["b"] = await facade.get("b")
+        seen["stored_before_response"] = "b" in kv.store
+        return {"ok": True}
+
+    app.add_middleware(request_kv.RequestKVMiddleware)
+    return app
+
+
+async def _get(app):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.get("/")
+
+
+@pytest.mark.asyncio
+async def test_reads_are_memoized_and_writes_deferred():
+    kv = CountingKV()
+    kv.store["a"] = "1"
+    seen = {}
+
+    await _get(_kv_app(kv, seen))
+
+    assert (seen["first"], seen["second"], seen["b"]) == ("1", "1", "2")
+    assert kv.gets == ["a"]
+    assert seen["stored_before_response"] is False
+    assert kv.store["b"] == "2"
+
+
+@pytest.mark.asyncio
+async def test_deferred_writes_go_through_wait_until():
+    kv = CountingKV()
+    deferred = []
+    token = metrics.bind_wait_until(deferred.append)
+    try:
+        await _get(_kv_app(kv, {}))
+    finally:
+        metrics.unbind_wait_until(token)
+
+    assert "b" not in kv.store
+    await deferred[0]
+    assert kv.store["b"] == "2"
+
+
+@pytest.mark.asyncio
+async def test_failing_deferred_write_does_not_fail_request():
+    kv = CountingKV()
+    kv.fail_puts = True
+
+    response = await _get(_kv_app(kv, {}))
+
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_outside_a_request_reads_and_writes_through():
+    kv = CountingKV()
+    facade = request_kv.wrap(kv)
+
+    await facade.put_later("k", "v")
+    await facade.get("k")
+    await facade.get("k")
+
+    assert kv.store == {"k": "v"}
+    assert kv.gets == ["k", "k"]
+    assert request_kv.wrap(None) is None
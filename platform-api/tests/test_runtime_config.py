@@ -0,0 +1,116 @@
+"""Tests for the versioned runtime config bundle (services/runtime_config.py)."""
+
+import json
+
+import pytest
+
+from services import runtime_config
+from services.runtime_config import bundle_key, discord_webhook, get_runtime_config
+
+HOOKS = {
+    "announcements": "https://discord.com/api/webhooks/111/aaa",
+    "events": "https://discord.com/api/webhooks/222/bbb",
+    "bot-audit": "https://discord.com/api/webhooks/333/ccc",
+    "form-submissions": "https://discord.com/api/webhooks/444/ddd",
+}
+
+
+def _publish(kv, version, **bundle):
+    bundle.setdefault("discord_webhooks", HOOKS)
+    kv._store[bundle_key(version)] = json.dumps(bundle)
+    kv._store[runtime_config.VERSION_KEY] = version
+
+
+def _count_reads(kv) -> list[str]:
+    reads = []
+    get = kv.get
+
+    async def counting_get(key, **kwargs):
+        reads.append(key)
+        return await get(key, **kwargs)
+
+    kv.get = counting_get
+    return reads
+
+
+@pytest.mark.asyncio
+async def test_bundle_is_loaded_once_per_isolate(mock_settings):
+    kv = mock_settings.kv
+    _publish(kv, "v1")
+    reads = _count_reads(kv)
+
+    for channel in ("announcements", "form-submissions", "announcements"):
+        assert await discord_webhook(kv, channel) == HOOKS[channel]
+
+    assert reads == [runtime_config.VERSION_KEY, bundle_key("v1")]
+
+
+@pytest.mark.asyncio
+async def test_new_version_replaces_bundle(mock_settings, monkeypatch):
+    kv = mock_settings.kv
+    monkeypatch.setattr(runtime_config, "VERSION_CHECK_SECONDS", 0)
+    _publish(kv, "v1")
+    assert (await get_runtime_config(kv)).version == "v1"
+
+    _publish(kv, "v2", discord_channel_limits={"announcements": 5}, site_projects={"capstone": "capstone-next"})
+    config = await get_runtime_config(kv)
+
+    assert config.version == "v2"
+    assert config.channel_limit("announcements").max_requests == 5
+    assert config.channel_limit("events").max_requests == 30
+    assert config.projects() == {"capstone": "capstone-next"}
+
+
+@pytest.mark.asyncio
+async def test_malformed_bundle_keeps_previous_config(mock_settings, monkeypatch):
+    kv = mock_settings.kv
+    monkeypatch.setattr(runtime_config, "VERSION_CHECK_SECONDS", 0)
+    _publish(kv, "v1")
+    await get_runtime_config(kv)
+
+    _publish(kv, "v2", discord_channel_limits={"announcements": "lots"})
+
+    assert (await get_runtime_config(kv)).version == "v1"
+
+
+@pytest.mark.asyncio
+async def test_invalid_webhook_is_rejected_at_load(mock_settings):
+    kv = mock_settings.kv
+    _publish(kv, "v1", discord_webhooks={**HOOKS, "events": "http://evil.com/steal"})
+
+    config = await get_runtime_config(kv)
+
+    assert "events" not in config.webhooks
+    assert config.invalid_webhooks == {"events"}
+
+
+@pytest.mark.asyncio
+async def test_without_bundle_reads_legacy_keys(mock_settings):
+    kv = mock_settings.kv
+    kv._store["discord-webhook:events"] = HOOKS["events"]
+
+    assert await discord_webhook(kv, "events") == HOOKS["events"]
+    assert await discord_webhook(kv, "announcements") is None
+
+
+def test_health_uses_bundle_without_per_channel_reads(client, mock_settings):
+    _publish(mock_settings.kv, "v1")
+    reads = _count_reads(mock_settings.kv)
+
+    discord = client.get("/api/v1/platform/health").json()["checks"]["discord"]
+
+    assert discord["status"] == "ok"
+    assert not any(key.startswith(runtime_config.WEBHOOK_KEY_PREFIX) for key in reads)
+
+
+def test_notify_applies_bundle_channel_limit(client, mock_settings, monkeypatch):
+    async def fake_post_webhook(url, *embeds):
+        assert url == HOOKS["announcements"]
+
+    monkeypatch.setattr("routers.discord.post_webhook", fake_post_webhook)
+    _publish(mock_settings.kv, "v1", discord_channel_limits={"announcements": 2})
+    payload = {"channel": "announcements", "title": "Hi", "message": "there"}
+
+    statuses = [client.post("/api/v1/discord/notify", json=payload).status_code for _ in range(3)]
+
+    assert statuses == [200, 200, 429]
@@ -0,0 +1,127 @@
+# tests/test_sanity_client.py
+import pytest
+from fastapi import Request
+
+from dependencies import get_sanity
+from services import sanity_client
+from services.sanity_client import SanityClient
+from services.single_flight import SingleFlight
+
+
+@pytest.fixture
+def sent(monkeypatch):
+    """Capture (url, headers) of every upstream query instead of sending it."""
+    monkeypatch.setattr(sanity_client, "_inflight_queries", SingleFlight())
+    calls = []
+
+    async def fake_post(self, url, headers, groq, params):
+        calls.append((url, headers))
+        return []
+
+    monkeypatch.setattr(SanityClient, "_send_query", fake_post)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_auto_mode_tokenless_reads_use_cdn(sent):
+    await SanityClient(project_id="abc", token="").query("*", "production")
+    url, headers = sent[0]
+    assert url == "https://abc.apicdn.sanity.io/v2024-01-01/data/query/production"
+    assert headers == {}
+
+
+@pytest.mark.asyncio
+async def test_auto_mode_authenticated_reads_stay_live(sent):
+    await SanityClient(project_id="abc", token="sk-read").query("*", "production")
+    url, headers = sent[0]
+    assert url.startswith("https://abc.api.sanity.io/")
+    assert headers["Authorization"] == "Bearer sk-read"
+
+
+@pytest.mark.asyncio
+async def test_cdn_mode_drops_token_and_per_call_override(sent):
+    client = SanityClient(project_id="abc", token="sk-read", read_mode="cdn")
+    await client.query("*", "production")
+    await client.query("*", "production", read_mode="live")
+
+    (cdn_url, cdn_headers), (live_url, live_headers) = sent
+    assert "apicdn.sanity.io" in cdn_url and cdn_headers == {}
+    assert "api.sanity.io" in live_url and "apicdn" not in live_url
+    assert live_headers["Authorization"] == "Bearer sk-read"
+
+
+@pytest.mark.asyncio
+async def test_perspective_is_sent_as_query_parameter(sent):
+    await SanityClient(project_id="abc", token="sk-read").query("*", "production", perspective="published")
+    url, _ = sent[0]
+    assert url.endswith("/query/production?perspective=published")
+    assert sanity_client.build_query_url(url, "*").endswith("?perspective=published&query=%2A")
+
+
+@pytest.mark.asyncio
+async def test_get_sanity_honours_route_read_mode(mock_settings):
+    mock_settings.sanity_api_read_token = "sk-read"
+    request = Request({"type": "http", "headers": [], "state": {}})
+
+    assert (await get_sanity(request, mock_settings)).read_mode == "auto"
+
+    request.state.sanity_read_mode = "cdn"
+    assert (await get_sanity(request, mock_settings)).read_mode == "cdn"
+
+
+class _RecordingClient:
+    def __init__(self):
+        self.requests = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    async def get(self, url, **kwargs):
+        self.requests.append(("GET", url, kwargs))
+        return _Response()
+
+    async def post(self, url, **kwargs):
+        self.requests.append(("POST", url, kwargs))
+        return _Response()
+
+
+class _Response:
+    is_error = False
+
+    def json(self):
+        return {"result": [{"_id": "doc-1"}]}
+
+
+def test_build_query_url_encodes_dollar_params():
+    from urllib.parse import parse_qs, urlsplit
+
+    url = sanity_client.build_query_url(
+        "https://abc.apicdn.sanity.io/v2024-01-01/data/query/production",
+        "*[_type == $type][0...$limit]",
+        {"type": "event", "limit": 5, "site": None},
+    )
+    qs = parse_qs(urlsplit(url).query)
+    assert qs["query"] == ["*[_type == $type][0...$limit]"]
+    assert qs["$type"] == ['"event"']
+    assert qs["$limit"] == ["5"]
+    assert qs["$site"] == ["null"]
+
+
+@pytest.mark.asyncio
+async def test_short_queries_use_get_long_queries_post(monkeypatch):
+    recorder = _RecordingClient()
+    monkeypatch.setattr(sanity_client, "get_client", lambda **kw: recorder)
+    monkeypatch.setattr(sanity_client, "_inflight_queries", SingleFlight())
+    client = SanityClient(project_id="abc", token="")
+
+    assert await client.query("*[_type == 'event']", "production") == [{"_id": "doc-1"}]
+    long_groq = "*[_type in $types]" + " " * 10 + "&& title != 'x'" * 800
+    await client.query(long_groq, "production", {"types": ["event"]})
+
+    (short_method, short_url, _), (long_method, long_url, long_kwargs) = recorder.requests
+    assert short_method == "GET" and "?query=" in short_url
+    assert long_method == "POST" and "?" not in long_url
+    assert long_kwargs["json"]["params"] == {"types": ["event"]}
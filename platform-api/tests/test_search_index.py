@@ -0,0 +1,142 @@
+# tests/test_search_index.py
+import asyncio
+
+import pytest
+
+from app import app
+from dependencies import get_sanity
+from services import search_index
+from services.search_index import SearchIndex
+
+DOCS = [
+    {"_id": "evt-1", "_type": "event", "title": "Sustainability Summit", "description": "Green city talks"},
+    {"_id": "proj-1", "_type": "project", "title": "Smart City Grid", "description": "Sustainable energy routing"},
+    {"_id": "sp-1", "_type": "sponsor", "name": "Acme Corp", "description": None},
+]
+
+
+class IndexSanity:
+    def __init__(self):
+        self.queries = []
+
+    async def query(self, groq, dataset, params=None, **kwargs):
+        self.queries.append(groq)
+        if "match" in groq:
+            return [{"_id": "evt-1", "_type": "event", "title": "Sustainability Summit", "_score": 1.0}]
+        return DOCS
+
+
+def test_prefix_search_ranks_title_matches_first():
+    index = SearchIndex.from_documents(DOCS)
+    results = index.search("sustain")
+    assert [r["_id"] for r in results] == ["evt-1", "proj-1"]
+    assert results[0]["_score"] > results[1]["_score"]
+
+
+def test_all_tokens_must_match_and_types_filter():
+    index = SearchIndex.from_documents(DOCS)
+    assert {r["_id"] for r in index.search("city sust")} == {"evt-1", "proj-1"}
+    assert [r["_id"] for r in index.search("city grid")] == ["proj-1"]
+    assert index.search("sustain", types=["sponsor"]) == []
+    assert index.search("acme")[0] == {"_id": "sp-1", "_type": "sponsor", "title": "Acme Corp", "_score": 2.0}
+
+
+def test_upsert_and_remove_round_trip_through_json():
+    index = SearchIndex.from_documents(DOCS)
+    index.upsert({"_id": "proj-1", "_type": "project", "title": "Solar Tracker"})
+    index.remove("evt-1")
+    restored = SearchIndex.from_json(index.to_json())
+    assert restored.search("sustain") == []
+    assert restored.search("sol")[0]["_id"] == "proj-1"
+
+
+def test_search_builds_index_on_miss_then_answers_locally(client, mock_settings):
+    sanity = IndexSanity()
+    app.dependency_overrides[get_sanity] = lambda: sanity
+
+    first = client.post("/api/v1/content/search", json={"query": "sustain"})
+    assert first.headers["X-Cache"] == "MISS"
+    assert first.json()[0]["_id"] == "evt-1"
+    assert "search-index:production:*" in mock_settings.kv._store
+
+    search_index.reset()  # a fresh isolate reads the index from KV
+    second = client.post("/api/v1/content/search", json={"query": "smart ci"})
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.json() == [{"_id": "proj-1", "_type": "project", "title": "Smart City Grid", "_score": 4.0}]
+    assert len(sanity.queries) == 2  # fallback + index build only
+
+
+def test_unindexed_types_fall_back_to_groq(client, mock_settings):
+    sanity = IndexSanity()
+    app.dependency_overrides[get_sanity] = lambda: sanity
+    assert client.post("/api/v1/content/search", json={"query": "sustain"}).headers["X-Cache"] == "MISS"
+    sanity.queries.clear()
+
+    response = client.post("/api/v1/content/search", json={"query": "sustain", "types": ["page", "event"]})
+
+    assert response.headers["X-Cache"] == "BYPASS"
+    assert response.json()[0]["_id"] == "evt-1"
+    assert len(sanity.queries) == 1 and "match" in sanity.queries[0]
+
+
+@pytest.mark.asyncio
+async def test_apply_change_skips_views_without_index(mock_settings):
+    kv = mock_settings.kv
+    doc = {"_id": "evt-2", "_type": "event", "title": "Hackathon"}
+    assert await search_index.apply_change(kv, "production", None, doc) is False
+
+    await search_index.rebuild(kv, IndexSanity(), "production", None)
+    assert await search_index.apply_change(kv, "production", None, doc) is True
+    search_index.reset()
+    index = await search_index.load(kv, "production", None)
+    assert index.search("hack")[0]["_id"] == "evt-2"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_build(mock_settings):
+    kv = mock_settings.kv
+    sanity = IndexSanity()
+
+    await asyncio.gather(*(search_index.build_missing(kv, sanity, "production", None) for _ in range(5)))
+    await search_index.build_missing(kv, sanity, "production", None)
+
+    assert len(sanity.queries) == 1
+
+
+def test_index_excludes_drafts():
+    from queries.search import SEARCH_INDEX_DOCS
+
+    assert '!(_id in path("drafts.**"))' in SEARCH_INDEX_DOCS
+
+
+@pytest.mark.asyncio
+async def test_changes_from_concurrent_webhooks_are_all_kept(mock_settings):
+    kv = mock_settings.kv
+    await search_index.rebuild(kv, IndexSanity(), "production", None)
+    blob = kv._store["search-index:production:*"]
+
+    # Two isolates, each holding its own copy of the index.
+    await search_index.apply_change(kv, "production", None, {"_id": "evt-2", "_type": "event", "title": "Hackathon"})
+    search_index.reset()
+    await search_index.apply_change(kv, "production", None, {"_id": "evt-1", "_type": "event"}, deleted=True)
+
+    search_index.reset()
+    index = await search_index.load(kv, "production", None)
+    assert kv._store["search-index:production:*"] == blob
+    assert [r["_id"] for r in index.search("hack")] == ["evt-2"]
+    assert [r["_id"] for r in index.search("summit")] == []
+
+
+@pytest.mark.asyncio
+async def test_rebuild_supersedes_older_changes(mock_settings, monkeypatch):
+    kv = mock_settings.kv
+    await search_index.rebuild(kv, IndexSanity(), "production", None)
+    await search_index.apply_change(kv, "production", None, {"_id": "evt-1", "_type": "event"}, deleted=True)
+
+    later = search_index._now_ms() + 1000
+    monkeypatch.setattr(search_index, "_now_ms", lambda: later)
+    await search_index.rebuild(kv, IndexSanity(), "production", None)
+
+    search_index.reset()
+    index = await search_index.load(kv, "production", None)
+    assert [r["_id"] for r in index.search("summit")] == ["evt-1"]
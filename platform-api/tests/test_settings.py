@@ -0,0 +1,43 @@
+# tests/test_settings.py
+from types import SimpleNamespace
+
+import pytest
+
+from models.settings import WorkerSettings
+
+
+def _env(**values):
+    return SimpleNamespace(**{"SANITY_PROJECT_ID": "abc", "API_KEY": "k", **values})
+
+
+def test_for_env_builds_once_per_env(monkeypatch):
+    built = []
+    original = WorkerSettings.from_worker_env.__func__
+
+    def counting(cls, env):
+        built.append(env)
+        return original(cls, env)
+
+    monkeypatch.setattr(WorkerSettings, "from_worker_env", classmethod(counting))
+
+    env = _env()
+    first = WorkerSettings.for_env(env)
+    assert WorkerSettings.for_env(env) is first
+    assert len(built) == 1
+
+    other = WorkerSettings.for_env(_env(API_KEY="other"))
+    assert other is not first and other.api_key == "other"
+    assert len(built) == 2
+
+
+def test_property_views_are_frozen_and_reused():
+    settings = WorkerSettings.from_worker_env(_env())
+    assert settings.env_vars is settings.env_vars
+    with pytest.raises(TypeError):
+        settings.optional_secrets["cf_api_token"] = "x"
+
+
+def test_reassigning_a_field_refreshes_views(mock_settings):
+    assert mock_settings.required_secrets["api_key"] == "test-api-key"
+    mock_settings.api_key = None
+    assert mock_settings.required_secrets["api_key"] is None
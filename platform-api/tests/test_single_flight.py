@@ -0,0 +1,111 @@
+# tests/test_single_flight.py
+import asyncio
+
+import pytest
+
+from services import sanity_client
+from services.sanity_client import SanityClient
+from services.single_flight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    calls = []
+    release = asyncio.Event()
+
+    async def upstream():
+        calls.append(1)
+        await release.wait()
+        return ["shared"]
+
+    waiters = [asyncio.create_task(flight.do("k", upstream)) for _ in range(20)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*waiters)
+
+    assert len(calls) == 1
+    assert all(r is results[0] for r in results)
+    assert len(flight) == 0
+
+
+@pytest.mark.asyncio
+async def test_errors_propagate_to_every_waiter():
+    flight = SingleFlight()
+
+    async def upstream():
+        await asyncio.sleep(0)
+        raise ValueError("sanity down")
+
+    results = await asyncio.gather(
+        *(flight.do("k", upstream) for _ in range(3)), return_exceptions=True
+    )
+    assert all(isinstance(r, ValueError) for r in results)
+
+    # The failed flight is forgotten — the next caller retries.
+    async def recovered():
+        return "ok"
+    assert await flight.do("k", recovered) == "ok"
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_cancel_others():
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def upstream():
+        await release.wait()
+        return "done"
+
+    first = asyncio.create_task(flight.do("k", upstream))
+    second = asyncio.create_task(flight.do("k", upstream))
+    await asyncio.sleep(0)
+
+    first.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await second == "done"
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+
+@pytest.mark.asyncio
+async def test_upstream_cancelled_when_all_waiters_leave():
+    flight = SingleFlight()
+    started = asyncio.Event()
+    cancelled = asyncio.Event()
+
+    async def upstream():
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    waiter = asyncio.create_task(flight.do("k", upstream))
+    await started.wait()
+    waiter.cancel()
+    await asyncio.wait_for(cancelled.wait(), timeout=1)
+    assert len(flight) == 0
+
+
+@pytest.mark.asyncio
+async def test_sanity_client_coalesces_identical_queries(monkeypatch):
+    monkeypatch.setattr(sanity_client, "_inflight_queries", SingleFlight())
+    posts = []
+
+    async def fake_post(self, url, headers, groq, params):
+        posts.append(params)
+        await asyncio.sleep(0)
+        return [{"_id": "sponsor-1"}]
+
+    monkeypatch.setattr(SanityClient, "_send_query", fake_post)
+    client = SanityClient(project_id="test", token="")
+
+    same = [client.query("*[_type == 'sponsor']", "production", {"site": None}) for _ in range(5)]
+    other = client.query("*[_type == 'sponsor']", "rwc", {"site": "rwc-us"})
+    await asyncio.gather(*same, other)
+
+    assert len(posts) == 2
@@ -0,0 +1,129 @@
+"""Tests for the form submission outbox (services/submission_outbox.py)."""
+
+import pytest
+from fastapi import HTTPException
+
+from services import submission_outbox
+from services.submission_outbox import backoff_seconds, enqueue, flush
+
+
+class RecordingSanity:
+    def __init__(self, fail_datasets=(), reject_ids=(), fail_ids=()):
+        self.calls = []
+        self.fail_datasets = set(fail_datasets)
+        self.reject_ids = set(reject_ids)  # 400: the document itself is bad
+        self.fail_ids = set(fail_ids)  # 503 whenever the document is sent
+
+    async def mutate(self, mutations, dataset, write_token):
+        ids = {m["createIfNotExists"]["_id"] for m in mutations}
+        if dataset in self.fail_datasets:
+            raise RuntimeError("Sanity unavailable")
+        if ids & self.reject_ids:
+            raise HTTPException(status_code=400, detail="Upstream API error: 400 Bad Request")
+        if ids & self.fail_ids:
+            raise HTTPException(status_code=503, detail="Upstream API error: 503 Service Unavailable")
+        self.calls.append((dataset, [m["createIfNotExists"]["_id"] for m in mutations]))
+
+
+def _pending(db):
+    return db.rows(
+        "SELECT id, attempts, next_attempt_at FROM form_submission_outbox "
+        "WHERE dead_lettered_at IS NULL ORDER BY id"
+    )
+
+
+def _dead_letters(db):
+    return db.rows(
+        "SELECT id, attempts FROM form_submission_outbox WHERE dead_lettered_at IS NOT NULL ORDER BY id"
+    )
+
+
+def test_backoff_doubles_up_to_cap():
+    assert [backoff_seconds(n) for n in (1, 2, 3)] == [30, 60, 120]
+    assert backoff_seconds(20) == submission_outbox.MAX_DELAY_SECONDS
+
+
+@pytest.mark.asyncio
+async def test_flush_sends_one_transaction_per_dataset(outbox_db):
+    for i, dataset in enumerate(["production", "rwc", "production"]):
+        await enqueue(outbox_db, dataset, {"_id": f"submission.{i}", "_type": "submission"})
+    sanity = RecordingSanity()
+
+    delivered = await flush(outbox_db, sanity, "token")
+
+    assert delivered == 3
+    assert sorted(sanity.calls) == [("production", ["submission.0", "submission.2"]), ("rwc", ["submission.1"])]
+    assert _pending(outbox_db) == []
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_is_rescheduled_and_not_retried_early(outbox_db):
+    await enqueue(outbox_db, "production", {"_id": "submission.a"})
+    await enqueue(outbox_db, "rwc", {"_id": "submission.b"})
+
+    delivered = await flush(outbox_db, RecordingSanity(fail_datasets={"production"}), "token")
+
+    assert delivered == 1
+    (row,) = _pending(outbox_db)
+    assert row["id"] == "submission.a" and row["attempts"] == 1
+
+    # Not due yet: a second flush leaves it alone.
+    sanity = RecordingSanity()
+    assert await flush(outbox_db, sanity, "token") == 0
+    assert sanity.calls == []
+
+    outbox_db.conn.execute("UPDATE form_submission_outbox SET next_attempt_at = 0")
+    assert await flush(outbox_db, sanity, "token") == 1
+    assert _pending(outbox_db) == []
+
+
+@pytest.mark.asyncio
+async def test_flush_respects_batch_limit(outbox_db):
+    for i in range(5):
+        await enqueue(outbox_db, "production", {"_id": f"submission.{i}"})
+    sanity = RecordingSanity()
+
+    assert await flush(outbox_db, sanity, "token", limit=2) == 2
+    assert len(_pending(outbox_db)) == 3
+
+
+@pytest.mark.asyncio
+async def test_rejected_document_is_dead_lettered_without_holding_back_batch(outbox_db):
+    for i in range(3):
+        await enqueue(outbox_db, "production", {"_id": f"submission.{i}"})
+    sanity = RecordingSanity(reject_ids={"submission.1"})
+
+    assert await flush(outbox_db, sanity, "token") == 2
+
+    assert _pending(outbox_db) == []
+    assert _dead_letters(outbox_db) == [{"id": "submission.1", "attempts": 1}]
+    assert ("production", ["submission.0"]) in sanity.calls
+    assert ("production", ["submission.2"]) in sanity.calls
+
+    # Dead letters are never flushed again.
+    outbox_db.conn.execute("UPDATE form_submission_outbox SET next_attempt_at = 0")
+    assert await flush(outbox_db, RecordingSanity(), "token") == 0
+
+
+@pytest.mark.asyncio
+async def test_failing_row_only_backs_off_itself(outbox_db):
+    await enqueue(outbox_db, "production", {"_id": "submission.a"})
+    await enqueue(outbox_db, "production", {"_id": "submission.b"})
+
+    assert await flush(outbox_db, RecordingSanity(fail_ids={"submission.a"}), "token") == 1
+
+    (row,) = _pending(outbox_db)
+    assert row["id"] == "submission.a" and row["attempts"] == 1
+
+
+@pytest.mark.asyncio
+async def test_row_is_dead_lettered_after_max_attempts(outbox_db):
+    await enqueue(outbox_db, "production", {"_id": "submission.a"})
+    outbox_db.conn.execute(
+        "UPDATE form_submission_outbox SET attempts = ?", (submission_outbox.MAX_ATTEMPTS - 1,)
+    )
+
+    assert await flush(outbox_db, RecordingSanity(fail_datasets={"production"}), "token") == 0
+
+    assert _pending(outbox_db) == []
+    assert _dead_letters(outbox_db) == [{"id": "submission.a", "attempts": submission_outbox.MAX_ATTEMPTS}]
@@ -0,0 +1,79 @@
+"""Tests for Server-Timing spans (services/timing.py)."""
+
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+from services import timing
+from services.timing import RequestTimer, ServerTimingMiddleware, TimedRoute, span
+
+
+def _timings(response) -> dict[str, str]:
+    entries = (part.strip() for part in response.headers["server-timing"].split(","))
+    return {entry.split(";", 1)[0]: entry for entry in entries}
+
+
+def _timed_app() -> FastAPI:
+    """A minimal app wired like app.py."""
+    router = APIRouter(route_class=TimedRoute)
+
+    @router.get("/items/{item_id}")
+    async def read_item(item_id: int, q: str = "none"):
+        with span("kv"):
+            pass
+        with span("kv"):
+            pass
+        return {"item_id": item_id, "q": q}
+
+    app = FastAPI()
+    app.include_router(router)
+    app.add_middleware(ServerTimingMiddleware)
+    return app
+
+
+def test_header_reports_route_stages(client):
+    response = client.get("/api/v1/platform/health")
+
+    stages = _timings(response)
+    assert {"deps", "handler", "serialize", "total"} <= stages.keys()
+    assert stages["total"].startswith("total;dur=")
+
+
+def test_same_name_spans_are_summed_and_params_still_resolve():
+    response = TestClient(_timed_app()).get("/items/7?q=x")
+
+    assert response.json() == {"item_id": 7, "q": "x"}
+    assert _timings(response)["kv"].endswith('desc="2 calls"')
+
+
+def test_span_outside_request_is_a_no_op():
+    with span("sanity"):
+        pass
+    assert timing.current_timer() is None
+
+
+def test_timer_header_value_orders_by_first_span():
+    timer = RequestTimer()
+    timer.record("sanity", 12.0)
+    timer.record("kv", 1.0)
+    timer.record("sanity", 3.0)
+
+    assert timer.header_value().startswith('sanity;dur=15.0;desc="2 calls", kv;dur=1.0, total;dur=')
+
+
+@pytest.mark.asyncio
+async def test_sanity_query_is_timed(monkeypatch):
+    from services.sanity_client import SanityClient
+
+    async def fake_send(self, url, headers, groq, params):
+        return []
+
+    monkeypatch.setattr(SanityClient, "_send_query", fake_send)
+    timer = RequestTimer()
+    token = timing._current.set(timer)
+    try:
+        await SanityClient(project_id="p", token="").query("*", "production")
+    finally:
+        timing._current.reset(token)
+
+    assert "sanity" in timer.totals()